@@ -22,10 +22,51 @@ else:
 logger.info(f"AZURE_OPENAI_ENDPOINT: {os.getenv('AZURE_OPENAI_ENDPOINT')}")
 logger.info(f"AZURE_OPENAI_API_KEY present: {bool(os.getenv('AZURE_OPENAI_API_KEY'))}")
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+
+from app.routes import chat, news, teach, books, notice, auth, assess
+from app.services.refresher import refresher
+from app.services.cache import cache_stats
+from app.services.notice_store import notice_store
+from app.services.portals import portal_scraper
+from app.services.quota import governor
+from app.services.http import close_http_client
+from app.services.workers import shutdown_process_pools
+from app.services.pubsub import notice_hub
+from app.services.db import database
+from app.services.passwords import hasher
+from app.services.sessions import signer, usage
+from app.services.ratelimit import rate_limit_stats
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks: background warm-up tasks live for the app's lifetime."""
+    # Last known good feeds are in memory before the first request is accepted
+    refresher.load_snapshots()
+    # Postgres connections are opened once per worker, not per auth request
+    await database.open()
+    await auth.init_db()
+    if not signer.configured:
+        logger.error("AUTH_SIGNING_KEYS is not set — login, signup and token refresh are disabled. "
+                     "See .env.example for how to generate a key.")
+    tasks = [asyncio.create_task(teach.prewarm_lesson_plans())]
+    # Portal scraping needs no API key; the Tavily feeds do
+    refresher.start(None if os.getenv("TAVILY_API_KEY") else ["portals"])
+    notice_hub.start()
+    yield
+    await notice_hub.stop()
+    await refresher.stop()
+    await close_http_client()
+    await database.close()
+    shutdown_process_pools()
+    for t in tasks:
+        t.cancel()
 
-from app.routes import chat, news, teach, books, notice, auth
 
 app = FastAPI(
     title="📚 शिक्षक सहायक API",
@@ -37,6 +78,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS — allow all origins for development
@@ -47,6 +89,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON/Markdown responses — most teachers are on slow mobile data
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # REST Routers
 app.include_router(auth.router)
 app.include_router(chat.router)
@@ -54,6 +99,7 @@ app.include_router(news.router)
 app.include_router(teach.router)
 app.include_router(books.router)
 app.include_router(notice.router)
+app.include_router(assess.router)
 
 
 @app.get("/", tags=["Health"])
@@ -70,3 +116,13 @@ async def root():
 @app.get("/health", tags=["Health"])
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    """Feed refresh durations, served-data age, upstream error counts, cache sizes, Tavily credit usage, Postgres pool waits, password hashing load, per-user AI usage and auth rate limiting."""
+    return {"feeds": refresher.stats(), "cache": cache_stats(), "tavily": governor.stats(),
+            "notices": notice_store.stats(), "portals": portal_scraper.stats(),
+            "notice_stream": notice_hub.stats(), "postgres": database.stats(),
+            "passwords": hasher.stats(), "sessions": signer.stats(), "usage": usage.stats(),
+            "auth_rate_limits": rate_limit_stats()}
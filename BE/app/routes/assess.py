@@ -0,0 +1,348 @@
+"""
+शिक्षक सहायक — Assessment Route
+POST /assess/score — Score a class MCQ response matrix (JSON or text/csv body)
+                     with item analysis; retags stored question difficulty
+POST /assess/grade — Rubric-grade many descriptive answers per LLM call
+"""
+import re
+import json
+import asyncio
+from typing import Dict, List, Optional, Union
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from app.services.ai import get_ai_client, complete
+from app.services.cache import SharedCache, make_key
+from app.services.question_store import question_store, ITEM_MARKS
+from app.services.scoring import analyze, parse_cell, parse_csv, tag_difficulty, MAX_OPTIONS, MIN_TAG_RESPONSES
+from app.services.sessions import attribute
+from app.logger import logger
+
+router = APIRouter(prefix="/assess", tags=["मूल्यांकन (Assessment)"])
+
+MAX_CELLS = 500_000   # e.g. 10,000 students × 50 items
+INCOMPLETE_KEY = "उत्तर कुंजी अधूरी है — कुछ प्रश्नों का सही विकल्प नहीं मिला।"
+
+
+# ── Pydantic models ──────────────────────────────────────────────────────────
+
+class ScoreRequest(BaseModel):
+    responses: List[List[Optional[Union[int, str]]]]   # students × items; option index/letter, null = blank
+    key: List[Union[int, str]] = []                    # correct option per item
+    item_ids: List[str] = []                           # stored question ids (fill key from the bank)
+    student_ids: List[str] = []
+    n_options: int = Field(4, ge=2, le=MAX_OPTIONS)
+    tag_bank: bool = True                              # write observed difficulty back to the bank
+
+    @model_validator(mode="after")
+    def _options_in_range(self):
+        for i, row in enumerate(self.responses):
+            for j, cell in enumerate(row):
+                if isinstance(cell, int) and not -1 <= cell < self.n_options:
+                    raise ValueError(f"responses[{i}][{j}] = {cell} is not an option index (-1 to {self.n_options - 1})")
+        for j, k in enumerate(self.key):
+            if isinstance(k, int) and not 0 <= k < self.n_options:
+                raise ValueError(f"key[{j}] = {k} is not an option index (0 to {self.n_options - 1})")
+        return self
+
+
+class StudentAnswer(BaseModel):
+    student_id: str
+    answer: str
+
+
+class GradeRequest(BaseModel):
+    question: str = ""
+    model_answer: str = ""
+    item_id: str = ""                                  # stored question: fills question/model answer
+    max_marks: int = 0                                 # 0 = from the stored item type, else 5
+    rubric: List[str] = []
+    class_num: Optional[int] = None
+    answers: List[StudentAnswer]
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+def _invalid(message: str) -> JSONResponse:
+    return JSONResponse(status_code=422, content={"error": message})
+
+
+async def _key_from_bank(item_ids: List[str]) -> List[int]:
+    key = []
+    for qid in item_ids:
+        item = await question_store.fetch(qid) or {}
+        answer = item.get("correct", item.get("answer"))
+        key.append(answer if isinstance(answer, int) else parse_cell(answer))
+    return key
+
+
+# Grades are keyed by question + rubric + normalized answer, so identical
+# answers (across students, classes and repeat submissions) are graded once.
+_grade_cache = SharedCache("assess.grade", maxsize=20000, ttl=7 * 24 * 3600)
+
+GRADE_CHUNK_TOKENS = 2500     # answer tokens packed into one LLM request
+GRADE_CHUNK_MAX = 25          # answers per request
+MAX_ANSWERS = 400
+
+DEFAULT_RUBRIC = [
+    "विषय-वस्तु की शुद्धता (मॉडल उत्तर के मुख्य बिंदु)",
+    "पूर्णता — सभी आवश्यक बिंदु शामिल",
+    "स्पष्टता और भाषा",
+]
+
+_PUNCT = re.compile(r"[\s।,.;:!?\-–—'\"()\[\]]+")
+
+
+def _normalize_answer(text: str) -> str:
+    return _PUNCT.sub(" ", text.lower()).strip()
+
+
+def _estimate_tokens(text: str) -> int:
+    # Devanagari tokenizes at roughly 2-3 chars per token; stay conservative.
+    return len(text) // 2 + 8
+
+
+def _chunk(answers: List[tuple]) -> List[List[tuple]]:
+    """Pack (key, text) pairs into chunks under the token budget."""
+    chunks, current, used = [], [], 0
+    for key, text in answers:
+        cost = _estimate_tokens(text)
+        if current and (used + cost > GRADE_CHUNK_TOKENS or len(current) >= GRADE_CHUNK_MAX):
+            chunks.append(current)
+            current, used = [], 0
+        current.append((key, text))
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def _grade_chunk(client, deployment, req: GradeRequest, rubric: List[str],
+                       max_marks: int, chunk: List[tuple]) -> Dict[str, dict]:
+    """Grade one chunk in a single request; returns {cache_key: grade} for parsed entries."""
+    listing = "\n".join(f"[a{i + 1}] {text}" for i, (_, text) in enumerate(chunk))
+    level = f"कक्षा {req.class_num} के " if req.class_num else ""
+    prompt = f"""{level}छात्रों के उत्तरों का मूल्यांकन करें।
+
+प्रश्न: {req.question}
+मॉडल उत्तर: {req.model_answer or "(उपलब्ध नहीं — विषय ज्ञान के आधार पर जांचें)"}
+पूर्णांक: {max_marks}
+
+मूल्यांकन मानदंड (Rubric):
+{chr(10).join(f"- {r}" for r in rubric)}
+
+छात्रों के उत्तर:
+{listing}
+
+नियम:
+- प्रत्येक उत्तर को 0 से {max_marks} के बीच अंक दें (आधे अंक स्वीकार्य)
+- feedback एक छोटा वाक्य हिंदी में हो
+- केवल यह JSON object दें:
+{{"grades":[{{"id":"a1","marks":0,"feedback":"..."}}]}}"""
+
+    response = await complete(
+        client,
+        model=deployment,
+        messages=[
+            {"role": "system", "content": "आप एक निष्पक्ष परीक्षक हैं। केवल valid JSON object दें।"},
+            {"role": "user", "content": prompt},
+        ],
+        response_format={"type": "json_object"},
+        max_completion_tokens=min(8000, 1500 + 120 * len(chunk)),
+    )
+    try:
+        data = json.loads(response.choices[0].message.content or "{}")
+    except json.JSONDecodeError:
+        logger.warning(f"Grading chunk of {len(chunk)} returned invalid JSON")
+        return {}
+
+    grades = {}
+    for g in data.get("grades", []) if isinstance(data, dict) else []:
+        try:
+            idx = int(str(g.get("id", "")).lstrip("a")) - 1
+            marks = float(g.get("marks"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < len(chunk):
+            marks = min(max(round(marks * 2) / 2, 0), max_marks)
+            grades[chunk[idx][0]] = {"marks": marks, "feedback": str(g.get("feedback", ""))[:300]}
+    return grades
+
+
+# ── POST /assess/score ───────────────────────────────────────────────────────
+
+@router.post("/score")
+async def score_responses(request: Request):
+    """
+    Score MCQ responses and run item analysis.
+    Send JSON (`ScoreRequest`) or a `text/csv` body: header `student,<item>...`,
+    optional `key` row, one row per student; cells are A-D / अ-द / 0-3.
+    """
+    body = await request.body()
+    if "csv" in request.headers.get("content-type", ""):
+        try:
+            labels, students, key, responses = parse_csv(body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError) as e:
+            return _invalid(f"CSV पढ़ने में त्रुटि: {str(e)}")
+        # A blank or unknown key cell parses to BLANK, which the model would reject as an index
+        if key and any(k < 0 for k in key):
+            return _invalid(INCOMPLETE_KEY)
+        try:
+            req = ScoreRequest(responses=[], key=key or [], item_ids=labels, student_ids=students)
+        except ValidationError as e:
+            return _invalid(f"अमान्य अनुरोध: {str(e)}")
+    else:
+        try:
+            req = ScoreRequest.model_validate(json.loads(body or b"{}"))
+        except (json.JSONDecodeError, UnicodeDecodeError, ValidationError) as e:
+            return _invalid(f"अमान्य अनुरोध: {str(e)}")
+        responses = [[parse_cell(c) for c in row] for row in req.responses]
+        labels = req.item_ids
+
+    n_items = len(req.key) or len(req.item_ids)
+    if not responses or not n_items:
+        return _invalid("उत्तर और उत्तर कुंजी (key या item_ids) आवश्यक हैं।")
+    if len(responses) * n_items > MAX_CELLS:
+        return _invalid(f"अधिकतम {MAX_CELLS} उत्तर एक बार में स्वीकार्य हैं।")
+
+    key = [parse_cell(k) for k in req.key] if req.key else await _key_from_bank(req.item_ids)
+    if any(k < 0 for k in key):
+        return _invalid(INCOMPLETE_KEY)
+    if any(k >= req.n_options for k in key):
+        return _invalid(f"उत्तर कुंजी में विकल्प {req.n_options} विकल्पों की सीमा से बाहर है।")
+    responses = [row[:n_items] + [-1] * (n_items - len(row)) for row in responses]
+
+    try:
+        a = analyze(responses, key, req.n_options)
+    except ValueError as e:
+        return _invalid(str(e))
+
+    labels = labels if len(labels) == n_items else [f"q{j + 1}" for j in range(n_items)]
+    students = req.student_ids if len(req.student_ids) == a["n_students"] else [
+        str(i + 1) for i in range(a["n_students"])]
+
+    retagged = 0
+    items = []
+    for j in range(n_items):
+        stats = {
+            "p": round(float(a["p"][j]), 4),
+            "discrimination": round(float(a["discrimination"][j]), 4),
+            "point_biserial": round(float(a["point_biserial"][j]), 4),
+        }
+        tag = tag_difficulty(stats["p"])
+        if req.tag_bank and a["n_students"] >= MIN_TAG_RESPONSES:
+            retagged += await question_store.set_difficulty(labels[j], tag, {**stats, "n": a["n_students"]})
+        items.append({
+            "item": labels[j],
+            "correct": key[j],
+            **stats,
+            "difficulty": tag,
+            "options": a["option_counts"][j].tolist(),
+            "blank": int(a["blank_counts"][j]),
+        })
+
+    logger.info(f"Scored {a['n_students']} students × {n_items} items; retagged {retagged} bank items")
+    totals = a["totals"].tolist()
+    return {
+        "summary": {**a["summary"], "n_students": a["n_students"], "n_items": n_items},
+        "students": [
+            {"student": s, "score": t, "percent": round(100 * t / n_items, 1)}
+            for s, t in zip(students, totals)
+        ],
+        "items": items,
+        "retagged": retagged,
+    }
+
+
+# ── POST /assess/grade ───────────────────────────────────────────────────────
+
+@router.post("/grade", dependencies=[Depends(attribute("assess.grade"))])
+async def grade_answers(req: GradeRequest):
+    """
+    Grade descriptive answers against a model answer and rubric.
+    Unique answers are packed into token-budgeted chunks graded concurrently;
+    cached and duplicate answers never reach the AI.
+    """
+    item = await question_store.fetch(req.item_id) if req.item_id else None
+    if item:
+        req.question = req.question or item.get("question", "")
+        if not req.model_answer and isinstance(item.get("answer"), str):
+            req.model_answer = item["answer"]
+    if not req.question or not req.answers:
+        return {"error": "प्रश्न और छात्रों के उत्तर आवश्यक हैं।"}
+    if len(req.answers) > MAX_ANSWERS:
+        return {"error": f"एक बार में अधिकतम {MAX_ANSWERS} उत्तर।"}
+
+    max_marks = req.max_marks or (ITEM_MARKS.get(item["type"], 5) if item else 5)
+    rubric = req.rubric or DEFAULT_RUBRIC
+
+    keys = []
+    pending: Dict[str, str] = {}
+    grades: Dict[str, dict] = {}
+    for a in req.answers:
+        norm = _normalize_answer(a.answer)
+        key = make_key(req.question, req.model_answer, max_marks, rubric, norm)
+        keys.append(key)
+        if not norm:
+            grades[key] = {"marks": 0, "feedback": "उत्तर नहीं लिखा गया।"}
+        elif key not in grades and key not in pending:
+            cached = await _grade_cache.get(key)
+            if cached is not None:
+                grades[key] = {**cached, "source": "cache"}
+            else:
+                pending[key] = a.answer.strip()
+
+    llm_calls = 0
+    if pending:
+        client, deployment, _ = get_ai_client("gpt-4o-mini")
+        if not client:
+            return {"error": "Azure OpenAI credentials not configured"}
+        chunks = _chunk(list(pending.items()))
+        llm_calls = len(chunks)
+        logger.info(f"Grading {len(req.answers)} answers: {len(pending)} unique uncached in {llm_calls} chunks")
+        results = await asyncio.gather(
+            *(_grade_chunk(client, deployment, req, rubric, max_marks, c) for c in chunks),
+            return_exceptions=True,
+        )
+        for r in results:
+            if isinstance(r, Exception):
+                logger.error(f"Grading chunk failed: {r}")
+                continue
+            for key, grade in r.items():
+                await _grade_cache.set(key, grade)
+                grades[key] = {**grade, "source": "ai"}
+
+    out = []
+    seen = set()
+    for a, key in zip(req.answers, keys):
+        grade = grades.get(key)
+        if grade is None:
+            out.append({"student_id": a.student_id, "status": "error", "marks": None, "max_marks": max_marks})
+            continue
+        source = grade.get("source", "empty")
+        if key in seen and source == "ai":
+            source = "duplicate"
+        seen.add(key)
+        out.append({
+            "student_id": a.student_id,
+            "status": "ok",
+            "marks": grade["marks"],
+            "max_marks": max_marks,
+            "feedback": grade["feedback"],
+            "source": source,
+        })
+
+    graded = [r["marks"] for r in out if r["status"] == "ok"]
+    return {
+        "question": req.question,
+        "max_marks": max_marks,
+        "results": out,
+        "summary": {
+            "answers": len(req.answers),
+            "graded": len(graded),
+            "failed": len(out) - len(graded),
+            "llm_calls": llm_calls,
+            "average": round(sum(graded) / len(graded), 2) if graded else None,
+        },
+    }
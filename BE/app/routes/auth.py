@@ -1,55 +1,85 @@
 """
 शिक्षक सहायक — Auth Routes (Supabase PostgreSQL)
 Signup & Login setup adapted from Medgardian
+Queries run on the shared asyncpg pool (app.services.db), opened in the app lifespan.
+Login and signup also return signed access/refresh tokens (app.services.sessions),
+and are rate limited per IP and per email before any hashing or query runs.
+Refresh tokens are single use: each jti is stored in refresh_tokens and spent
+by /auth/refresh; presenting a spent one revokes every session of that user.
 """
-import os
-import hashlib
-import psycopg2
-import psycopg2.extras
-from fastapi import APIRouter
+import math
+import uuid
+from fastapi import APIRouter, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from dotenv import load_dotenv
 
 from app.logger import logger
+from app.services.db import DatabaseUnavailable, database
+from app.services.passwords import HashingBusy, hasher
+from app.services.ratelimit import login_limiter, signup_limiter
+from app.services.sessions import REFRESH_TTL, signer
 
-load_dotenv()
+try:
+    from asyncpg import UniqueViolationError
+except ImportError:
+    UniqueViolationError = None
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-def _get_db():
-    db_url = os.getenv("DATABASE_URL")
-    if not db_url:
-        raise Exception("DATABASE_URL is not set. Please add your Supabase connection string to the .env file.")
-    # Return a connection with a cursor factory that allows dict-like access (like sqlite3.Row)
-    conn = psycopg2.connect(db_url, cursor_factory=psycopg2.extras.DictCursor, connect_timeout=5)
-    return conn
+CREATE_USERS = """
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        phone TEXT NOT NULL,
+        password_hash TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+INSERT_USER = ("INSERT INTO users (name, email, phone, password_hash) VALUES ($1, $2, $3, $4) "
+               "RETURNING id, name, email, phone")
+SELECT_USER = "SELECT id, name, email, phone, password_hash FROM users WHERE email = $1"
+SELECT_USER_BY_ID = "SELECT id, name, email, phone FROM users WHERE id = $1"
+# Only replaces the hash the login was checked against, so a concurrent password change wins
+REHASH_USER = "UPDATE users SET password_hash = $1 WHERE id = $2 AND password_hash = $3"
+
+CREATE_REFRESH_TOKENS = """
+    CREATE TABLE IF NOT EXISTS refresh_tokens (
+        jti TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        expires_at TIMESTAMPTZ NOT NULL,
+        used_at TIMESTAMPTZ
+    )
+"""
+CREATE_REFRESH_TOKENS_USER = "CREATE INDEX IF NOT EXISTS refresh_tokens_user ON refresh_tokens(user_id)"
+INSERT_REFRESH = ("INSERT INTO refresh_tokens (jti, user_id, expires_at) "
+                  "VALUES ($1, $2, now() + make_interval(secs => $3))")
+# Atomic: of two concurrent refreshes with one token, only one gets the row
+SPEND_REFRESH = ("UPDATE refresh_tokens SET used_at = now() WHERE jti = $1 AND user_id = $2 "
+                 "AND used_at IS NULL AND expires_at > now() RETURNING jti")
+# A spent token presented again means it was copied: end every session of that user
+REVOKE_ON_REUSE = ("UPDATE refresh_tokens SET used_at = now() WHERE user_id = $1 AND used_at IS NULL "
+                   "AND EXISTS (SELECT 1 FROM refresh_tokens WHERE jti = $2 AND used_at IS NOT NULL)")
+PURGE_REFRESH = "DELETE FROM refresh_tokens WHERE expires_at < now()"
+
+BUSY_MESSAGE = "सर्वर व्यस्त है, कृपया थोड़ी देर बाद प्रयास करें।"
+SIGNING_KEY_MISSING = "AUTH_SIGNING_KEYS is not set. Please add a token signing key to the .env file."
 
-def _init_db():
+
+async def init_db():
+    """Create the users table; called from the app lifespan once the pool is open."""
+    if not database.configured:
+        return
     try:
-        conn = _get_db()
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                name TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                phone TEXT NOT NULL,
-                password_hash TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.commit()
-        cursor.close()
-        conn.close()
+        async with database.acquire() as conn:
+            await conn.execute(CREATE_USERS)
+            await conn.execute(CREATE_REFRESH_TOKENS)
+            await conn.execute(CREATE_REFRESH_TOKENS_USER)
+            await conn.execute(PURGE_REFRESH)
     except Exception as e:
         logger.error(f"PostgreSQL initialization deferred: {e}", exc_info=True)
 
-# Initialize DB on start if DB_URL is present
-_init_db()
-
-def _hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
-
 # ── Models ──
 
 class SignupRequest(BaseModel):
@@ -62,94 +92,183 @@ class LoginRequest(BaseModel):
     email: str
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class AuthResponse(BaseModel):
     success: bool
     message: str
     user: dict = None
+    tokens: dict = None
+
+
+def _too_many_attempts(retry_after: int) -> JSONResponse:
+    minutes = max(1, math.ceil(retry_after / 60))
+    body = AuthResponse(success=False, message=f"बहुत अधिक प्रयास। कृपया {minutes} मिनट बाद फिर से प्रयास करें।")
+    return JSONResponse(jsonable_encoder(body), status_code=429, headers={"Retry-After": str(retry_after)})
+
+
+async def _issue_tokens(conn, user) -> dict:
+    """Token pair for `user`, with the refresh token's jti recorded so it can be spent once."""
+    jti = uuid.uuid4().hex
+    await conn.execute(INSERT_REFRESH, jti, user["id"], float(REFRESH_TTL))
+    return signer.issue(user, jti=jti)
 
 # ── Routes ──
 
 @router.post("/signup", response_model=AuthResponse)
-def signup(req: SignupRequest):
+async def signup(req: SignupRequest, request: Request):
     """Register a new user."""
+    if not signer.configured:
+        return AuthResponse(success=False, message=SIGNING_KEY_MISSING)
     if not req.name or not req.email or not req.phone or not req.password:
         return AuthResponse(success=False, message="सभी फ़ील्ड आवश्यक हैं।")
 
     if len(req.password) < 6:
         return AuthResponse(success=False, message="पासवर्ड कम से कम 6 अक्षरों का होना चाहिए।")
 
+    email = req.email.strip().lower()
+    retry_after = await signup_limiter.check(request, email)
+    if retry_after:
+        logger.warning(f"Signup rate limited for email: {email}")
+        return _too_many_attempts(retry_after)
+    logger.info(f"Signup attempt for email: {email}")
     try:
-        logger.info(f"Signup attempt for email: {req.email.strip().lower()}")
-        conn = _get_db()
-    except Exception as e:
-        logger.error(f"Failed to connect to database during signup: {e}", exc_info=True)
-        return AuthResponse(success=False, message=str(e))
-
+        # Hash before borrowing a connection: the pool is not held while scrypt runs
+        password_hash = await hasher.hash(req.password)
+    except HashingBusy:
+        logger.warning(f"Signup deferred: password hashing queue full ({email})")
+        return AuthResponse(success=False, message=BUSY_MESSAGE)
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO users (name, email, phone, password_hash) VALUES (%s, %s, %s, %s) RETURNING id, name, email, phone",
-            (req.name.strip(), req.email.strip().lower(), req.phone.strip(), _hash_password(req.password))
-        )
-        user = cursor.fetchone()
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        logger.info(f"User {user['id']} successfully registered: {user['email']}")
-        return AuthResponse(
-            success=True,
-            message="खाता सफलतापूर्वक बन गया।",
-            user=dict(user) if user else None
-        )
-    except psycopg2.IntegrityError:
-        logger.warning(f"Signup failed: Email already exists ({req.email.strip().lower()})")
-        conn.close()
-        return AuthResponse(success=False, message="यह ईमेल पहले से पंजीकृत है। कृपया लॉग इन करें।")
+        async with database.acquire() as conn:
+            async with conn.transaction():
+                user = await conn.fetchrow(INSERT_USER, req.name.strip(), email, req.phone.strip(), password_hash)
+                tokens = await _issue_tokens(conn, user)
+    except DatabaseUnavailable as e:
+        logger.error(f"Failed to connect to database during signup: {e}")
+        return AuthResponse(success=False, message=str(e))
     except Exception as e:
+        if UniqueViolationError is not None and isinstance(e, UniqueViolationError):
+            logger.warning(f"Signup failed: Email already exists ({email})")
+            return AuthResponse(success=False, message="यह ईमेल पहले से पंजीकृत है। कृपया लॉग इन करें।")
         logger.error(f"Signup error: {str(e)}", exc_info=True)
-        conn.close()
         return AuthResponse(success=False, message=f"त्रुटि: {str(e)}")
 
+    logger.info(f"User {user['id']} successfully registered: {user['email']}")
+    return AuthResponse(
+        success=True,
+        message="खाता सफलतापूर्वक बन गया।",
+        user=dict(user) if user else None,
+        tokens=tokens,
+    )
+
 
 @router.post("/login", response_model=AuthResponse)
-def login(req: LoginRequest):
+async def login(req: LoginRequest, request: Request):
     """Authenticate user."""
+    if not signer.configured:
+        return AuthResponse(success=False, message=SIGNING_KEY_MISSING)
     if not req.email or not req.password:
         return AuthResponse(success=False, message="ईमेल और पासवर्ड आवश्यक हैं।")
 
+    email = req.email.strip().lower()
+    retry_after = await login_limiter.check(request, email)
+    if retry_after:
+        logger.warning(f"Login rate limited for email: {email}")
+        return _too_many_attempts(retry_after)
+    logger.info(f"Login attempt for email: {email}")
     try:
-        logger.info(f"Login attempt for email: {req.email.strip().lower()}")
-        conn = _get_db()
-    except Exception as e:
-        logger.error(f"Failed to connect to database during login: {e}", exc_info=True)
+        async with database.acquire() as conn:
+            user = await conn.fetchrow(SELECT_USER, email)
+    except DatabaseUnavailable as e:
+        logger.error(f"Failed to connect to database during login: {e}")
         return AuthResponse(success=False, message=str(e))
-
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id, name, email, phone, password_hash FROM users WHERE email = %s",
-            (req.email.strip().lower(),)
-        )
-        user = cursor.fetchone()
-        cursor.close()
-        conn.close()
     except Exception as e:
         logger.error(f"Login database error: {str(e)}", exc_info=True)
         return AuthResponse(success=False, message=f"त्रुटि: {str(e)}")
 
     if not user:
-        logger.warning(f"Login failed: No account found for email {req.email.strip().lower()}")
+        logger.warning(f"Login failed: No account found for email {email}")
         return AuthResponse(success=False, message="इस ईमेल से कोई खाता नहीं मिला।")
 
-    if user["password_hash"] != _hash_password(req.password):
-        logger.warning(f"Login failed: Incorrect password for email {req.email.strip().lower()}")
+    try:
+        ok, needs_rehash = await hasher.verify(req.password, user["password_hash"])
+    except HashingBusy:
+        logger.warning(f"Login deferred: password hashing queue full ({email})")
+        return AuthResponse(success=False, message=BUSY_MESSAGE)
+
+    if ok and needs_rehash:
+        # Legacy SHA-256 (or old-cost) hash: replace it now that the password is known
+        try:
+            new_hash = await hasher.hash(req.password)
+            async with database.acquire() as conn:
+                await conn.execute(REHASH_USER, new_hash, user["id"], user["password_hash"])
+            hasher.rehashes += 1
+            logger.info(f"Password hash upgraded for user {user['id']}")
+        except Exception as e:
+            # The login itself succeeded; the upgrade is retried next time
+            logger.warning(f"Password rehash skipped for user {user['id']}: {type(e).__name__}: {e}")
+
+    if not ok:
+        logger.warning(f"Login failed: Incorrect password for email {email}")
         return AuthResponse(success=False, message="गलत पासवर्ड।")
 
+    try:
+        async with database.acquire() as conn:
+            tokens = await _issue_tokens(conn, user)
+    except DatabaseUnavailable as e:
+        logger.error(f"Failed to connect to database while issuing tokens: {e}")
+        return AuthResponse(success=False, message=str(e))
+    except Exception as e:
+        logger.error(f"Login token error: {str(e)}", exc_info=True)
+        return AuthResponse(success=False, message=f"त्रुटि: {str(e)}")
+
     logger.info(f"Login successful for user: {user['email']}")
 
     return AuthResponse(
         success=True,
         message="लॉगिन सफल।",
-        user={"id": user["id"], "name": user["name"], "email": user["email"], "phone": user["phone"]}
+        user={"id": user["id"], "name": user["name"], "email": user["email"], "phone": user["phone"]},
+        tokens=tokens,
     )
+
+
+@router.post("/refresh", response_model=AuthResponse)
+async def refresh(req: RefreshRequest):
+    """Exchange a refresh token for a new token pair; each refresh token works once."""
+    if not signer.configured:
+        return AuthResponse(success=False, message=SIGNING_KEY_MISSING)
+    expired = "सत्र समाप्त हो गया। कृपया फिर से लॉग इन करें।"
+    claims = signer.verify(req.refresh_token, kind="refresh")
+    if claims is None or not claims.get("jti"):
+        return AuthResponse(success=False, message=expired)
+
+    user_id = int(claims["sub"])
+    try:
+        async with database.acquire() as conn:
+            async with conn.transaction():
+                if await conn.fetchval(SPEND_REFRESH, claims["jti"], user_id) is None:
+                    revoked = await conn.execute(REVOKE_ON_REUSE, user_id, claims["jti"])
+                    user = tokens = None
+                else:
+                    revoked = None
+                    user = await conn.fetchrow(SELECT_USER_BY_ID, user_id)
+                    tokens = await _issue_tokens(conn, user) if user else None
+    except DatabaseUnavailable as e:
+        logger.error(f"Failed to connect to database during token refresh: {e}")
+        return AuthResponse(success=False, message=str(e))
+    except Exception as e:
+        logger.error(f"Token refresh database error: {str(e)}", exc_info=True)
+        return AuthResponse(success=False, message=f"त्रुटि: {str(e)}")
+
+    if tokens is None and revoked is not None:
+        # Unknown, expired or already spent
+        logger.warning(f"Token refresh refused for user {user_id}: refresh token not usable ({revoked})")
+        return AuthResponse(success=False, message=expired)
+
+    # Deleted accounts stop getting new access tokens
+    if not user:
+        logger.warning(f"Token refresh failed: user {user_id} no longer exists")
+        return AuthResponse(success=False, message="इस ईमेल से कोई खाता नहीं मिला।")
+
+    return AuthResponse(success=True, message="सत्र नवीनीकृत।", user=dict(user), tokens=tokens)
@@ -2,13 +2,13 @@
 शिक्षक सहायक — AI Chatbot Route (Hindi + English)
 POST /chat/ask — AI chatbot for Bihar Board teachers
 """
-import os
-from dotenv import load_dotenv
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from openai import AzureOpenAI
 
 from app.logger import logger
+from app.services.ai import get_ai_client, complete
+from app.services.cache import SharedCache, make_key
+from app.services.sessions import attribute
 
 router = APIRouter(prefix="/chat", tags=["चैटबॉट (Chatbot)"])
 
@@ -76,6 +76,11 @@ SCERT Bihar – Project Based Learning (PBL):
 - **गृहकार्य:** ...
 """
 
+# First-turn questions (no history) are answered identically for everyone;
+# repeat questions are served from the shared cache for a day.
+_answer_cache = SharedCache("chat.answer", maxsize=2000, ttl=24 * 3600)
+
+
 class ChatRequest(BaseModel):
     message: str
     history: list = []
@@ -86,45 +91,44 @@ class ChatResponse(BaseModel):
     error: str = None
 
 
-@router.post("/ask", response_model=ChatResponse)
+@router.post("/ask", response_model=ChatResponse, dependencies=[Depends(attribute("chat.ask"))])
 async def chat_ask(req: ChatRequest):
     """AI chatbot — ask any teaching question (Hindi/English)."""
-    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "").strip('"').strip("'")
-    api_key = os.getenv("AZURE_OPENAI_API_KEY", "").strip('"').strip("'")
-    deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5-mini").strip('"').strip("'")
-    api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview").strip('"').strip("'")
-
-    if not endpoint or not api_key:
-        load_dotenv(os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
-        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "").strip('"').strip("'")
-        api_key = os.getenv("AZURE_OPENAI_API_KEY", "").strip('"').strip("'")
-        
-    if not endpoint or not api_key:
+    client, deployment, _ = get_ai_client("gpt-5-mini")
+    if not client:
         logger.error("Azure OpenAI credentials not configured.")
         return ChatResponse(reply="", error="Azure OpenAI credentials not configured")
 
-    try:
-        client = AzureOpenAI(
-            azure_endpoint=endpoint, api_key=api_key, api_version=api_version,
-        )
+    async def answer():
         messages = [{"role": "system", "content": SYSTEM_PROMPT}]
         for msg in req.history[-10:]:
             messages.append({"role": msg.get("role", "user"), "content": msg.get("content", "")})
         messages.append({"role": "user", "content": req.message})
 
         logger.info(f"Sending LLM request to {deployment} with {len(messages)} messages...")
-        response = client.chat.completions.create(
-            model=deployment, messages=messages, max_completion_tokens=3000,
+        response = await complete(
+            client, model=deployment, messages=messages, max_completion_tokens=3000,
         )
         logger.info(f"Successfully received LLM response length: {len(response.choices[0].message.content or '')}")
         reply = response.choices[0].message.content
-        if not reply:
-            choice = response.choices[0]
-            if hasattr(choice.message, "refusal") and choice.message.refusal:
-                reply = f"AI ने उत्तर देने से मना किया: {choice.message.refusal}"
-            else:
-                reply = "⚠️ AI ने खाली उत्तर दिया। कृपया सरल प्रश्न पूछें।"
-        return ChatResponse(reply=reply)
+        if reply:
+            return {"reply": reply, "ok": True}
+        choice = response.choices[0]
+        if hasattr(choice.message, "refusal") and choice.message.refusal:
+            reply = f"AI ने उत्तर देने से मना किया: {choice.message.refusal}"
+        else:
+            reply = "⚠️ AI ने खाली उत्तर दिया। कृपया सरल प्रश्न पूछें।"
+        return {"reply": reply, "ok": False}
+
+    try:
+        if req.history:
+            result = await answer()
+        else:
+            result, hit = await _answer_cache.get_or_load(
+                make_key(req.message), answer, should_cache=lambda r: r["ok"])
+            if hit:
+                logger.info("Serving chat answer from cache.")
+        return ChatResponse(reply=result["reply"])
     except Exception as e:
         logger.error(f"AI Service Error during chat_ask: {str(e)}", exc_info=True)
         return ChatResponse(reply="", error=f"AI सेवा त्रुटि: {str(e)}")
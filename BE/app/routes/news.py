@@ -1,24 +1,41 @@
 """
 शिक्षक सहायक — News Feed (Tavily Search API)
 GET /news/feed — Bihar teacher & education news in Hindi
+                 (?before=&limit=&section= pages the archive)
+GET /news/article?url= — Compact reader-mode text of a news article
 """
-import os, time, httpx, re
-from fastapi import APIRouter
+import os, time, httpx, re, asyncio
+from typing import Optional
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
 
 from app.logger import logger
+from app.services.refresher import Feed, refresher
+from app.services.dedup import dedupe_sections, canonical_url
+from app.services.news_archive import news_archive
+from app.services.quota import governor
+from app.services.cache import SharedCache
+from app.services.http import fetch_capped
+from app.services.reader import extract
 
 router = APIRouter(prefix="/news", tags=["समाचार (News)"])
 
-from typing import Any
-_cache: dict[str, Any] = {"data": None, "ts": 0}
 CACHE_TTL = 900
 
-TAVILY_URL = "https://api.tavily.com/search"
+# Last good results per section label, served (marked stale) when a query fails or misses the deadline
+_section_cache: dict[str, dict] = {}
+
+FEED_DEADLINE = float(os.getenv("NEWS_FEED_DEADLINE", "10"))   # seconds for the whole fan-out
+QUERY_TIMEOUT = 15
+PARTIAL_RETRY = 60   # a partial feed is only kept this long before retrying
+
+TAVILY_URL = os.getenv("TAVILY_URL", "https://api.tavily.com/search")
 
 QUERIES = [
-    {"label": "📚 बिहार शिक्षा समाचार", "query": "बिहार शिक्षा विभाग शिक्षक स्कूल ताज़ा खबर hindi", "max": 8},
-    {"label": "🇮🇳 भारत शिक्षा समाचार", "query": "भारत शिक्षा नीति NCERT ताज़ा समाचार hindi", "max": 5},
-    {"label": "📋 सरकारी योजनाएं", "query": "बिहार सरकारी शिक्षक वेतन पेंशन योजना खबर hindi", "max": 4},
+    {"key": "bihar", "label": "📚 बिहार शिक्षा समाचार", "query": "बिहार शिक्षा विभाग शिक्षक स्कूल ताज़ा खबर hindi", "max": 8},
+    {"key": "india", "label": "🇮🇳 भारत शिक्षा समाचार", "query": "भारत शिक्षा नीति NCERT ताज़ा समाचार hindi", "max": 5},
+    {"key": "schemes", "label": "📋 सरकारी योजनाएं", "query": "बिहार सरकारी शिक्षक वेतन पेंशन योजना खबर hindi", "max": 4},
 ]
 
 # Popular Hindi news domains to guide Tavily
@@ -37,69 +54,180 @@ def is_hindi(text):
     return bool(re.search(r'[\u0900-\u097F]', text))
 
 async def _search(client, api_key, query, max_results):
-    try:
-        resp = await client.post(TAVILY_URL, json={
-            "api_key": api_key, "query": query, "search_depth": "advanced",
-            "max_results": 20, "include_answer": False,
-            "include_domains": HINDI_DOMAINS,
-            "include_raw_content": False, "topic": "news",
-        })
-        resp.raise_for_status()
-        data = resp.json()
+    """Run one Tavily query; raises on transport/HTTP errors so callers can fall back."""
+    await governor.spend("news", "advanced")
+    resp = await client.post(TAVILY_URL, json={
+        "api_key": api_key, "query": query, "search_depth": "advanced",
+        "max_results": 20, "include_answer": False,
+        "include_domains": HINDI_DOMAINS,
+        "include_raw_content": False, "topic": "news",
+    })
+    resp.raise_for_status()
+    data = resp.json()
+    
+    filtered_results = []
+    for item in data.get("results", []):
+        title = item.get("title", "")
+        snippet = item.get("content", "")
         
-        filtered_results = []
-        for item in data.get("results", []):
-            title = item.get("title", "")
-            snippet = item.get("content", "")
-            
-            # Skip if title or snippet is empty
-            if not title or not snippet: continue
-            
-            # Ensure at least part of the result is actually in Hindi
-            if not is_hindi(title) and not is_hindi(snippet): continue
+        # Skip if title or snippet is empty
+        if not title or not snippet: continue
+        
+        # Ensure at least part of the result is actually in Hindi
+        if not is_hindi(title) and not is_hindi(snippet): continue
+        
+        filtered_results.append({
+            "title": title, 
+            "url": item.get("url", ""),
+            "snippet": snippet[:300],
+            "source": item.get("url", "").split("/")[2] if "/" in item.get("url", "") else "",
+            "score": item.get("score", 0),
+            "published_date": item.get("published_date", ""),
+        })
+        if len(filtered_results) >= max_results:
+            break
             
-            filtered_results.append({
-                "title": title, 
-                "url": item.get("url", ""),
-                "snippet": snippet[:300],
-                "source": item.get("url", "").split("/")[2] if "/" in item.get("url", "") else "",
-                "score": item.get("score", 0),
-                "published_date": item.get("published_date", ""),
-            })
-            if len(filtered_results) >= max_results:
-                break
-                
-        return filtered_results
-    except Exception:
-        return []
+    return filtered_results
 
 
-@router.get("/feed")
-async def news_feed():
-    """Fetch Bihar teacher & education news via Tavily."""
-    now = time.time()
-    if _cache["data"] and (now - _cache["ts"]) < CACHE_TTL:
-        logger.info("Serving news feed from cache.")
-        return {"source": "cache", "sections": _cache["data"]}
+async def _fetch_sections(api_key):
+    """
+    Query every section concurrently under FEED_DEADLINE. Sections that fail or
+    miss the deadline fall back to their last good results (stale) or to empty.
+    """
+    async with httpx.AsyncClient(timeout=QUERY_TIMEOUT) as client:
+        tasks = {
+            q["label"]: asyncio.create_task(_search(client, api_key, q["query"], q["max"]))
+            for q in QUERIES
+        }
+        await asyncio.wait(tasks.values(), timeout=FEED_DEADLINE)
+
+        sections = []
+        for q in QUERIES:
+            label, task = q["label"], tasks[q["label"]]
+            if task.done() and not task.cancelled() and task.exception() is None:
+                results = task.result()
+                _section_cache[label] = {"results": results, "ts": time.time()}
+                sections.append({"key": q["key"], "label": label, "results": results, "source": "tavily", "stale": False})
+                continue
+            if not task.done():
+                task.cancel()
+                logger.warning(f"News section '{label}' missed the {FEED_DEADLINE}s deadline")
+            else:
+                logger.warning(f"News section '{label}' failed: {task.exception()}")
+            prev = _section_cache.get(label) or next(
+                (s for s in (feed.data or []) if s["label"] == label and s["results"]), None)
+            sections.append({
+                "key": q["key"],
+                "label": label,
+                "results": prev["results"] if prev else [],
+                "source": "cache" if prev else "unavailable",
+                "stale": True,
+            })
+    return sections
 
+
+async def _load_feed():
+    """Refresher loader: one concurrent fan-out over QUERIES."""
     api_key = os.getenv("TAVILY_API_KEY", "")
     if not api_key:
+        raise RuntimeError("TAVILY_API_KEY not set")
+    logger.info("Fetching fresh news feed from Tavily API...")
+    sections = await _fetch_sections(api_key)
+    if not any(s["results"] for s in sections):
+        return None
+    sections = dedupe_sections(sections)
+    try:
+        await asyncio.to_thread(news_archive.upsert, sections)
+    except Exception as e:
+        logger.error(f"News archive upsert failed: {e}", exc_info=True)
+    return sections
+
+
+def _feed_ttl(sections):
+    # A partial feed is refreshed soon so the missing sections are retried
+    return CACHE_TTL if all(not s["stale"] for s in sections) else PARTIAL_RETRY
+
+
+feed = refresher.register(Feed("news", _load_feed, CACHE_TTL, ttl_for=_feed_ttl, governor=governor))
+
+
+@router.get("/feed")
+async def news_feed(
+    before: Optional[str] = Query(None, description="Cursor from a previous page's `next`"),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    section: Optional[str] = Query(None, description="bihar | india | schemes"),
+):
+    """
+    Bihar teacher & education news, always served from the current snapshot.
+    With `before`, `limit` or `section` it pages the archive of everything
+    previously fetched, newest first.
+    """
+    if before or limit or section:
+        try:
+            items, next_cursor = await asyncio.to_thread(news_archive.page, before, limit or 20, section)
+        except ValueError:
+            return JSONResponse(status_code=422, content={"error": "अमान्य `before` कर्सर — पिछले पेज का `next` भेजें।"})
+        return {"source": "archive", "items": items, "next": next_cursor}
+
+    if not os.getenv("TAVILY_API_KEY", ""):
         return {"error": "TAVILY_API_KEY not set", "sections": _fallback()}
 
+    sections = await feed.get()
+    if not sections:
+        return {"source": "fallback", "error": feed.last_error or "समाचार उपलब्ध नहीं", "sections": _fallback()}
+    return {
+        "source": "snapshot" if feed.origin == "disk" else "cache",
+        "age": int(feed.age() or 0),
+        "stale": feed.is_stale(),
+        "sections": sections,
+    }
+
+
+# Reader-mode articles are shared by all users for a day
+_article_cache = SharedCache("news.article", maxsize=500, ttl=24 * 3600)
+ARTICLE_MAX_BYTES = 2 * 1024 * 1024     # stop downloading a page after 2 MB
+
+
+def _allowed_article_url(url: str) -> bool:
+    """Only fetch pages from the news domains we search, never arbitrary hosts."""
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        return False
+    if parts.scheme not in ("http", "https") or parts.username or parts.password:
+        return False
+    return any(host == d.split("/")[0] or host.endswith("." + d.split("/")[0]) for d in HINDI_DOMAINS)
+
+
+async def _load_article(url: str):
+    # Redirects are followed only while they stay on the news domains
+    resp, body = await fetch_capped(url, ARTICLE_MAX_BYTES, allow=_allowed_article_url)
+    resp.raise_for_status()
+    html = body.decode(resp.encoding or "utf-8", errors="replace")
+    article = await asyncio.to_thread(extract, html, str(resp.url))
+    article.update({"url": url, "source": url.split("/")[2], "original_bytes": len(body)})
+    return article
+
+
+@router.get("/article")
+async def news_article(url: str = Query(..., description="Article URL from /news/feed")):
+    """
+    Reader-mode view of a news article for low-bandwidth reading: main text and
+    lead image only, fetched once and cached for all users.
+    """
+    if not _allowed_article_url(url):
+        return {"error": "यह स्रोत समर्थित नहीं है।"}
     try:
-        logger.info("Fetching fresh news feed from Tavily API...")
-        async with httpx.AsyncClient(timeout=15) as client:
-            sections = []
-            for q in QUERIES:
-                results = await _search(client, api_key, q["query"], q["max"])
-                sections.append({"label": q["label"], "results": results})
-        _cache["data"] = sections
-        _cache["ts"] = now
-        logger.info("Successfully fetched and cached fresh news feed.")
-        return {"source": "tavily", "sections": sections}
+        article, hit = await _article_cache.get_or_load(
+            canonical_url(url), lambda: _load_article(url), should_cache=lambda a: bool(a.get("text")))
     except Exception as e:
-        logger.error(f"Error fetching news feed via Tavily: {str(e)}", exc_info=True)
-        return {"source": "fallback", "error": str(e), "sections": _fallback()}
+        logger.warning(f"Reader fetch failed for {url}: {e}")
+        return {"error": f"लेख लोड नहीं हो सका: {str(e)}", "url": url}
+    if not article.get("text"):
+        return {"error": "लेख का पाठ नहीं मिला।", "url": url}
+    return {"source": "cache" if hit else "fetched", "article": article}
 
 
 def _fallback():
@@ -1,18 +1,37 @@
 """
 शिक्षक सहायक — Notice Route
-Important Bihar Education Dept notices for teachers fetched via Tavily
+Important Bihar Education Dept notices for teachers, scraped from the
+department portals (Tavily search as the fallback)
 """
-import os, time, httpx
-from typing import Any, Optional
-from fastapi import APIRouter
+import os, re, time, json, asyncio, httpx
+from typing import Optional
+from urllib.parse import urlsplit
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Query, Header
+from fastapi.responses import StreamingResponse
 
 from app.logger import logger
+from app.services.refresher import Feed, refresher
+from app.services.quota import governor
+from app.services.notice_store import notice_store, notice_id
+from app.services.portals import portal_scraper, PORTALS, PORTAL_INTERVAL
+from app.services.categorizer import classify
+from app.services.cache import SharedCache
+from app.services.http import fetch_capped
+from app.services.notice_document import extract_document
+from app.services.workers import run_in_process
+from app.services.pubsub import notice_hub, RESYNC
 
 router = APIRouter(prefix="/notice", tags=["सूचना (Notice)"])
 
-from typing import Any
-_cache: dict[str, Any] = {"data": None, "ts": 0}
 CACHE_TTL = 3600 # 1 hour cache for notices
+DOC_MAX_BYTES = 10 * 1024 * 1024   # linked circulars/PDFs are read up to 10 MB
+DOC_RETRY = 6 * 3600               # retry a failed document fetch after 6 hours
+EXTRACT_WORKERS = int(os.getenv("NOTICE_EXTRACT_WORKERS", "2"))
+HEARTBEAT = 15                     # seconds between SSE keep-alive comments
+
+# Single-flight for document fetches: one download per notice across workers
+_doc_cache = SharedCache("notice.document", maxsize=100, ttl=DOC_RETRY)
 
 TAVILY_URL = "https://api.tavily.com/search"
 
@@ -26,12 +45,52 @@ DOMAINS = [
 
 NOTICE_QUERY = "Bihar Education Department Teacher Notice latest circular order"
 
+# Linked documents are only downloaded from the portals and Bihar government sites
+DOC_HOSTS = {"bihar.gov.in", "bih.nic.in"} | {urlsplit(p.home).hostname for p in PORTALS}
+
+
+def _allowed_document_url(url: str) -> bool:
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        return False
+    if parts.scheme not in ("http", "https") or parts.username or parts.password:
+        return False
+    return any(host == h or host.endswith("." + h) for h in DOC_HOSTS)
+
+def _source_for(url: str) -> str:
+    domain = url.split("/")[2] if "/" in url else "bihar.gov.in"
+    if "eshikshakosh" in domain: return "ई-शिक्षाकोष पोर्टल"
+    elif "bpsc" in domain: return "BPSC"
+    elif "madarsa" in domain: return "मदरसा बोर्ड"
+    return "शिक्षा विभाग, बिहार"
+
+
+def _format_notice(title: str, snippet: str, url: str, date: str, source: Optional[str] = None) -> dict:
+    """Notice card from a Tavily result or a scraped portal link."""
+    source = source or _source_for(url)
+    labels = classify(title + "\n" + snippet)
+    body = f"{snippet}\n\n" if snippet else ""
+    return {
+        "id": notice_id(url),
+        "url": url,
+        "title": title[:100] + "..." if len(title) > 100 else title,
+        **labels,
+        "date": date or "Recently",
+        "source": source,
+        "summary": (snippet or title)[:150] + "...",
+        "content": f"## {title}\n\n**Source:** [{source}]({url})\n\n{body}[यहाँ पूरा नोटिस पढ़ें (Click to read full notice)]({url})"
+    }
+
+
 async def _fetch_notices(client, api_key):
     try:
         logger.info("Fetching notices via Tavily advanced search...")
         # We append domains to the query to force Tavily to search them
         query_with_domains = NOTICE_QUERY + " " + " OR ".join([f"site:{d}" for d in DOMAINS])
         
+        await governor.spend("notices", "advanced")
         resp = await client.post(TAVILY_URL, json={
             "api_key": api_key, "query": query_with_domains, "search_depth": "advanced",
             "max_results": 10, "include_answer": False,
@@ -41,105 +100,225 @@ async def _fetch_notices(client, api_key):
         data = resp.json()
         
         formatted_notices = []
-        for i, item in enumerate(data.get("results", [])):
+        for item in data.get("results", []):
             title = item.get("title", "")
-            snippet = item.get("content", "")
             url = item.get("url", "")
-            
             if not title or not url: continue
-            
-            # Extract domain for source mapping
-            domain = url.split("/")[2] if "/" in url else "bihar.gov.in"
-            if "eshikshakosh" in domain: source = "ई-शिक्षाकोष पोर्टल"
-            elif "bpsc" in domain: source = "BPSC"
-            elif "madarsa" in domain: source = "मदरसा बोर्ड"
-            else: source = "शिक्षा विभाग, बिहार"
-            
-            # Categorize based on keywords in title/snippet
-            category = "शासनादेश"
-            icon = "📝"
-            text_lower = (title + " " + snippet).lower()
-            if "salary" in text_lower or "वेतन" in text_lower:
-                category = "वेतन"
-                icon = "💰"
-            elif "transfer" in text_lower or "स्थानांतरण" in text_lower:
-                category = "स्थानांतरण"
-                icon = "🔄"
-            elif "exam" in text_lower or "परीक्षा" in text_lower:
-                category = "परीक्षा"
-                icon = "📝"
-            elif "training" in text_lower or "प्रशिक्षण" in text_lower:
-                category = "प्रशिक्षण"
-                icon = "🎓"
-
-            formatted_notices.append({
-                "id": f"notice-{i}",
-                "title": title[:100] + "..." if len(title) > 100 else title,
-                "category": category,
-                "category_icon": icon,
-                "date": item.get("published_date", "Recently"),
-                "source": source,
-                "priority": "high" if "urgent" in text_lower or "तत्काल" in text_lower else "medium",
-                "summary": snippet[:150] + "...",
-                "content": f"## {title}\n\n**Source:** [{source}]({url})\n\n{snippet}\n\n[यहाँ पूरा नोटिस पढ़ें (Click to read full notice)]({url})"
-            })
+            formatted_notices.append(_format_notice(title, item.get("content", ""), url, item.get("published_date", "")))
             
         return formatted_notices
     except Exception as e:
         logger.error(f"Error fetching notices: {str(e)}", exc_info=True)
         return []
 
-@router.get("/feed")
-async def notice_feed(category: Optional[str] = None):
-    """Get all notices fetched dynamically, optionally filtered by category."""
-    now = time.time()
-    
+async def _load_portals():
+    """Refresher loader: poll the portal listing pages and store new notices."""
+    items = await portal_scraper.poll()
+    if items is None:
+        raise RuntimeError("all portal listing pages failed")
+    await asyncio.to_thread(
+        notice_store.upsert, [_format_notice(i["title"], "", i["url"], i["date"], i["source"]) for i in items])
+    return {"new": len(items), "polled": time.time()}
+
+
+async def _load_notices():
+    """Refresher loader for the notice feed: Tavily, only while the portals are unreachable."""
+    if portal_scraper.healthy() and notice_store.view():
+        return notice_store.view()
     api_key = os.getenv("TAVILY_API_KEY", "")
     if not api_key:
-        from app.data.notice_data import get_all_notices
-        notices = get_all_notices()
-        return {"notices": notices, "source": "mock_fallback"}
-
-    # Use cache if valid
-    if _cache["data"] and (now - _cache["ts"]) < CACHE_TTL:
-        logger.info("Serving notice feed from cache.")
-        notices = _cache["data"]
-    else:
-        async with httpx.AsyncClient(timeout=20) as client:
-            fetched_notices = await _fetch_notices(client, api_key)
-            if fetched_notices:
-                _cache["data"] = fetched_notices
-                _cache["ts"] = now
-                notices = fetched_notices
-            else:
-                # Fallback to mock if API fails to find anything
-                from app.data.notice_data import get_all_notices
-                notices = get_all_notices()
+        raise RuntimeError("TAVILY_API_KEY not set")
+    async with httpx.AsyncClient(timeout=20) as client:
+        notices = await _fetch_notices(client, api_key)
+    await asyncio.to_thread(notice_store.upsert, notices)
+    return notices
+
+
+portals_feed = refresher.register(Feed("portals", _load_portals, PORTAL_INTERVAL, snapshot=False))
+feed = refresher.register(Feed("notices", _load_notices, CACHE_TTL, governor=governor))
 
+
+@router.get("/feed")
+async def notice_feed(category: Optional[str] = None):
+    """Get the newest notices, optionally for one category (precomputed per category)."""
+    if os.getenv("TAVILY_API_KEY", ""):
+        await feed.get()  # kicks off a background refresh when stale
+
+    notices = notice_store.view(category if category != "सभी" else None)
+    if notices:
+        return {"notices": notices, "stale": feed.is_stale()}
+
+    # Nothing stored yet (no key, or the first fetch found nothing): mock notices
+    from app.data.notice_data import get_all_notices
+    notices = get_all_notices()
     if category and category != "सभी":
         notices = [n for n in notices if n.get("category") == category]
-        
-    return {"notices": notices}
+    return {"notices": notices, "source": "mock_fallback"}
+
+
+async def _load_document(url: str) -> dict:
+    # Redirects are followed only while they stay on the allowed hosts
+    resp, body = await fetch_capped(url, DOC_MAX_BYTES, allow=_allowed_document_url)
+    resp.raise_for_status()
+    return await run_in_process("notice-extract", EXTRACT_WORKERS, extract_document,
+                                body, resp.headers.get("content-type", ""), str(resp.url))
+
+
+def _document_content(notice: dict, doc: dict) -> str:
+    lines = [f"## {notice['title']}", ""]
+    if doc.get("order_number"):
+        lines.append(f"**आदेश संख्या:** {doc['order_number']}  ")
+    if doc.get("issue_date"):
+        lines.append(f"**दिनांक:** {doc['issue_date']}  ")
+    lines += [f"**Source:** [{notice['source']}]({notice['url']})", "", doc["text"], "",
+              f"[मूल नोटिस देखें (Open original notice)]({notice['url']})"]
+    return "\n".join(lines)
+
+
+async def _with_document(notice: dict) -> dict:
+    """Fetch and extract the linked page/PDF the first time a notice is opened."""
+    fetched = notice.get("fetched_at")
+    if not notice.get("url") or (fetched and (notice.get("text") or time.time() - fetched < DOC_RETRY)):
+        return notice
+    if not _allowed_document_url(notice["url"]):
+        # e.g. a Tavily result on another site: shown as found, never downloaded
+        return notice
+    try:
+        doc, _ = await _doc_cache.get_or_load(notice["id"], lambda: _load_document(notice["url"]))
+    except Exception as e:
+        logger.warning(f"Notice document fetch failed for {notice['url']}: {e}")
+        doc = {}
+    fields = {"fetched_at": time.time()}
+    if doc.get("text"):
+        fields.update(doc)
+        # Re-categorize on the full text, not just the title/snippet
+        fields.update(classify(notice["title"] + "\n" + doc["text"]))
+        fields["content"] = _document_content(notice, doc)
+    await asyncio.to_thread(notice_store.update, notice["id"], fields, bool(doc.get("text")))
+    return {**notice, **fields}
+
+
+def _day_ts(day: Optional[str]) -> Optional[float]:
+    """Epoch seconds for an ISO date (YYYY-MM-DD, IST midnight), None if absent or invalid."""
+    if not day:
+        return None
+    try:
+        return datetime.fromisoformat(day).replace(tzinfo=timezone(timedelta(hours=5, minutes=30))).timestamp()
+    except ValueError:
+        return None
+
+
+@router.get("/search")
+async def notice_search(
+    q: str = Query(..., min_length=1, max_length=200, description="खोज शब्द, जैसे 'DA 46%' या आदेश संख्या"),
+    category: Optional[str] = None,
+    since: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    until: Optional[str] = Query(None, description="YYYY-MM-DD (exclusive)"),
+    limit: int = Query(20, ge=1, le=50),
+):
+    """Search notice titles, summaries, order numbers and full circular text, best matches first."""
+    results = notice_store.search(q, category if category != "सभी" else None,
+                                  _day_ts(since), _day_ts(until), limit)
+    return {"query": q, "count": len(results), "notices": results}
+
+
+_WITHIN = re.compile(r"^\s*(\d{1,3})\s*([dwh]?)\s*$", re.I)
+_UNIT = {"": 86400, "d": 86400, "w": 7 * 86400, "h": 3600}
+
+
+def _mock_deadlines(within: float) -> list:
+    from app.data.notice_data import NOTICES
+    from app.services.dates import extract_dates, to_ts
+    now, out = time.time(), []
+    for n in NOTICES:
+        dates = extract_dates("\n".join((n["title"], n["summary"], n["content"])))
+        for d in dates["deadlines"]:
+            due = to_ts(d["date"])
+            if now <= due < now + within:
+                notice = {k: v for k, v in n.items() if k != "content"}
+                out.append({"deadline": d, "days_left": int((due - now) // 86400), "notice": notice})
+    return sorted(out, key=lambda x: x["deadline"]["date"])
+
+
+@router.get("/deadlines")
+async def notice_deadlines(
+    within: str = Query("30d", description="कितने समय में: '30d', '2w' या '48h'"),
+    category: Optional[str] = None,
+):
+    """Upcoming deadlines (last dates, application windows) from notices, soonest first."""
+    m = _WITHIN.match(within)
+    if not m:
+        return {"error": "within का प्रारूप '30d', '2w' या '48h' होना चाहिए।"}
+    seconds = min(int(m.group(1)) * _UNIT[m.group(2).lower()], 366 * 86400)
+    items = notice_store.deadlines(seconds) if notice_store.view() else _mock_deadlines(seconds)
+    if category and category != "सभी":
+        items = [i for i in items if i["notice"].get("category") == category]
+    return {"within": within, "count": len(items), "deadlines": items}
+
+
+def _sse(event: dict) -> str:
+    if event is RESYNC:
+        return "event: resync\ndata: {}\n\n"
+    data = json.dumps({"kind": event["kind"], "notice": event["notice"]}, ensure_ascii=False)
+    return f"id: {event['seq']}\nevent: notice\ndata: {data}\n\n"
+
+
+@router.get("/stream")
+async def notice_stream(
+    category: Optional[str] = None,
+    priority: Optional[str] = Query(None, description="'high' for urgent notices only"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events stream of new/updated notices (event: notice, id = change-log seq).
+    Reconnecting EventSource clients resume from Last-Event-ID; `event: resync` means
+    the client missed too much and should refetch /notice/feed.
+    """
+    category = category if category != "सभी" else None
+    sub = notice_hub.subscribe(category, priority)
+
+    async def events():
+        sent = 0
+        try:
+            yield "retry: 5000\n: subscribed\n\n"
+            if last_event_id and last_event_id.isdigit():
+                sent = int(last_event_id)
+                oldest, _ = notice_store.event_bounds()
+                if oldest and sent < oldest - 1:
+                    yield _sse(RESYNC)
+                for event in notice_store.events_since(sent):
+                    n = event["notice"]
+                    if (category and n.get("category") != category) or (priority and n.get("priority") != priority):
+                        continue
+                    sent = event["seq"]
+                    yield _sse(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if event is not RESYNC:
+                    if event["seq"] <= sent:
+                        continue  # already sent from the resume backlog
+                    sent = event["seq"]
+                yield _sse(event)
+        finally:
+            notice_hub.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @router.get("/{notice_id}")
 async def get_notice(notice_id: str):
-    """Get a single notice with full content."""
-    # Since notices are dynamically generated, we pull from cache to find the ID.
-    notices = _cache.get("data")
-    if not notices:
-        from app.data.notice_data import get_notice_by_id
-        notice = get_notice_by_id(notice_id)
-        if notice: return {"notice": notice}
-        return {"error": "सूचना नहीं मिली"}
-
-    for n in notices:
-        if n["id"] == notice_id:
-            return {"notice": n}
-            
-    # Fallback to mock if not in cache (e.g. server restarted)
+    """Get a single notice with full content (the linked circular is fetched once, then stored)."""
+    notice = notice_store.get(notice_id)
+    if notice:
+        return {"notice": await _with_document(notice)}
+
     from app.data.notice_data import get_notice_by_id
     notice = get_notice_by_id(notice_id)
     if notice: return {"notice": notice}
-    
+
     return {"error": "सूचना नहीं मिली"}
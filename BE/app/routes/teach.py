@@ -2,15 +2,26 @@
 शिक्षक सहायक — Teach Module Route
 GET  /teach/subjects        — List all subjects for all classes
 POST /teach/generate        — AI-generated questions (MCQ/descriptive/actual)
+POST /teach/generate/batch  — Many (subject, class, topic, mode) generations in one call
 POST /teach/question-bank   — Full Bihar Board-style question bank with answers
+POST /teach/paper           — Assemble question papers (sets A/B/C) to a marks blueprint
+POST /teach/lesson-plan     — SCERT-style lesson plan, streamed as Markdown
 """
 import os
 import json
-from dotenv import load_dotenv
-from fastapi import APIRouter
-from pydantic import BaseModel
-from openai import AzureOpenAI
+import asyncio
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
 from app.data.subjects_data import SUBJECTS, get_topics
+from app.services.ai import get_ai_client, complete, ai_slots
+from app.services.cache import SharedCache, make_key
+from app.services.paper import assemble
+from app.services.sessions import attribute
+from app.services.question_store import question_store, DIFFICULTIES, MODE_TO_TYPE, TYPE_TO_MODE, ITEM_MARKS
 
 from app.logger import logger
 
@@ -19,13 +30,21 @@ router = APIRouter(prefix="/teach", tags=["पढ़ाएं (Teach)"])
 
 # ── Pydantic models ──────────────────────────────────────────────────────────
 
+MAX_QUESTIONS = 20               # per generation; larger sets exceed the completion token budget
+
+
 class GenerateRequest(BaseModel):
     subject: str
     class_num: int
     topic: str = ""
-    count: int = 5
+    count: int = Field(5, ge=1, le=MAX_QUESTIONS)
     difficulty: str = "medium"   # easy, medium, hard
-    mode: str = "mcq"            # mcq, descriptive, actual
+    mode: str = "mcq"            # mcq, descriptive, actual, long
+
+
+class BatchGenerateRequest(BaseModel):
+    items: List[GenerateRequest]
+    stream: bool = True          # NDJSON lines in completion order
 
 
 class QuestionBankRequest(BaseModel):
@@ -34,22 +53,64 @@ class QuestionBankRequest(BaseModel):
     topic: str = ""
 
 
+MAX_SECTION_ITEMS = 100         # questions per paper section
+MAX_ITEM_MARKS = 20
+MAX_SECTIONS = 6
+
+
+class PaperSection(BaseModel):
+    type: str                    # objective, short, long
+    count: int = Field(ge=1, le=MAX_SECTION_ITEMS)
+    marks: int = Field(0, ge=0, le=MAX_ITEM_MARKS)   # per question; 0 = Bihar Board default for the type
+
+
+class PaperRequest(BaseModel):
+    subject: str
+    class_num: int
+    topics: List[str] = []
+    sections: List[PaperSection] = Field([
+        PaperSection(type="objective", count=20, marks=1),
+        PaperSection(type="short", count=5, marks=2),
+        PaperSection(type="long", count=4, marks=5),
+    ], min_length=1, max_length=MAX_SECTIONS)
+    difficulty_mix: Dict[str, float] = {"easy": 0.3, "medium": 0.4, "hard": 0.3}
+    total_marks: Optional[int] = None
+    sets: int = Field(1, ge=1, le=3)   # non-overlapping sets (A/B/C)
+    fill_gaps: bool = True       # call the AI only for items the pool cannot supply
+    seed: Optional[int] = None
+
+    @field_validator("difficulty_mix")
+    @classmethod
+    def _valid_mix(cls, mix: Dict[str, float]) -> Dict[str, float]:
+        unknown = set(mix) - set(DIFFICULTIES)
+        if unknown:
+            raise ValueError(f"unknown difficulties {sorted(unknown)}; use {list(DIFFICULTIES)}")
+        if any(not 0 <= v <= 1 for v in mix.values()):
+            raise ValueError("each difficulty share must be between 0 and 1")
+        if sum(mix.values()) > 1 + 1e-6:
+            raise ValueError("difficulty shares must not add up to more than 1")
+        return mix
+
+
+class LessonPlanRequest(BaseModel):
+    subject: str
+    class_num: int
+    topic: str
+    duration: int = 40           # period length in minutes
+
+
 # ── Helper ───────────────────────────────────────────────────────────────────
 
+# Generated question sets are deterministic enough per (subject, class, topic,
+# mode, count, difficulty) to share between teachers for a few hours.
+_generate_cache = SharedCache("teach.generate", maxsize=1024, ttl=6 * 3600)
+
+BATCH_MAX_ITEMS = 24
+
+
 def _get_ai_client():
     """Return (client, deployment) or (None, None) if credentials missing."""
-    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "").strip('"').strip("'")
-    api_key  = os.getenv("AZURE_OPENAI_API_KEY",  "").strip('"').strip("'")
-    if not endpoint or not api_key:
-        load_dotenv(os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
-        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "").strip('"').strip("'")
-        api_key  = os.getenv("AZURE_OPENAI_API_KEY",  "").strip('"').strip("'")
-    if not endpoint or not api_key:
-        return None, None, None
-    deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4o-mini").strip('"').strip("'")
-    api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview").strip('"').strip("'")
-    client = AzureOpenAI(azure_endpoint=endpoint, api_key=api_key, api_version=api_version)
-    return client, deployment, api_version
+    return get_ai_client("gpt-4o-mini")
 
 
 def _strip_fences(text: str) -> str:
@@ -82,26 +143,74 @@ async def list_subjects():
 
 # ── POST /teach/generate ─────────────────────────────────────────────────────
 
-@router.post("/generate")
+@router.post("/generate", dependencies=[Depends(attribute("teach.generate"))])
 async def generate_questions(req: GenerateRequest):
     """Generate AI questions (MCQ / descriptive / Bihar Board pastpapers)."""
-    logger.info(f"Generating questions for {req.subject} | Class: {req.class_num} | Mode: {req.mode}")
-    client, deployment, _ = _get_ai_client()
+    return await _generate(req)
 
-    subj = SUBJECTS.get(req.subject)
-    if not subj:
-        return {"error": f"विषय '{req.subject}' नहीं मिला"}
 
-    topics = get_topics(req.subject, req.class_num)
-    if not topics:
-        return {"error": f"कक्षा {req.class_num} के लिए '{subj['name']}' में कोई विषय नहीं"}
+@router.post("/generate/batch", dependencies=[Depends(attribute("teach.generate_batch"))])
+async def generate_batch(req: BatchGenerateRequest):
+    """
+    Generate questions for several class/subject pairs in one round trip.
+    Items run concurrently (bounded) through the shared generate cache; with
+    `stream` each item is sent as an NDJSON line as soon as it completes.
+    """
+    items = req.items[:BATCH_MAX_ITEMS]
+    logger.info(f"Batch generate: {len(items)} items (stream={req.stream})")
+    # Items over the limit are not run; each is reported back so the client can resend it
+    skipped = [
+        {"index": i, "status": "skipped",
+         "result": {"error": f"एक बार में अधिकतम {BATCH_MAX_ITEMS} आइटम; यह आइटम नहीं चलाया गया।"}}
+        for i in range(len(items), len(req.items))
+    ]
+    if skipped:
+        logger.warning(f"Batch generate: {len(skipped)} items over the {BATCH_MAX_ITEMS}-item limit skipped")
 
-    topic_str = req.topic if req.topic else ", ".join(topics[:3])
-    diff_hindi = {"easy": "आसान", "medium": "मध्यम", "hard": "कठिन"}.get(req.difficulty, "मध्यम")
+    async def run(index, item):
+        try:
+            result = await _generate(item)
+        except Exception as e:
+            logger.error(f"Batch item {index} failed: {e}", exc_info=True)
+            result = {"error": f"AI सेवा त्रुटि: {str(e)}"}
+        status = "error" if "error" in result else "ok"
+        return {"index": index, "status": status, "result": result}
 
-    if not client:
-        return {"error": "Azure OpenAI credentials not configured", "questions": _fallback_questions(req)}
+    tasks = [asyncio.create_task(run(i, item)) for i, item in enumerate(items)]
+
+    if not req.stream:
+        results = await asyncio.gather(*tasks)
+        return {
+            "results": results + skipped,
+            "ok": sum(1 for r in results if r["status"] == "ok"),
+            "failed": sum(1 for r in results if r["status"] == "error"),
+            "skipped": len(skipped),
+        }
 
+    async def stream():
+        ok = failed = 0
+        try:
+            for entry in skipped:
+                yield json.dumps(entry, ensure_ascii=False) + "\n"
+            for next_done in asyncio.as_completed(tasks):
+                entry = await next_done
+                if entry["status"] == "ok":
+                    ok += 1
+                else:
+                    failed += 1
+                yield json.dumps(entry, ensure_ascii=False) + "\n"
+            yield json.dumps(
+                {"done": True, "ok": ok, "failed": failed, "skipped": len(skipped)},
+                ensure_ascii=False,
+            ) + "\n"
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def _generate_prompt(req: GenerateRequest, subj: dict, topic_str: str, diff_hindi: str) -> str:
     mode_prompts = {
         "mcq": (
             f"कक्षा {req.class_num} के विषय {subj['name']} के लिए {req.count} बहुविकल्पीय प्रश्न (MCQ) बनाएं।\n\n"
@@ -119,9 +228,14 @@ async def generate_questions(req: GenerateRequest):
             "प्रत्येक प्रश्न के लिए निम्न JSON प्रारूप:\n"
             '[{"question":"...","answer":"...","year":"2023"}]'
         ),
+        "long": (
+            f"कक्षा {req.class_num} के विषय {subj['name']} के लिए {req.count} दीर्घ उत्तरीय प्रश्न (5 अंक) और उत्तर बनाएं।\n\n"
+            "प्रत्येक प्रश्न के लिए निम्न JSON प्रारूप:\n"
+            '[{"question":"...","answer":"विस्तृत उत्तर (100-150 शब्द)"}]'
+        ),
     }
 
-    prompt = f"""{mode_prompts.get(req.mode, mode_prompts['mcq'])}
+    return f"""{mode_prompts.get(req.mode, mode_prompts['mcq'])}
 
 विषय/टॉपिक: {topic_str}
 कठिनाई स्तर: {diff_hindi}
@@ -132,20 +246,55 @@ async def generate_questions(req: GenerateRequest):
 - बिहार बोर्ड पाठ्यक्रम के अनुसार
 - केवल JSON array दें, कोई अन्य टेक्स्ट नहीं"""
 
-    try:
-        response = client.chat.completions.create(
-            model=deployment,
-            messages=[
-                {"role": "system", "content": "आप एक शिक्षा विशेषज्ञ हैं। केवल valid JSON array दें।"},
-                {"role": "user",   "content": prompt},
-            ],
-            max_completion_tokens=3000,
-        )
+
+async def _generate(req: GenerateRequest, fresh: bool = False) -> dict:
+    """
+    Shared body of /generate, /generate/batch and paper gap filling.
+    Successful AI results are cached and their questions added to the question
+    store; `fresh` skips the cache lookup to get new items.
+    """
+    logger.info(f"Generating questions for {req.subject} | Class: {req.class_num} | Mode: {req.mode}")
+    client, deployment, _ = _get_ai_client()
+
+    subj = SUBJECTS.get(req.subject)
+    if not subj:
+        return {"error": f"विषय '{req.subject}' नहीं मिला"}
+
+    topics = get_topics(req.subject, req.class_num)
+    if not topics:
+        return {"error": f"कक्षा {req.class_num} के लिए '{subj['name']}' में कोई विषय नहीं"}
+
+    topic_str = req.topic if req.topic else ", ".join(topics[:3])
+    diff_hindi = {"easy": "आसान", "medium": "मध्यम", "hard": "कठिन"}.get(req.difficulty, "मध्यम")
+
+    if not client:
+        return {"error": "Azure OpenAI credentials not configured", "questions": _fallback_questions(req)}
+
+    key = make_key(req.subject, req.class_num, topic_str, req.mode, req.count, req.difficulty)
+    parsed = {"ok": False}
+
+    async def load():
+        try:
+            response = await complete(
+                client,
+                model=deployment,
+                messages=[
+                    {"role": "system", "content": "आप एक शिक्षा विशेषज्ञ हैं। केवल valid JSON array दें।"},
+                    {"role": "user",   "content": _generate_prompt(req, subj, topic_str, diff_hindi)},
+                ],
+                max_completion_tokens=3000,
+            )
+        except Exception as e:
+            return {"error": f"AI सेवा त्रुटि: {str(e)}", "questions": _fallback_questions(req)}
         reply = _strip_fences(response.choices[0].message.content or "[]")
         try:
             questions = json.loads(reply)
+            parsed["ok"] = True
         except json.JSONDecodeError:
             questions = _fallback_questions(req)
+        if parsed["ok"] and isinstance(questions, list):
+            question_store.add(req.subject, req.class_num, topic_str,
+                               MODE_TO_TYPE.get(req.mode, "objective"), req.difficulty, questions)
 
         return {
             "subject": subj["name"],
@@ -154,13 +303,19 @@ async def generate_questions(req: GenerateRequest):
             "difficulty": diff_hindi,
             "questions": questions,
         }
-    except Exception as e:
-        return {"error": f"AI सेवा त्रुटि: {str(e)}", "questions": _fallback_questions(req)}
+
+    if fresh:
+        result, hit = await load(), False
+        if parsed["ok"]:
+            await _generate_cache.set(key, result)
+    else:
+        result, hit = await _generate_cache.get_or_load(key, load, should_cache=lambda r: parsed["ok"])
+    return {**result, "source": "cache" if hit else "ai"}
 
 
 # ── POST /teach/question-bank ────────────────────────────────────────────────
 
-@router.post("/question-bank")
+@router.post("/question-bank", dependencies=[Depends(attribute("teach.question_bank"))])
 async def generate_question_bank(req: QuestionBankRequest):
     """
     Generate a complete Bihar Board-style question bank with answers.
@@ -219,7 +374,8 @@ async def generate_question_bank(req: QuestionBankRequest):
 - answer field में MCQ के लिए index (0-3) दें"""
 
     try:
-        response = client.chat.completions.create(
+        response = await complete(
+            client,
             model=deployment,
             messages=[
                 {
@@ -239,6 +395,10 @@ async def generate_question_bank(req: QuestionBankRequest):
         except json.JSONDecodeError:
             return {"error": "AI ने सही प्रारूप में उत्तर नहीं दिया। कृपया पुनः प्रयास करें।"}
 
+        for kind, item_type in (("mcq", "objective"), ("short", "short"), ("long", "long")):
+            if isinstance(bank.get(kind), list):
+                question_store.add(req.subject, req.class_num, topic_str, item_type, "medium", bank[kind])
+
         return {
             "subject": subj["name"],
             "class_num": req.class_num,
@@ -251,6 +411,276 @@ async def generate_question_bank(req: QuestionBankRequest):
         return {"error": f"AI सेवा त्रुटि: {str(e)}"}
 
 
+# ── POST /teach/paper ────────────────────────────────────────────────────────
+
+@router.post("/paper", dependencies=[Depends(attribute("teach.paper"))])
+async def assemble_paper(req: PaperRequest):
+    """
+    Assemble question paper sets from the stored question pool.
+    Items are chosen to meet the section blueprint, difficulty mix and topic
+    coverage; only the shortfall is generated by the AI, then assembly reruns.
+    """
+    subj = SUBJECTS.get(req.subject)
+    if not subj:
+        return {"error": f"विषय '{req.subject}' नहीं मिला"}
+    if not get_topics(req.subject, req.class_num):
+        return {"error": f"कक्षा {req.class_num} के लिए '{subj['name']}' में कोई विषय नहीं"}
+
+    sections = []
+    for sec in req.sections:
+        if sec.type not in ITEM_MARKS:
+            return {"error": f"अमान्य खंड: {sec.type}"}
+        sections.append({"type": sec.type, "count": sec.count, "marks": sec.marks or ITEM_MARKS[sec.type]})
+    blueprint_marks = sum(s["count"] * s["marks"] for s in sections)
+    if req.total_marks is not None and req.total_marks != blueprint_marks:
+        return {"error": f"खंडों का योग {blueprint_marks} अंक है, {req.total_marks} नहीं"}
+
+    args = dict(sections=sections, difficulty_mix=req.difficulty_mix, topics=req.topics, sets=req.sets, seed=req.seed)
+    await question_store.sync_pool(req.subject, req.class_num)
+    # Greedy selection is pure CPU: run it off the event loop
+    papers, gaps = await run_in_threadpool(
+        assemble, question_store.items(req.subject, req.class_num), strict=True, **args)
+    generated = 0
+
+    if gaps and req.fill_gaps:
+        logger.info(f"Paper assembly for {req.subject} class {req.class_num}: filling gaps {gaps}")
+        topic = ", ".join(req.topics)
+        fills = [
+            GenerateRequest(subject=req.subject, class_num=req.class_num, topic=topic,
+                            count=min(missing + 2, 15), difficulty=diff, mode=TYPE_TO_MODE[item_type])
+            for (item_type, diff), missing in gaps.items()
+        ]
+        results = await asyncio.gather(*(_generate(f, fresh=True) for f in fills), return_exceptions=True)
+        generated = sum(len(r.get("questions", [])) for r in results if isinstance(r, dict) and "error" not in r)
+        papers, gaps = await run_in_threadpool(
+            assemble, question_store.items(req.subject, req.class_num), strict=False, **args)
+    elif gaps:
+        papers, gaps = await run_in_threadpool(
+            assemble, question_store.items(req.subject, req.class_num), strict=False, **args)
+
+    return {
+        "subject": subj["name"],
+        "class_num": req.class_num,
+        "blueprint_marks": blueprint_marks,
+        "papers": papers,
+        "generated": generated,
+        "unfilled": [{"type": t, "difficulty": d, "missing": n} for (t, d), n in gaps.items()],
+    }
+
+
+# ── POST /teach/lesson-plan ──────────────────────────────────────────────────
+
+# Finished plans by normalized (subject, class, topic, duration)
+_lesson_cache = SharedCache("teach.lesson_plan", maxsize=2000, ttl=7 * 24 * 3600)
+
+# Plans being generated right now; later requests for the same key tail the
+# same stream instead of starting another completion.
+_lesson_inflight: Dict[str, "_PlanStream"] = {}
+_lesson_tasks: set = set()
+
+LESSON_PREWARM = int(os.getenv("LESSON_PLAN_PREWARM", "8"))   # most-requested plans kept warm (0 = off)
+LESSON_PREWARM_INTERVAL = float(os.getenv("LESSON_PLAN_PREWARM_INTERVAL", str(6 * 3600)))
+LESSON_DEMAND_TTL = 30 * 24 * 3600      # request counts start over after this long
+
+# Syllabus topics by normalized (subject, class, topic); only these are counted and pre-warmed,
+# since free-text topics cannot be enumerated from the shared tier
+_SYLLABUS: Dict[str, Tuple[str, int, str]] = {
+    make_key(subject, cls, topic): (subject, cls, topic)
+    for subject, subj in SUBJECTS.items()
+    for cls, topics in subj["topics"].items()
+    for topic in topics
+}
+# Per-worker request counts, used when there is no shared tier
+_lesson_demand: Counter = Counter()
+
+
+class _PlanStream:
+    """Chunks of one in-progress plan, readable by any number of followers."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self._cond = asyncio.Condition()
+
+    async def push(self, text: str = "", done: bool = False):
+        async with self._cond:
+            if text:
+                self.chunks.append(text)
+            self.done = self.done or done
+            self._cond.notify_all()
+
+    async def follow(self):
+        i = 0
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: len(self.chunks) > i or self.done)
+                new, finished = self.chunks[i:], self.done
+            for c in new:
+                yield c
+            i += len(new)
+            if finished:
+                return
+
+
+def _lesson_key(req: LessonPlanRequest) -> str:
+    return make_key(req.subject, req.class_num, req.topic, req.duration)
+
+
+def _demand_key(topic_key: str) -> str:
+    return f"teach.lesson_demand:{topic_key}"
+
+
+async def _count_demand(req: LessonPlanRequest) -> None:
+    """Count a request for a syllabus topic, in the shared tier when there is one."""
+    topic_key = make_key(req.subject, req.class_num, req.topic)
+    if topic_key not in _SYLLABUS:
+        return
+    _lesson_demand[topic_key] += 1
+    backend = _lesson_cache.backend
+    if backend is not None:
+        try:
+            await backend.incr(_demand_key(topic_key), LESSON_DEMAND_TTL)
+        except Exception as e:
+            logger.warning(f"Lesson plan demand count failed: {e}")
+
+
+async def _popular_topics(limit: int) -> List[Tuple[str, int, str]]:
+    """The `limit` most-requested syllabus topics, across workers when the shared tier is up."""
+    counts = _lesson_demand
+    backend = _lesson_cache.backend
+    if backend is not None:
+        try:
+            counts = Counter({k: await backend.count(_demand_key(k)) for k in _SYLLABUS})
+        except Exception as e:
+            logger.warning(f"Lesson plan demand read failed, using this worker's counts: {e}")
+    return [_SYLLABUS[k] for k, n in counts.most_common(limit) if n > 0]
+
+
+def _lesson_prompt(req: LessonPlanRequest, subj: dict) -> str:
+    return f"""कक्षा {req.class_num} के विषय **{subj['name']}** के पाठ "{req.topic}" के लिए
+{req.duration} मिनट की कक्षा हेतु SCERT बिहार प्रारूप में पाठ योजना (Lesson Plan) बनाएं।
+
+अनिवार्य Markdown प्रारूप:
+## 📘 पाठ योजना: {req.topic}
+**कक्षा:** {req.class_num} | **विषय:** {subj['name']} | **अवधि:** {req.duration} मिनट
+
+### 🎯 अधिगम उद्देश्य (Learning Objectives)
+### 🛠️ शिक्षण सहायक सामग्री (Teaching Aids / TLM)
+### 🧭 पूर्व ज्ञान एवं प्रस्तावना
+### 👩‍🏫 शिक्षण विधि (Methodology) — चरणवार, प्रत्येक चरण का समय मिनट में
+### 📝 मूल्यांकन (Evaluation)
+### 🏠 गृहकार्य
+
+नियम:
+- शुद्ध हिंदी, कक्षा {req.class_num} के स्तर के अनुसार
+- कम/शून्य लागत स्थानीय TLM सुझाएं
+- Learning by Doing गतिविधियाँ शामिल करें
+- चरणों का कुल समय {req.duration} मिनट हो"""
+
+
+async def _produce_lesson_plan(key: str, req: LessonPlanRequest, subj: dict, stream: _PlanStream):
+    """Stream one plan from the AI into `stream`; cache it only if it completed cleanly."""
+    client, deployment, _ = get_ai_client("gpt-4o-mini", use_async=True)
+    ok = False
+    try:
+        async with ai_slots:
+            response = await client.chat.completions.create(
+                model=deployment,
+                messages=[
+                    {"role": "system", "content": "आप SCERT बिहार के अनुभवी शिक्षक-प्रशिक्षक हैं। केवल Markdown में उत्तर दें।"},
+                    {"role": "user", "content": _lesson_prompt(req, subj)},
+                ],
+                max_completion_tokens=4000,
+                stream=True,
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    await stream.push(chunk.choices[0].delta.content)
+        ok = bool(stream.chunks)
+    except Exception as e:
+        logger.error(f"Lesson plan generation failed for {req.subject}/{req.class_num}/{req.topic}: {e}", exc_info=True)
+        await stream.push(f"\n\n⚠️ AI सेवा त्रुटि: {str(e)}")
+    finally:
+        if ok:
+            await _lesson_cache.set(key, "".join(stream.chunks))
+        await stream.push(done=True)
+        _lesson_inflight.pop(key, None)
+
+
+def _start_lesson_plan(key: str, req: LessonPlanRequest, subj: dict) -> _PlanStream:
+    stream = _lesson_inflight.get(key)
+    if stream is None:
+        stream = _lesson_inflight[key] = _PlanStream()
+        task = asyncio.create_task(_produce_lesson_plan(key, req, subj, stream))
+        _lesson_tasks.add(task)
+        task.add_done_callback(_lesson_tasks.discard)
+    return stream
+
+
+@router.post("/lesson-plan", dependencies=[Depends(attribute("teach.lesson_plan"))])
+async def lesson_plan(req: LessonPlanRequest):
+    """
+    SCERT-style lesson plan (Objectives, Teaching Aids, Methodology, Evaluation)
+    streamed as Markdown. Cached plans return immediately; concurrent requests
+    for the same plan share one generation.
+    """
+    subj = SUBJECTS.get(req.subject)
+    if not subj:
+        return {"error": f"विषय '{req.subject}' नहीं मिला"}
+    if not req.topic.strip():
+        return {"error": "टॉपिक आवश्यक है।"}
+    req.duration = max(10, min(req.duration, 120))
+    await _count_demand(req)
+
+    key = _lesson_key(req)
+    cached = await _lesson_cache.get(key)
+    if cached is not None:
+        return StreamingResponse(iter([cached]), media_type="text/markdown; charset=utf-8",
+                                 headers={"X-Cache": "hit"})
+
+    client, _, _ = get_ai_client("gpt-4o-mini", use_async=True)
+    if not client:
+        return {"error": "Azure OpenAI credentials not configured"}
+
+    shared = key in _lesson_inflight
+    stream = _start_lesson_plan(key, req, subj)
+    return StreamingResponse(stream.follow(), media_type="text/markdown; charset=utf-8",
+                             headers={"X-Cache": "shared" if shared else "miss"})
+
+
+async def _warm_lesson_plans(limit: int) -> None:
+    combos = await _popular_topics(limit)
+    streams = []
+    for subject, cls, topic in combos:
+        req = LessonPlanRequest(subject=subject, class_num=cls, topic=topic)
+        key = _lesson_key(req)
+        if await _lesson_cache.get(key) is None:
+            streams.append(_start_lesson_plan(key, req, SUBJECTS[subject]))
+    if streams:
+        logger.info(f"Pre-warming {len(streams)} of the {len(combos)} most requested lesson plans")
+    for stream in streams:
+        async for _ in stream.follow():
+            pass
+
+
+async def prewarm_lesson_plans(limit: int = LESSON_PREWARM, interval: float = LESSON_PREWARM_INTERVAL):
+    """
+    Keep the `limit` most-requested syllabus plans (default duration) cached:
+    at startup, then every `interval` seconds. One worker warms per round.
+    """
+    client, _, _ = get_ai_client("gpt-4o-mini", use_async=True)
+    if not client or limit <= 0:
+        return
+    while True:
+        # Held for the whole round and left to expire, so other workers skip it
+        if await _lesson_cache.lock("prewarm", ttl=interval):
+            try:
+                await _warm_lesson_plans(limit)
+            except Exception as e:
+                logger.error(f"Lesson plan pre-warm failed: {e}", exc_info=True)
+        await asyncio.sleep(interval)
+
+
 # ── Fallback ─────────────────────────────────────────────────────────────────
 
 def _fallback_questions(req):
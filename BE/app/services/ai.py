@@ -0,0 +1,53 @@
+"""
+शिक्षक सहायक — Shared Azure OpenAI client
+One client per credential set, so every route reuses the same HTTP connection pool.
+"""
+import os
+import asyncio
+from functools import lru_cache
+from dotenv import load_dotenv
+from openai import AzureOpenAI, AsyncAzureOpenAI
+
+
+# Bounds concurrent upstream completions across all routes.
+AI_CONCURRENCY = int(os.getenv("AI_CONCURRENCY", "4"))
+ai_slots = asyncio.Semaphore(AI_CONCURRENCY)
+
+
+def _env(name: str, default: str = "") -> str:
+    return os.getenv(name, default).strip('"').strip("'")
+
+
+@lru_cache(maxsize=4)
+def _build_client(endpoint: str, api_key: str, api_version: str) -> AzureOpenAI:
+    return AzureOpenAI(azure_endpoint=endpoint, api_key=api_key, api_version=api_version)
+
+
+@lru_cache(maxsize=4)
+def _build_async_client(endpoint: str, api_key: str, api_version: str) -> AsyncAzureOpenAI:
+    return AsyncAzureOpenAI(azure_endpoint=endpoint, api_key=api_key, api_version=api_version)
+
+
+def get_ai_client(default_deployment: str = "gpt-4o-mini", use_async: bool = False):
+    """
+    Return (client, deployment, api_version) or (None, None, None) if credentials missing.
+    `use_async` returns the AsyncAzureOpenAI client (for streaming).
+    """
+    endpoint = _env("AZURE_OPENAI_ENDPOINT")
+    api_key  = _env("AZURE_OPENAI_API_KEY")
+    if not endpoint or not api_key:
+        load_dotenv(os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
+        endpoint = _env("AZURE_OPENAI_ENDPOINT")
+        api_key  = _env("AZURE_OPENAI_API_KEY")
+    if not endpoint or not api_key:
+        return None, None, None
+    deployment  = _env("AZURE_OPENAI_DEPLOYMENT_NAME", default_deployment)
+    api_version = _env("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")
+    build = _build_async_client if use_async else _build_client
+    return build(endpoint, api_key, api_version), deployment, api_version
+
+
+async def complete(client, **kwargs):
+    """Run a blocking chat completion in a worker thread under the shared concurrency cap."""
+    async with ai_slots:
+        return await asyncio.to_thread(client.chat.completions.create, **kwargs)
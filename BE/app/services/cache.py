@@ -0,0 +1,445 @@
+"""
+शिक्षक सहायक — Two-tier result cache
+Local tier: bounded in-process LRU with per-entry TTL and byte accounting.
+Shared tier (optional, selected by CACHE_BACKEND): SQLite in WAL mode for
+several workers on one host, or Redis for multi-host deployments, so every
+uvicorn worker sees the same feeds and AI results.
+
+SharedCache.get_or_load() is single-flight inside a worker and takes a short
+lock in the shared tier, so a cold key costs one upstream call cluster-wide.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.logger import logger
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite").lower()       # memory | sqlite | redis
+CACHE_SQLITE_PATH = os.getenv(
+    "CACHE_SQLITE_PATH", str(Path(__file__).resolve().parent.parent.parent / "var" / "cache.sqlite3"))
+CACHE_SQLITE_MAX_BYTES = int(os.getenv("CACHE_SQLITE_MAX_BYTES", str(256 * 1024 * 1024)))
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+LOCK_TTL = 60          # seconds a loader may hold the shared stampede lock
+LOCK_WAIT = 30         # seconds other workers poll for the loader's result
+SHARED_CHECK = 5       # SharedCache.peek(): min seconds between shared-tier reads per key
+
+
+def make_key(*parts: Any) -> str:
+    """Stable cache key from request fields (case- and whitespace-insensitive)."""
+    norm = []
+    for p in parts:
+        if isinstance(p, str):
+            p = " ".join(p.lower().split())
+        norm.append(p)
+    raw = json.dumps(norm, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# ── Local tier ───────────────────────────────────────────────────────────────
+
+class TTLCache:
+    """Least-recently-used cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, name: str, maxsize: int = 512, ttl: float = 3600, max_bytes: Optional[int] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires, value, _ = entry
+        if expires < time.time():
+            self._drop(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, size: int = 0) -> None:
+        if key in self._data:
+            self._drop(key)
+        self._data[key] = (time.time() + (ttl if ttl is not None else self.ttl), value, size)
+        self.bytes += size
+        while len(self._data) > self.maxsize or (self.max_bytes and self.bytes > self.max_bytes and len(self._data) > 1):
+            self._drop(next(iter(self._data)))
+
+    def _drop(self, key: str) -> None:
+        _, _, size = self._data.pop(key)
+        self.bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# ── Shared tier backends ─────────────────────────────────────────────────────
+
+class SQLiteBackend:
+    """Host-local shared tier: one WAL-mode SQLite file used by every worker.
+
+    Statements run in a worker thread so a busy file never stalls the event loop;
+    the lock keeps one call's statements (and acquire()'s transaction) together
+    on the shared connection.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_bytes: int = CACHE_SQLITE_MAX_BYTES):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._db = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "expires REAL NOT NULL, size INTEGER NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS kv_expires ON kv(expires)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, owner TEXT, expires REAL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, count INTEGER NOT NULL, "
+                         "expires REAL NOT NULL)")
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        return await asyncio.to_thread(self._locked, fn, *args)
+
+    def _locked(self, fn: Callable, *args: Any) -> Any:
+        with self._lock:
+            return fn(*args)
+
+    async def get(self, key: str) -> Optional[tuple]:
+        return await self._run(self._get, key)
+
+    def _get(self, key: str) -> Optional[tuple]:
+        row = self._db.execute("SELECT value, expires FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0], row[1]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._run(self._set, key, value, ttl)
+
+    def _set(self, key: str, value: bytes, ttl: float) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires, size) VALUES (?, ?, ?, ?)",
+            (key, value, time.time() + ttl, len(value)))
+        self._wrote()
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._db.execute, "DELETE FROM kv WHERE key = ?", (key,))
+
+    async def incr(self, key: str, ttl: float, amount: int = 1) -> int:
+        """Atomically add `amount` to a counter that starts over once it expires; returns the new count."""
+        return await self._run(self._incr, key, ttl, amount)
+
+    def _incr(self, key: str, ttl: float, amount: int) -> int:
+        now = time.time()
+        count = self._db.execute(
+            "INSERT INTO counters (key, count, expires) VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+            "count = CASE WHEN expires < ? THEN excluded.count ELSE count + excluded.count END, "
+            "expires = CASE WHEN expires < ? THEN excluded.expires ELSE expires END RETURNING count",
+            (key, amount, now + ttl, now, now)).fetchone()[0]
+        self._wrote()
+        return count
+
+    async def count(self, key: str) -> int:
+        return await self._run(self._count, key)
+
+    def _count(self, key: str) -> int:
+        row = self._db.execute("SELECT count FROM counters WHERE key = ? AND expires >= ?", (key, time.time())).fetchone()
+        return row[0] if row else 0
+
+    def _wrote(self) -> None:
+        self._writes += 1
+        if self._writes % 200 == 0:
+            self._evict()
+
+    def _evict(self) -> None:
+        self._db.execute("DELETE FROM kv WHERE expires < ?", (time.time(),))
+        self._db.execute("DELETE FROM counters WHERE expires < ?", (time.time(),))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM kv").fetchone()[0]
+        if total > self.max_bytes:
+            # Drop the entries closest to expiry until ~90% of the budget
+            excess = total - int(self.max_bytes * 0.9)
+            for key, size in self._db.execute("SELECT key, size FROM kv ORDER BY expires").fetchall():
+                self._db.execute("DELETE FROM kv WHERE key = ?", (key,))
+                excess -= size
+                if excess <= 0:
+                    break
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        return await self._run(self._acquire, key, owner, ttl)
+
+    def _acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM locks WHERE key = ? AND expires < ?", (key, now))
+            cur = self._db.execute("INSERT OR IGNORE INTO locks (key, owner, expires) VALUES (?, ?, ?)",
+                                   (key, owner, now + ttl))
+            self._db.execute("COMMIT")
+            return cur.rowcount == 1
+        except sqlite3.OperationalError:
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            return False
+
+    async def release(self, key: str, owner: str) -> None:
+        await self._run(self._db.execute, "DELETE FROM locks WHERE key = ? AND owner = ?", (key, owner))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM kv").fetchone()
+        return {"backend": self.name, "entries": count, "bytes": size, "max_bytes": self.max_bytes}
+
+
+class RedisBackend:
+    """Multi-host shared tier on any Redis-compatible server (redis-py asyncio client)."""
+
+    name = "redis"
+
+    # Delete the lock only while `owner` still holds it, in one server-side step: a get-then-delete
+    # could remove a lock that expired and was taken by another worker in between.
+    RELEASE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis   # optional dependency
+        self._r = redis.from_url(url)
+        self._release = self._r.register_script(self.RELEASE)
+        self.bytes_written = 0
+
+    async def get(self, key: str) -> Optional[tuple]:
+        async with self._r.pipeline(transaction=False) as p:
+            value, pttl = await p.get(key).pttl(key).execute()
+        if value is None:
+            return None
+        return value, time.time() + (pttl / 1000 if pttl and pttl > 0 else 0)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._r.set(key, value, px=max(1, int(ttl * 1000)))
+        self.bytes_written += len(value)
+
+    async def delete(self, key: str) -> None:
+        await self._r.delete(key)
+
+    async def incr(self, key: str, ttl: float, amount: int = 1) -> int:
+        """Atomically add `amount` to a counter that expires `ttl` seconds after it was created."""
+        # SET NX PX creates the counter with its expiry in one command, so a worker dying between
+        # the increment and a separate PEXPIRE cannot leave a counter that never expires
+        async with self._r.pipeline(transaction=True) as p:
+            _, count = await p.set(key, 0, nx=True, px=max(1, int(ttl * 1000))).incrby(key, amount).execute()
+        return count
+
+    async def count(self, key: str) -> int:
+        value = await self._r.get(key)
+        return int(value) if value is not None else 0
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        return bool(await self._r.set(f"lock:{key}", owner, nx=True, px=max(1, int(ttl * 1000))))
+
+    async def release(self, key: str, owner: str) -> None:
+        await self._release(keys=[f"lock:{key}"], args=[owner])
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "bytes_written": self.bytes_written}
+
+
+_backend: Any = False   # False = not resolved yet, None = no shared tier
+
+
+def get_backend():
+    """Shared tier chosen by CACHE_BACKEND (REDIS_URL implies redis); None for memory-only."""
+    global _backend
+    if _backend is not False:
+        return _backend
+    kind = "redis" if REDIS_URL and CACHE_BACKEND != "memory" else CACHE_BACKEND
+    try:
+        if kind == "redis":
+            _backend = RedisBackend(REDIS_URL)
+        elif kind == "sqlite":
+            _backend = SQLiteBackend(CACHE_SQLITE_PATH)
+        else:
+            _backend = None
+    except Exception as e:
+        logger.warning(f"Shared cache backend '{kind}' unavailable, using in-process cache only: {e}")
+        _backend = None
+    logger.info(f"Cache shared tier: {_backend.name if _backend else 'none'}")
+    return _backend
+
+
+# ── Two-tier cache ───────────────────────────────────────────────────────────
+
+_registry: List["SharedCache"] = []
+
+
+class SharedCache:
+    """Local LRU in front of the shared backend; values must be JSON-serializable."""
+
+    def __init__(self, name: str, maxsize: int = 512, ttl: float = 3600,
+                 max_bytes: Optional[int] = None, shared: bool = True):
+        self.name = name
+        self.ttl = ttl
+        self.local = TTLCache(name, maxsize=maxsize, ttl=ttl, max_bytes=max_bytes)
+        self._shared = shared
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._checked: Dict[str, float] = {}
+        self.shared_hits = 0
+        self.loads = 0
+        _registry.append(self)
+
+    @property
+    def backend(self):
+        return get_backend() if self._shared else None
+
+    def _k(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    async def _read_shared(self, key: str) -> Optional[Any]:
+        try:
+            row = await self.backend.get(self._k(key))
+        except Exception as e:
+            logger.warning(f"Shared cache read failed ({self.name}): {e}")
+            return None
+        if row is None:
+            return None
+        raw, expires = row
+        value = json.loads(raw)
+        self.local.set(key, value, ttl=max(1.0, expires - time.time()), size=len(raw))
+        self.shared_hits += 1
+        return value
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None or self.backend is None:
+            return value
+        return await self._read_shared(key)
+
+    async def peek(self, key: str, force: bool = False) -> Optional[Any]:
+        """Like get(), but prefers the shared tier (re-read at most every SHARED_CHECK seconds
+        unless `force`) so values another worker replaced are picked up."""
+        now = time.time()
+        if self.backend is None or (not force and now - self._checked.get(key, 0) < SHARED_CHECK):
+            return self.local.get(key)
+        self._checked[key] = now
+        value = await self._read_shared(key)
+        return value if value is not None else self.local.get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, local: bool = True) -> None:
+        """Store in both tiers; `local=False` writes only the shared tier (bulk data read back rarely)."""
+        ttl = ttl if ttl is not None else self.ttl
+        raw = _dumps(value)
+        if local or self.backend is None:
+            self.local.set(key, value, ttl=ttl, size=len(raw))
+        if self.backend is not None:
+            try:
+                await self.backend.set(self._k(key), raw, ttl)
+            except Exception as e:
+                logger.warning(f"Shared cache write failed ({self.name}): {e}")
+
+    async def delete(self, key: str) -> None:
+        if key in self.local._data:
+            self.local._drop(key)
+        if self.backend is not None:
+            await self.backend.delete(self._k(key))
+
+    async def lock(self, key: str, ttl: float = LOCK_TTL) -> Optional[str]:
+        """Take the shared stampede lock for `key`; returns an owner token or None if held elsewhere."""
+        if self.backend is None:
+            return "local"
+        owner = uuid.uuid4().hex
+        try:
+            return owner if await self.backend.acquire(self._k(key), owner, ttl) else None
+        except Exception:
+            return "local"
+
+    async def unlock(self, key: str, owner: Optional[str]) -> None:
+        if self.backend is not None and owner and owner != "local":
+            try:
+                await self.backend.release(self._k(key), owner)
+            except Exception:
+                pass
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = lambda v: v is not None,
+        ttl: Optional[float] = None,
+    ) -> tuple:
+        """
+        Return (value, hit). One `loader()` per key per worker, and across workers while the lock holds.
+        `hit` is True only when the value was already cached; callers that joined a load still in
+        flight (here or on another worker) get a freshly loaded value and hit=False.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value, True
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending), False
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        owner = None
+        try:
+            owner = await self.lock(key)
+            if owner is None:
+                # Another worker is loading this key; wait for its result.
+                deadline = time.time() + LOCK_WAIT
+                while time.time() < deadline:
+                    await asyncio.sleep(0.2)
+                    value = await self.get(key)
+                    if value is not None:
+                        fut.set_result(value)
+                        return value, False
+            self.loads += 1
+            value = await loader()
+            if should_cache(value):
+                await self.set(key, value, ttl)
+            fut.set_result(value)
+            return value, False
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            await self.unlock(key, owner)
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.local.stats(), "shared_hits": self.shared_hits, "loads": self.loads}
+
+
+def cache_stats() -> Dict[str, Any]:
+    backend = get_backend()
+    return {
+        "shared": backend.stats() if backend else None,
+        "caches": {c.name: c.stats() for c in _registry},
+    }
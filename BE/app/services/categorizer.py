@@ -0,0 +1,149 @@
+"""
+शिक्षक सहायक — Notice Categorizer
+Weighted Hindi/English keyword dictionaries (app/data/notice_keywords.json)
+compiled into one Aho–Corasick automaton. A single pass over the text
+scores every category, so adding keywords or categories does not add passes
+and the result does not depend on category order.
+"""
+import json
+import math
+from collections import defaultdict, deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+KEYWORDS_PATH = Path(__file__).resolve().parent.parent / "data" / "notice_keywords.json"
+
+MIN_SCORE = 2.0          # a category needs at least this much weight to be assigned
+SECONDARY_RATIO = 0.5    # extra labels must score at least this fraction of the top one
+MAX_REPEATS = 3          # occurrences of one keyword counted at most this often
+
+
+class Automaton:
+    """Aho–Corasick over characters; payloads are (label, weight, keyword) tuples."""
+
+    def __init__(self, patterns: Dict[str, List[Tuple[str, float]]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[Tuple[str, float, str]]] = [[]]
+        for word, payloads in patterns.items():
+            node = 0
+            for ch in word:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].extend((label, weight, word) for label, weight in payloads)
+        # Breadth-first failure links; outputs inherit along them
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter(self, text: str):
+        """Yield (end_index, label, weight, keyword) for every match in `text`."""
+        node = 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for label, weight, word in out[node]:
+                    yield i, label, weight, word
+
+
+# Inflections an English keyword may carry: "transfers", "exams", "transferred", "postings"
+ENGLISH_SUFFIXES = {"s", "es", "d", "ed", "ing", "ings"}
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+def _inflection(word: str, tail: str) -> bool:
+    """True if `tail` (the rest of the text's word after `word`) is empty or an inflection."""
+    if not tail or tail in ENGLISH_SUFFIXES:
+        return True
+    # Doubled final consonant: transfer -> transferred
+    return tail[0] == word[-1] and tail[1:] in ENGLISH_SUFFIXES
+
+
+class Categorizer:
+    def __init__(self, config: dict):
+        self.default = config["default"]
+        self.icons = {c["name"]: c["icon"] for c in config["categories"]}
+        self.priority_threshold = config["priority"]["threshold"]
+        patterns: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+        for cat in config["categories"]:
+            for word, weight in cat["keywords"].items():
+                patterns[word.lower()].append((cat["name"], float(weight)))
+        for word, weight in config["priority"]["keywords"].items():
+            patterns[word.lower()].append(("__priority__", float(weight)))
+        self.automaton = Automaton(patterns)
+
+    def _matches(self, text: str):
+        # English keywords start at a word boundary and end at one or in an inflection
+        # ("exams", not "example"); Hindi keywords match inside inflected forms
+        # ("स्थानांतरण" in "स्थानांतरणों").
+        for end, label, weight, word in self.automaton.iter(text):
+            if word[0].isascii():
+                start = end - len(word) + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                stop = end + 1
+                while stop < len(text) and _is_word_char(text[stop]):
+                    stop += 1
+                if not _inflection(word, text[end + 1:stop]):
+                    continue
+            yield label, weight, word
+
+    def classify(self, text: str) -> dict:
+        """Primary category, icon, priority and every category scoring enough, with confidence."""
+        scores: Dict[str, float] = defaultdict(float)
+        seen: Dict[Tuple[str, str], int] = defaultdict(int)
+        for label, weight, word in self._matches(text.lower()):
+            seen[(label, word)] += 1
+            if seen[(label, word)] <= MAX_REPEATS:
+                scores[label] += weight
+
+        priority_score = scores.pop("__priority__", 0.0)
+        ranked = sorted(scores.items(), key=lambda kv: -kv[1])
+        labels = []
+        if ranked and ranked[0][1] >= MIN_SCORE:
+            top = ranked[0][1]
+            total = sum(s for _, s in ranked)
+            for name, score in ranked:
+                if score < MIN_SCORE or score < top * SECONDARY_RATIO:
+                    break
+                # share of the evidence, damped when there is little of it
+                confidence = (score / total) * (1 - math.exp(-score / 4))
+                labels.append({"name": name, "score": round(score, 2), "confidence": round(confidence, 2)})
+
+        primary = labels[0]["name"] if labels else self.default["name"]
+        return {
+            "category": primary,
+            "category_icon": self.icons.get(primary, self.default["icon"]),
+            "categories": labels,
+            "priority": "high" if priority_score >= self.priority_threshold else "medium",
+        }
+
+
+@lru_cache(maxsize=1)
+def get_categorizer() -> Categorizer:
+    with open(KEYWORDS_PATH, encoding="utf-8") as f:
+        return Categorizer(json.load(f))
+
+
+def classify(text: str) -> dict:
+    return get_categorizer().classify(text)
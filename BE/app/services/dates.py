@@ -0,0 +1,148 @@
+"""
+शिक्षक सहायक — Date and deadline extraction
+Finds Hindi and English date expressions in notice text and classifies them:
+  - numeric: 12.03.2026, 12/03/26, १२-०३-२०२६
+  - spelled: 30 अप्रैल 2026, 30 April 2026, April 30, 2026, 1-31 मार्च 2026
+  - ranges: "1 से 31 मार्च 2026", "01.03.2026 से 31.03.2026 तक"
+The issue date is the one after "दिनांक/dated" (or the first date in the
+header). Deadlines are the end of any date range and dates right after a cue
+such as "अंतिम तिथि", "last date", "on or before", "till", or right before
+"तक"/"से पूर्व" — a "before" elsewhere in the sentence does not count.
+"""
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+_DEVANAGARI_DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+
+MONTHS = {
+    "जनवरी": 1, "फरवरी": 2, "फ़रवरी": 2, "मार्च": 3, "अप्रैल": 4, "अप्रेल": 4, "मई": 5, "जून": 6, "जुलाई": 7,
+    "अगस्त": 8, "सितंबर": 9, "सितम्बर": 9, "अक्टूबर": 10, "अक्तूबर": 10, "नवंबर": 11, "नवम्बर": 11,
+    "दिसंबर": 12, "दिसम्बर": 12,
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7, "august": 8,
+    "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8, "sep": 9, "sept": 9, "oct": 10,
+    "nov": 11, "dec": 12,
+}
+_MONTH = "|".join(sorted(map(re.escape, MONTHS), key=len, reverse=True))
+_SEP = r"\s*(?:-|–|—|से|to|till|until)\s*"
+
+# Each pattern yields named groups d1 (optional range start day), m1/y1 (optional start month/year), d, m, y
+_PATTERNS = [
+    # 01.03.2026 से 31.03.2026
+    re.compile(r"(?P<d1>\d{1,2})[./-](?P<m1>\d{1,2})[./-](?P<y1>\d{2,4})" + _SEP +
+               r"(?P<d>\d{1,2})[./-](?P<m>\d{1,2})[./-](?P<y>\d{2,4})"),
+    # 12.03.2026
+    re.compile(r"(?<!\d)(?P<d>\d{1,2})[./-](?P<m>\d{1,2})[./-](?P<y>\d{4}|\d{2})(?!\d)"),
+    # 1 मार्च से 15 अप्रैल 2026 / 1-31 मार्च 2026 / 30 अप्रैल 2026 / 30th April, 2026
+    re.compile(r"(?:(?P<d1>\d{1,2})(?:st|nd|rd|th)?\s*(?:(?P<m1>" + _MONTH + r")\.?,?\s*)?" + _SEP + r")?"
+               r"(?P<d>\d{1,2})(?:st|nd|rd|th)?\s*(?P<m>" + _MONTH + r")\.?,?\s*(?P<y>\d{4})?", re.I),
+    # April 30, 2026
+    re.compile(r"(?P<m>" + _MONTH + r")\.?\s+(?P<d>\d{1,2})(?:st|nd|rd|th)?,?\s*(?P<y>\d{4})?", re.I),
+]
+
+ISSUE_CUES = re.compile(r"(दिनांक|दि०|दि\.|dated|date of issue)\s*[:\-–]?\s*$", re.I)
+# Cues ending just before a date. The named ones may be followed by a few words
+# ("अंतिम तिथि दिनांक", "last date for submission is"); the rest must touch the date.
+DEADLINE_LEAD = re.compile(
+    r"(?:(?:अंतिम|अन्तिम)\s*(?:तिथि|तारीख)|समय\s*सीमा|last\s*date|deadline|due\s*date)[^\d.।\n]{0,30}$|"
+    r"(?:on\s*or\s*before|latest\s*by|not\s*later\s*than|till|until|upto|up\s*to)"
+    r"\s*(?:दिनांक|the)?\s*[:\-–]?\s*$", re.I)
+# Cues starting right after a date: "31.03.2026 तक", "30 अप्रैल 2026 से पूर्व"
+DEADLINE_TRAIL = re.compile(r"(?:तक|(?:से|के)?\s*(?:पूर्व|पहले))(?=[\s,.।;:)]|$)")
+
+
+def _month(value: str) -> Optional[int]:
+    if value is None:
+        return None
+    if value.isdigit():
+        return int(value)
+    return MONTHS.get(value.lower().rstrip("."))
+
+
+def _year(value: Optional[str], month: int, day: int, ref: date) -> int:
+    """Explicit year, or the nearest one that keeps the date from being long past."""
+    if value:
+        y = int(value)
+        return y + 2000 if y < 100 else y
+    y = ref.year
+    try:
+        if date(y, month, day) < ref - timedelta(days=60):
+            y += 1
+    except ValueError:
+        pass
+    return y
+
+
+def _make(d: int, m: int, y: int) -> Optional[date]:
+    try:
+        result = date(y, m, d)
+    except (TypeError, ValueError):
+        return None
+    return result if 2000 <= result.year <= 2100 else None
+
+
+def find_dates(text: str, ref: Optional[date] = None) -> List[Tuple[int, int, Optional[date], date]]:
+    """[(start_offset, end_offset, range_start, date)] for every date expression, in text order."""
+    text = text.translate(_DEVANAGARI_DIGITS)
+    ref = ref or datetime.now(IST).date()
+    found, taken = [], []
+    for pattern in _PATTERNS:
+        for m in pattern.finditer(text):
+            if any(s < m.end() and m.start() < e for s, e in taken):
+                continue
+            g = m.groupdict()
+            month = _month(g.get("m"))
+            if not month:
+                continue
+            end = _make(int(g["d"]), month, _year(g.get("y"), month, int(g["d"]), ref))
+            if end is None:
+                continue
+            start = None
+            if g.get("d1"):
+                m1 = _month(g.get("m1")) or month
+                start = _make(int(g["d1"]), m1, int(g["y1"]) + (2000 if int(g["y1"]) < 100 else 0)
+                              if g.get("y1") else end.year - (1 if m1 > month else 0))
+                if start and start > end:
+                    start = None
+            taken.append((m.start(), m.end()))
+            found.append((m.start(), m.end(), start, end))
+    return sorted(found)
+
+
+def _context(text: str, start: int, end: int, width: int = 60) -> str:
+    left = text.rfind("\n", 0, start) + 1
+    right = text.find("\n", end)
+    right = len(text) if right == -1 else right
+    return " ".join(text[max(left, start - width):min(right, end + width)].split())
+
+
+def extract_dates(text: str, ref: Optional[date] = None) -> dict:
+    """{"issue_date": ISO or None, "deadlines": [{"date", "start", "label"}]} from notice text."""
+    text = (text or "").translate(_DEVANAGARI_DIGITS)
+    issue, header_date, deadlines = None, None, {}
+    for start, end, range_start, day in find_dates(text, ref):
+        before = text[max(0, start - 40):start]
+        after = text[end:end + 12]
+        is_deadline = bool(range_start or DEADLINE_LEAD.search(before) or DEADLINE_TRAIL.match(after.strip()))
+        if issue is None and not is_deadline and ISSUE_CUES.search(before):
+            issue = day
+            continue
+        if is_deadline:
+            iso = day.isoformat()
+            if iso not in deadlines:
+                deadlines[iso] = {"date": iso, "start": range_start.isoformat() if range_start else None,
+                                  "label": _context(text, start, end)}
+        elif header_date is None and start < 300:
+            header_date = day
+    issue = issue or header_date
+    return {"issue_date": issue.isoformat() if issue else None,
+            "deadlines": sorted(deadlines.values(), key=lambda d: d["date"])}
+
+
+def to_ts(iso: str) -> float:
+    """Epoch seconds at the end of an ISO day in IST (a deadline is open all day)."""
+    d = date.fromisoformat(iso)
+    return datetime(d.year, d.month, d.day, 23, 59, 59, tzinfo=IST).timestamp()
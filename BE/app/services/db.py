@@ -0,0 +1,180 @@
+"""
+शिक्षक सहायक — Postgres connection pool
+One asyncpg pool per worker for the user tables on Supabase, opened in the app
+lifespan. Requests borrow a connection instead of paying a TLS + auth
+handshake each, and the pool size is bounded, so a login storm waits here
+(with a timeout) rather than exhausting Supabase's connection limit.
+
+  - connections idle longer than DB_IDLE_PING are pinged before use and
+    replaced if the server or pooler dropped them
+  - asyncpg prepares every query and caches the statement per connection;
+    Supabase's transaction pooler (pgbouncer, port 6543) cannot keep named
+    statements, so DB_STATEMENT_CACHE defaults to 0 there
+  - pool wait times, timeouts and replaced connections are reported in /metrics
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+from app.logger import logger
+
+try:
+    import asyncpg   # optional here so the rest of the app runs without it
+except ImportError:
+    asyncpg = None
+
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))       # seconds a request waits for a connection
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+DB_IDLE_PING = float(os.getenv("DB_IDLE_PING", "30"))            # ping connections idle longer than this
+DB_MAX_IDLE = float(os.getenv("DB_MAX_IDLE", "300"))             # close connections idle longer than this
+PGBOUNCER_PORT = 6543
+
+WAIT_SAMPLES = 1000
+
+
+class DatabaseUnavailable(Exception):
+    """No connection could be had: not configured, server unreachable, or pool exhausted."""
+
+
+def statement_cache_size(url: str) -> int:
+    """DB_STATEMENT_CACHE if set, else 0 behind Supabase's transaction pooler and asyncpg's default otherwise."""
+    value = os.getenv("DB_STATEMENT_CACHE")
+    if value not in (None, ""):
+        return int(value)
+    try:
+        port = urlsplit(url).port
+    except ValueError:
+        port = None
+    return 0 if port == PGBOUNCER_PORT else 100
+
+
+if asyncpg is not None:
+    class PooledConnection(asyncpg.Connection):
+        """asyncpg connection that remembers when it was last handed back to the pool."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.last_used = time.monotonic()
+
+        def touch(self) -> None:
+            self.last_used = time.monotonic()
+
+        def idle_for(self) -> float:
+            return time.monotonic() - self.last_used
+
+
+class Database:
+    def __init__(self):
+        self.url = ""
+        self._pool = None
+        self._lock = asyncio.Lock()
+        self._waits: deque = deque(maxlen=WAIT_SAMPLES)
+        # metrics
+        self.acquired = 0
+        self.timeouts = 0
+        self.replaced = 0
+        self.connect_errors = 0
+
+    @property
+    def configured(self) -> bool:
+        return asyncpg is not None and bool(os.getenv("DATABASE_URL"))
+
+    async def open(self) -> None:
+        """Create the pool at startup; if Postgres is down it is retried on first use."""
+        if not self.configured:
+            logger.warning("DATABASE_URL or asyncpg missing — auth endpoints are disabled")
+            return
+        try:
+            await self._get_pool()
+        except DatabaseUnavailable as e:
+            logger.error(f"Postgres pool deferred: {e}")
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await pool.close()
+
+    async def _get_pool(self):
+        if self._pool is not None:
+            return self._pool
+        if not self.configured:
+            raise DatabaseUnavailable("DATABASE_URL is not set. Please add your Supabase connection string to the .env file.")
+        async with self._lock:
+            if self._pool is None:
+                self.url = os.environ["DATABASE_URL"]
+                cache = statement_cache_size(self.url)
+                try:
+                    self._pool = await asyncpg.create_pool(
+                        self.url, min_size=min(DB_POOL_MIN, DB_POOL_MAX), max_size=DB_POOL_MAX,
+                        timeout=DB_CONNECT_TIMEOUT, statement_cache_size=cache,
+                        max_inactive_connection_lifetime=DB_MAX_IDLE, connection_class=PooledConnection)
+                except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+                    self.connect_errors += 1
+                    raise DatabaseUnavailable(str(e) or type(e).__name__) from e
+                logger.info(f"Postgres pool opened (max {DB_POOL_MAX} connections, statement cache {cache})")
+        return self._pool
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow a healthy pooled connection; raises DatabaseUnavailable if none comes within DB_POOL_TIMEOUT."""
+        pool = await self._get_pool()
+        start = time.perf_counter()
+        conn = None
+        try:
+            for _ in range(2):
+                conn = await pool.acquire(timeout=DB_POOL_TIMEOUT)
+                if conn.idle_for() < DB_IDLE_PING:
+                    break
+                try:
+                    await conn.execute("SELECT 1", timeout=DB_CONNECT_TIMEOUT)
+                    break
+                except (OSError, asyncio.TimeoutError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError):
+                    # Dropped by the server or pooler while idle: discard it and take another
+                    self.replaced += 1
+                    conn.terminate()
+                    await pool.release(conn)
+                    conn = None
+            if conn is None:
+                raise DatabaseUnavailable("Postgres connection lost")
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            raise DatabaseUnavailable("Postgres pool exhausted") from e
+        except (OSError, asyncpg.PostgresConnectionError) as e:
+            self.connect_errors += 1
+            raise DatabaseUnavailable(str(e) or type(e).__name__) from e
+        self.acquired += 1
+        self._waits.append(time.perf_counter() - start)
+        try:
+            yield conn
+        finally:
+            conn.touch()
+            await pool.release(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        pool = self._pool
+        return {
+            "configured": self.configured,
+            "open": pool is not None,
+            "size": pool.get_size() if pool is not None else 0,
+            "idle": pool.get_idle_size() if pool is not None else 0,
+            "max_size": DB_POOL_MAX,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "replaced_connections": self.replaced,
+            "connect_errors": self.connect_errors,
+            "wait_ms": {
+                "avg": round(1000 * sum(waits) / len(waits), 2) if waits else None,
+                "p95": round(1000 * waits[int(0.95 * (len(waits) - 1))], 2) if waits else None,
+                "max": round(1000 * waits[-1], 2) if waits else None,
+            },
+        }
+
+
+database = Database()
@@ -0,0 +1,162 @@
+"""
+शिक्षक सहायक — Near-duplicate detection for news and notices
+URL canonicalization (tracking params, AMP/mobile variants) plus MinHash
+signatures over character shingles with LSH banding, so the same story from
+several sites collapses into one item with an "also reported by" list.
+Runs in a few milliseconds for a refresh of ~50 items.
+"""
+import re
+import unicodedata
+import zlib
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "source", "src", "cmp", "ito", "ns_mchannel", "ns_source",
+    "ns_campaign", "ns_linkname", "ns_fee", "share", "shared", "from", "amp", "outputtype",
+}
+_HOST_PREFIXES = ("www.", "m.", "amp.", "mobile.")
+
+NUM_PERM = 64
+BANDS, ROWS = 16, 4            # NUM_PERM = BANDS * ROWS; ~0.5 Jaccard detection knee
+SHINGLE = 4
+DUP_THRESHOLD = 0.5            # estimated Jaccard to call two items the same story
+
+_rng = np.random.RandomState(20240601)
+_SEEDS = _rng.randint(0, np.iinfo(np.int64).max, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+_NON_WORD = re.compile(r"[^\wऀ-ॿ]+")
+
+
+def canonical_url(url: str) -> str:
+    """Scheme/host-normalized URL without tracking params, fragments or AMP/mobile variants."""
+    if not url or "://" not in url:
+        return url or ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    path = parts.path
+    path = re.sub(r"/amp(?=/|$)", "", path)            # /amp/ segments
+    path = re.sub(r"\.amp(?=\.html?$|$)", "", path)     # story.amp.html, story.amp
+    path = re.sub(r"/+$", "", path) or "/"
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=False)
+             if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS]
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFC", text or "").lower()
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def shingles(text: str, k: int = SHINGLE) -> np.ndarray:
+    """Stable 32-bit hashes of character k-grams of the normalized text."""
+    t = normalize_text(text)
+    if len(t) <= k:
+        grams: Iterable[str] = [t] if t else []
+    else:
+        grams = {t[i:i + k] for i in range(len(t) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (wrapping uint64 arithmetic): every input bit affects every output bit."""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    h = shingles(text)
+    if h.size == 0:
+        return None
+    # One seeded hash per permutation; a plain a*h+b let small shingle hashes win every minimum
+    with np.errstate(over="ignore"):
+        return _mix(h[None, :] ^ _SEEDS[:, None]).min(axis=1)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+def band_keys(sig: np.ndarray) -> List[int]:
+    """One integer per LSH band (band index in the high bits), for persistent bucket lookups."""
+    return [(band << 32) | zlib.crc32(sig[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+
+def cluster(texts: List[str], threshold: float = DUP_THRESHOLD) -> List[List[int]]:
+    """Group indices of near-duplicate texts (LSH candidates verified by signature)."""
+    sigs = [minhash(t) for t in texts]
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets: Dict[tuple, List[int]] = {}
+    for i, sig in enumerate(sigs):
+        if sig is None:
+            continue
+        for band in range(BANDS):
+            buckets.setdefault((band, sig[band * ROWS:(band + 1) * ROWS].tobytes()), []).append(i)
+    # Every pair sharing a bucket is a candidate, each verified once however many bands it shares
+    candidates = {(a, b) for members in buckets.values() for x, a in enumerate(members) for b in members[x + 1:]}
+    for i, j in sorted(candidates):
+        if find(i) != find(j) and similarity(sigs[i], sigs[j]) >= threshold:
+            parent[find(j)] = find(i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(texts)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def dedupe_sections(sections: List[dict]) -> List[dict]:
+    """
+    Collapse duplicate news results across all sections: same canonical URL or
+    near-identical title+snippet. The best-scored item of each cluster stays
+    (in its own section) with `also_reported_by`; the rest are dropped.
+    """
+    flat = [(si, item) for si, sec in enumerate(sections) for item in sec.get("results", [])]
+    if not flat:
+        return sections
+
+    # Exact duplicates by canonical URL first, then MinHash over the survivors
+    by_url: Dict[str, int] = {}
+    url_groups: List[List[int]] = []
+    for idx, (_, item) in enumerate(flat):
+        url = canonical_url(item.get("url", ""))
+        item["canonical_url"] = url
+        if url and url in by_url:
+            url_groups[by_url[url]].append(idx)
+        else:
+            by_url[url] = len(url_groups)
+            url_groups.append([idx])
+
+    reps = [g[0] for g in url_groups]
+    texts = [f"{flat[i][1].get('title', '')} {flat[i][1].get('snippet', '')[:200]}" for i in reps]
+    keep = {}
+    for group in cluster(texts):
+        members = [m for g in group for m in url_groups[g]]
+        best = max(members, key=lambda m: flat[m][1].get("score", 0) or 0)
+        others = [flat[m][1] for m in members if m != best]
+        keep[best] = [
+            {"source": o.get("source", ""), "url": o.get("url", ""), "title": o.get("title", "")}
+            for o in others if o.get("canonical_url") != flat[best][1].get("canonical_url")
+        ]
+
+    out = [{**sec, "results": []} for sec in sections]
+    for idx, (si, item) in enumerate(flat):
+        if idx in keep:
+            out[si]["results"].append({**item, "also_reported_by": keep[idx]})
+    return out
@@ -0,0 +1,63 @@
+"""
+शिक्षक सहायक — Shared outbound HTTP client
+One pooled httpx.AsyncClient for page fetches (keep-alive, bounded
+connections), closed in the app lifespan.
+
+Fetches of user-supplied URLs pass an `allow` check: redirects are then
+followed by hand and every hop must pass it too, so an allowlisted page
+cannot bounce the server to an arbitrary (or internal) address.
+"""
+from typing import Callable, Optional, Tuple
+
+import httpx
+
+USER_AGENT = "Mozilla/5.0 (Linux; Android 10) ShikshakSahayak/1.0 (+reader)"
+
+MAX_REDIRECTS = 5
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class RedirectBlocked(Exception):
+    """A redirect led outside the hosts the caller allows (or went on too long)."""
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(15, connect=5),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT, "Accept-Language": "hi-IN,hi;q=0.9,en;q=0.6"},
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def fetch_capped(url: str, max_bytes: int, headers: Optional[dict] = None,
+                       allow: Optional[Callable[[str], bool]] = None) -> Tuple[httpx.Response, bytes]:
+    """GET `url`, reading at most `max_bytes` of the body. Returns (response, body).
+    With `allow`, each redirect target must satisfy allow(url), else RedirectBlocked."""
+    client = get_http_client()
+    for _ in range(MAX_REDIRECTS + 1):
+        async with client.stream("GET", url, headers=headers, follow_redirects=allow is None) as resp:
+            if allow is not None and resp.is_redirect:
+                url = str(resp.url.join(resp.headers["location"]))
+                if not allow(url):
+                    raise RedirectBlocked(f"redirect to {url} is not allowed")
+                continue
+            chunks, size = [], 0
+            async for chunk in resp.aiter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= max_bytes:
+                    break
+        return resp, b"".join(chunks)[:max_bytes]
+    raise RedirectBlocked(f"more than {MAX_REDIRECTS} redirects")
@@ -0,0 +1,172 @@
+"""
+शिक्षक सहायक — News Archive
+Every refresh upserts its articles into an indexed SQLite table keyed by
+canonical URL, so /news/feed can page back through history with a
+(published, url) cursor without extra Tavily calls. Methods block on SQLite;
+async callers run them with asyncio.to_thread.
+"""
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.logger import logger
+from app.services.dedup import canonical_url
+
+NEWS_ARCHIVE_PATH = os.getenv(
+    "NEWS_ARCHIVE_PATH", str(Path(__file__).resolve().parent.parent.parent / "var" / "news_archive.sqlite3"))
+
+
+def parse_published(value: str) -> Optional[float]:
+    """Epoch seconds from Tavily's published_date (RFC 2822 or ISO 8601), else None."""
+    if not value:
+        return None
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def encode_cursor(ts: float, url: str) -> str:
+    return base64.urlsafe_b64encode(f"{ts!r}|{url}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """(published_ts, url) from a cursor; ValueError if it was not made by encode_cursor."""
+    try:
+        ts, url = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return float(ts), url
+    except (ValueError, UnicodeError):
+        raise ValueError(f"invalid cursor: {cursor!r}") from None
+
+
+class NewsArchive:
+    def __init__(self, path: str = NEWS_ARCHIVE_PATH):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()      # one connection shared by to_thread callers
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    url TEXT PRIMARY KEY,
+                    link TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    snippet TEXT,
+                    source TEXT,
+                    section TEXT,
+                    score REAL,
+                    published_date TEXT,
+                    published_ts REAL NOT NULL,
+                    first_seen REAL NOT NULL,
+                    also_reported_by TEXT
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS articles_published ON articles(published_ts DESC, url DESC)")
+            db.execute("CREATE INDEX IF NOT EXISTS articles_section ON articles(section, published_ts DESC, url DESC)")
+            self._db = db
+        return self._db
+
+    @contextmanager
+    def _transaction(self):
+        """One write transaction (autocommit connection: `with db` alone would commit per statement)."""
+        db = self.db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def upsert(self, sections: List[dict]) -> int:
+        """Insert articles not seen before; returns how many were new."""
+        now = time.time()
+        rows = {}
+        for sec in sections:
+            for item in sec.get("results", []):
+                url = item.get("canonical_url") or canonical_url(item.get("url", ""))
+                if url and url not in rows:
+                    rows[url] = (sec.get("key", sec.get("label", "")), item)
+        if not rows:
+            return 0
+        urls = list(rows)
+        with self._lock, self._transaction() as db:
+            known = {
+                r[0] for r in db.execute(
+                    f"SELECT url FROM articles WHERE url IN ({','.join('?' * len(urls))})", urls)
+            }
+            new = [
+                (url, item.get("url", url), item.get("title", ""), item.get("snippet", ""), item.get("source", ""),
+                 section, item.get("score", 0), item.get("published_date", ""),
+                 parse_published(item.get("published_date", "")) or now, now,
+                 json.dumps(item.get("also_reported_by", []), ensure_ascii=False))
+                for url, (section, item) in rows.items() if url not in known
+            ]
+            db.executemany(
+                "INSERT OR IGNORE INTO articles (url, link, title, snippet, source, section, score, "
+                "published_date, published_ts, first_seen, also_reported_by) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", new)
+        if new:
+            logger.info(f"News archive: {len(new)} new of {len(rows)} articles")
+        return len(new)
+
+    def page(self, before: Optional[str] = None, limit: int = 20,
+             section: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        Newest-first page of articles older than the `before` cursor; returns
+        (items, next_cursor). Raises ValueError for a cursor that does not decode,
+        rather than silently starting over from the first page.
+        """
+        where, args = [], []
+        if section:
+            where.append("section = ?")
+            args.append(section)
+        if before:
+            where.append("(published_ts, url) < (?, ?)")
+            args.extend(decode_cursor(before))
+        sql = "SELECT * FROM articles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY published_ts DESC, url DESC LIMIT ?"
+        with self._lock:
+            rows = self.db.execute(sql, (*args, limit + 1)).fetchall()
+
+        items = [{
+            "title": r["title"],
+            "url": r["link"],
+            "snippet": r["snippet"],
+            "source": r["source"],
+            "section": r["section"],
+            "score": r["score"],
+            "published_date": r["published_date"],
+            "also_reported_by": json.loads(r["also_reported_by"] or "[]"),
+        } for r in rows[:limit]]
+        next_cursor = encode_cursor(rows[limit - 1]["published_ts"], rows[limit - 1]["url"]) if len(rows) > limit else None
+        return items, next_cursor
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"articles": self.db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]}
+
+
+news_archive = NewsArchive()
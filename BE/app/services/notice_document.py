@@ -0,0 +1,75 @@
+"""
+शिक्षक सहायक — Notice document extraction
+Text and metadata (order/letter number, issue date) from the page or PDF a
+notice links to. extract_document() is CPU-bound and runs in a process pool.
+"""
+import io
+import re
+from datetime import date
+
+from app.services.reader import extract
+
+MAX_TEXT_CHARS = 20_000
+MAX_PDF_PAGES = 30
+
+_DEVANAGARI_DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+
+ORDER_RE = re.compile(
+    r"(?:पत्रांक|ज्ञापांक|आदेश\s*सं(?:ख्या|०|\.)|संकल्प\s*सं(?:ख्या|०|\.)|अधिसूचना\s*सं(?:ख्या|०|\.)|"
+    r"memo\s*no|letter\s*no|order\s*no|notification\s*no|advt\.?\s*no|advertisement\s*no)\.?\s*[:\-–—]?\s*"
+    r"([0-9A-Za-zऀ-ॿ][0-9A-Za-zऀ-ॿ()./\-–]*(?:\s?[/\-–]\s?[0-9A-Za-zऀ-ॿ()./\-–]+){0,6})",
+    re.I)
+ISSUE_DATE_RE = re.compile(
+    r"(?:दिनांक|दि०|दि\.|dated|date)\s*[:\-–—]?\s*(\d{1,2})\s*[./\-]\s*(\d{1,2})\s*[./\-]\s*(\d{2,4})", re.I)
+
+
+def normalize_digits(text: str) -> str:
+    return text.translate(_DEVANAGARI_DIGITS)
+
+
+def parse_metadata(text: str) -> dict:
+    """Order number and issue date (ISO) from the first part of a circular."""
+    head = normalize_digits(text[:4000])
+    meta = {"order_number": None, "issue_date": None}
+    m = ORDER_RE.search(head)
+    if m:
+        meta["order_number"] = m.group(1).strip(" .-–")[:80]
+    for m in ISSUE_DATE_RE.finditer(head):
+        d, mth, y = (int(x) for x in m.groups())
+        if y < 100:
+            y += 2000
+        if not 2000 <= y <= 2100:
+            continue
+        try:
+            meta["issue_date"] = date(y, mth, d).isoformat()     # rejects 31.02 and the like
+        except ValueError:
+            continue
+        break
+    return meta
+
+
+def _pdf_text(body: bytes) -> str:
+    try:
+        from pypdf import PdfReader   # optional dependency: PDFs are skipped without it
+    except ImportError:
+        return ""
+    reader = PdfReader(io.BytesIO(body))
+    pages = []
+    for page in reader.pages[:MAX_PDF_PAGES]:
+        pages.append(page.extract_text() or "")
+        if sum(len(p) for p in pages) >= MAX_TEXT_CHARS:
+            break
+    return "\n\n".join(p.strip() for p in pages if p.strip())
+
+
+def extract_document(body: bytes, content_type: str, url: str) -> dict:
+    """{"text", "document_type", "order_number", "issue_date"} for a fetched notice document."""
+    is_pdf = "pdf" in (content_type or "").lower() or body[:5] == b"%PDF-"
+    if is_pdf:
+        text = _pdf_text(body)
+    else:
+        html = body.decode("utf-8", errors="replace")
+        text = extract(html, url)["text"]
+    text = re.sub(r"[ \t]+", " ", text).strip()[:MAX_TEXT_CHARS]
+    return {"text": text, "document_type": "pdf" if is_pdf else "html", **parse_metadata(text)}
+
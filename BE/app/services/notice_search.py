@@ -0,0 +1,141 @@
+"""
+शिक्षक सहायक — Notice Search
+An inverted index (term → notice, term frequency) kept in the notice store's
+SQLite file and updated per notice as notices are stored or enriched, with
+BM25 ranking. Tokenization is Hindi-aware:
+  - Devanagari digits → ASCII, nukta dropped, chandrabindu → anusvara
+  - light suffix stripping so "स्थानांतरणों" matches "स्थानांतरण"
+  - Hindi and English stopwords removed
+Order numbers are also indexed whole, so "11/वि13-14/2024-1234" finds its circular.
+"""
+import math
+import re
+import sqlite3
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+_DEVANAGARI_DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+_TOKEN = re.compile(r"[0-9a-zऀ-ॣॱ-ॿ]+")
+
+# Longest first, so "ियों" is tried before "ों"
+_HI_SUFFIXES = sorted([
+    "ाएंगी", "ाएंगे", "ाऊंगी", "ाऊंगा", "ाइयाँ", "ाइयों", "ाइयां", "ियाँ", "ियों", "ियां", "ाओं", "ाएं", "ाएँ",
+    "ुओं", "ुएं", "ुएँ", "ताओं", "ोगे", "ोगी", "ेगी", "ेगा", "ीय", "ों", "ें", "ीं", "ाँ", "ां", "ाओ", "िया",
+    "ता", "ती", "ते", "ना", "नी", "ने", "कर", "ाए", "ी", "े", "ो", "ा", "ि", "ु",
+], key=len, reverse=True)
+
+STOPWORDS = {
+    "का", "के", "की", "को", "में", "से", "पर", "है", "हैं", "था", "थे", "और", "एवं", "तथा", "या", "यह", "वह",
+    "इस", "उस", "जो", "कि", "भी", "हेतु", "लिए", "द्वारा", "संबंध", "सम्बन्ध", "विषय", "ने", "तक", "गया", "गई",
+    "the", "of", "and", "to", "in", "for", "a", "an", "on", "by", "with", "is", "are", "at", "from", "regarding",
+}
+
+FIELD_WEIGHTS = {"title": 3, "order_number": 3, "summary": 1, "text": 1, "source": 1}
+K1, B = 1.2, 0.75
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFD", text.lower().translate(_DEVANAGARI_DIGITS))
+    text = text.replace("़", "").replace("ँ", "ं")    # nukta, chandrabindu
+    return unicodedata.normalize("NFC", text)
+
+
+def _stem(token: str) -> str:
+    if token.isascii():
+        return token[:-1] if len(token) > 4 and token.endswith("s") and not token.endswith("ss") else token
+    for suffix in _HI_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(t) for t in _TOKEN.findall(normalize(text or "")) if t not in STOPWORDS]
+
+
+def order_key(order_number: str) -> str:
+    """Order numbers compared without spacing/dash variants: "11 / वि13–14" == "11/वि13-14"."""
+    return "#" + re.sub(r"\s+", "", re.sub(r"[–—]", "-", normalize(order_number))).strip("-.")
+
+
+def _terms(notice: dict) -> Counter:
+    tf: Counter = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for t in tokenize(notice.get(field) or ""):
+            tf[t] += weight
+    if notice.get("order_number"):
+        tf[order_key(notice["order_number"])] += 5
+    return tf
+
+
+class NoticeIndex:
+    """Inverted index tables living in the notice store's connection."""
+
+    @staticmethod
+    def create(db: sqlite3.Connection) -> None:
+        db.execute("CREATE TABLE IF NOT EXISTS postings (term TEXT NOT NULL, id TEXT NOT NULL, tf REAL NOT NULL, "
+                   "PRIMARY KEY (term, id)) WITHOUT ROWID")
+        db.execute("CREATE INDEX IF NOT EXISTS postings_id ON postings(id)")
+        db.execute("CREATE TABLE IF NOT EXISTS doc_lengths (id TEXT PRIMARY KEY, length REAL NOT NULL)")
+
+    @staticmethod
+    def index(db: sqlite3.Connection, nid: str, notice: dict) -> None:
+        """(Re)index one notice; call inside the store's write transaction."""
+        tf = _terms(notice)
+        db.execute("DELETE FROM postings WHERE id = ?", (nid,))
+        db.executemany("INSERT INTO postings (term, id, tf) VALUES (?, ?, ?)", [(t, nid, f) for t, f in tf.items()])
+        db.execute("INSERT OR REPLACE INTO doc_lengths (id, length) VALUES (?, ?)", (nid, sum(tf.values())))
+
+    @staticmethod
+    def search(db: sqlite3.Connection, query: str, category: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None, limit: int = 20) -> List[dict]:
+        """[{id, score}] best first, BM25 over the query terms with category/date filters."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if "/" in query:
+            terms.append(order_key(query))
+        if not terms:
+            return []
+        n_docs, avg_len = db.execute("SELECT COUNT(*), AVG(length) FROM doc_lengths").fetchone()
+        if not n_docs:
+            return []
+
+        postings: Dict[str, List[tuple]] = defaultdict(list)
+        for r in db.execute(f"SELECT term, id, tf FROM postings WHERE term IN ({','.join('?' * len(terms))})", terms):
+            postings[r[0]].append((r[1], r[2]))
+        candidates = {nid for plist in postings.values() for nid, _ in plist}
+        if not candidates:
+            return []
+
+        where, args = ["n.duplicate_of IS NULL"], []
+        if len(candidates) <= 500:
+            where.append(f"n.id IN ({','.join('?' * len(candidates))})")
+            args.extend(candidates)
+        if category:
+            where.append("n.category = ?")
+            args.append(category)
+        if since is not None:
+            where.append("n.date_ts >= ?")
+            args.append(since)
+        if until is not None:
+            where.append("n.date_ts < ?")
+            args.append(until)
+        lengths = {
+            r[0]: r[1] for r in db.execute(
+                "SELECT n.id, d.length FROM notices n JOIN doc_lengths d ON d.id = n.id WHERE " + " AND ".join(where),
+                args)
+        }
+
+        scores: Dict[str, float] = defaultdict(float)
+        matched: Dict[str, int] = defaultdict(int)
+        for term, plist in postings.items():
+            idf = math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+            for nid, tf in plist:
+                if nid not in lengths:
+                    continue
+                norm = K1 * (1 - B + B * lengths[nid] / (avg_len or 1))
+                scores[nid] += idf * tf * (K1 + 1) / (tf + norm)
+                matched[nid] += 1
+        # Notices matching more of the query terms rank first, then by BM25
+        ranked = sorted(scores, key=lambda nid: (-matched[nid], -scores[nid]))[:limit]
+        return [{"id": nid, "score": round(scores[nid], 3)} for nid in ranked]
@@ -0,0 +1,446 @@
+"""
+शिक्षक सहायक — Notice Store
+Notices are keyed by a hash of their canonical URL, so an ID stays the same
+across refreshes and restarts. They live in an indexed SQLite table, and the
+per-category feeds are precomputed views rebuilt only when the table changes.
+
+Each thread gets its own connection: writes (upsert, update, page state) are
+meant to be run with asyncio.to_thread and are serialized by a lock, while
+reads on the event loop see the last committed snapshot (WAL).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.logger import logger
+from app.services.dedup import canonical_url
+from app.services.news_archive import parse_published
+from app.services.notice_search import NoticeIndex, order_key
+from app.services.dedup import band_keys, minhash, similarity
+from app.services.dates import IST, extract_dates, to_ts
+
+NOTICE_STORE_PATH = os.getenv(
+    "NOTICE_STORE_PATH", str(Path(__file__).resolve().parent.parent.parent / "var" / "notices.sqlite3"))
+VIEW_LIMIT = 100        # notices kept in each precomputed category view
+EVENT_RETENTION = 7 * 24 * 3600   # change-log kept for stream resumes
+NOTICE_DUP_THRESHOLD = 0.6        # estimated Jaccard of notice text to merge two notices
+MIN_DUP_TEXT = 200                # shorter texts (bare titles) are only merged by order number
+ALL = "सभी"
+
+
+def notice_id(url: str) -> str:
+    """Stable content-addressed ID: the same notice URL always maps to the same ID."""
+    return "n-" + hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()[:12]
+
+
+class NoticeStore:
+    def __init__(self, path: str = NOTICE_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.RLock()
+        self._backfilled = False
+        self._views: Dict[str, List[dict]] = {}
+        self._version: Optional[int] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """This thread's connection (SQLite connections must not be shared by concurrent threads)."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._connect()
+            if not self._backfilled:
+                self._backfilled = True
+                self._backfill_index()
+        return db
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        # Schema and migrations in one write transaction, so connections opened at the same
+        # time (threads, workers) do not both find a column missing and both add it
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            self._create_schema(db)
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return db
+
+    @staticmethod
+    def _create_schema(db: sqlite3.Connection) -> None:
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS notices (
+                id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                category TEXT NOT NULL,
+                date_ts REAL NOT NULL,
+                first_seen REAL NOT NULL,
+                data TEXT NOT NULL,
+                extra TEXT
+            )
+        """)
+        columns = {r["name"] for r in db.execute("PRAGMA table_info(notices)")}
+        for column in ("extra", "dates", "duplicate_of"):
+            if column not in columns:
+                db.execute(f"ALTER TABLE notices ADD COLUMN {column} TEXT")
+        db.execute("CREATE INDEX IF NOT EXISTS notices_date ON notices(date_ts DESC, id)")
+        db.execute("CREATE INDEX IF NOT EXISTS notices_category ON notices(category, date_ts DESC, id)")
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS portal_pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                checked REAL NOT NULL,
+                ok REAL
+            )
+        """)
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS notice_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                ts REAL NOT NULL
+            )
+        """)
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS notice_deadlines (
+                id TEXT NOT NULL,
+                date TEXT NOT NULL,
+                due_ts REAL NOT NULL,
+                PRIMARY KEY (id, date)
+            )
+        """)
+        db.execute("CREATE INDEX IF NOT EXISTS notice_deadlines_due ON notice_deadlines(due_ts)")
+        db.execute("CREATE INDEX IF NOT EXISTS notices_duplicate ON notices(duplicate_of)")
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS notice_fingerprints (
+                id TEXT PRIMARY KEY,
+                sig BLOB,
+                order_key TEXT
+            )
+        """)
+        db.execute("CREATE INDEX IF NOT EXISTS notice_fingerprints_order ON notice_fingerprints(order_key)")
+        db.execute("CREATE TABLE IF NOT EXISTS notice_bands (band_key INTEGER NOT NULL, id TEXT NOT NULL, "
+                   "PRIMARY KEY (band_key, id)) WITHOUT ROWID")
+        NoticeIndex.create(db)
+
+    @contextmanager
+    def _transaction(self):
+        """One write transaction (autocommit connection: `with db` alone would commit per statement)."""
+        db = self.db
+        with self._write_lock:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        self._version = None     # views are rebuilt on the next view()
+
+    def upsert(self, notices: List[dict]) -> int:
+        """Insert new notices and merge updates into known ones; returns how many were new."""
+        now = time.time()
+        incoming = {}
+        for n in notices:
+            url = n.get("url", "")
+            if not url:
+                continue
+            n = {**n, "id": notice_id(url)}
+            incoming.setdefault(n["id"], n)
+        if not incoming:
+            return 0
+        ids = list(incoming)
+        # Read and write in one transaction, so a concurrent upsert or update() is not overwritten
+        with self._transaction() as db:
+            known = {
+                r["id"]: r for r in db.execute(
+                    f"SELECT id, first_seen, data FROM notices WHERE id IN ({','.join('?' * len(ids))})", ids)
+            }
+            rows, new = [], 0
+            for nid, n in incoming.items():
+                old = known.get(nid)
+                if old is not None:
+                    # Only write real changes; fields from update() live in `extra` and survive
+                    merged = {**json.loads(old["data"]), **n}
+                    if merged == json.loads(old["data"]):
+                        continue
+                    n, first_seen = merged, old["first_seen"]
+                else:
+                    first_seen = now
+                    new += 1
+                date_ts = parse_published(n.get("date", "")) or first_seen
+                rows.append((nid, canonical_url(n["url"]), n.get("category", ""), date_ts, first_seen,
+                             json.dumps(n, ensure_ascii=False)))
+            if rows:
+                db.executemany(
+                    "INSERT INTO notices (id, url, category, date_ts, first_seen, data) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET url = excluded.url, date_ts = excluded.date_ts, "
+                    "data = excluded.data, category = COALESCE(json_extract(extra, '$.category'), excluded.category)",
+                    rows)
+                for nid in (r[0] for r in rows):
+                    self._derive(nid)
+                self._log_events([(r[0], "updated" if r[0] in known else "new") for r in rows])
+        if rows:
+            logger.info(f"Notice store: {new} new, {len(rows) - new} updated of {len(incoming)} notices")
+        return new
+
+    def update(self, nid: str, fields: dict, notify: bool = True) -> None:
+        """Attach derived fields (full text, metadata, re-categorization) that later upserts keep."""
+        # The merge reads `extra` inside the write transaction: two concurrent updates both keep their fields
+        with self._transaction() as db:
+            row = db.execute("SELECT extra FROM notices WHERE id = ?", (nid,)).fetchone()
+            if row is None:
+                return
+            extra = {**json.loads(row["extra"] or "{}"), **fields}
+            db.execute("UPDATE notices SET extra = ?, category = COALESCE(?, category) WHERE id = ?",
+                       (json.dumps(extra, ensure_ascii=False), extra.get("category"), nid))
+            self._derive(nid)
+            if notify:
+                self._log_events([(nid, "updated")])
+
+    def _log_events(self, events: List[tuple]) -> None:
+        now = time.time()
+        self.db.executemany("INSERT INTO notice_events (id, kind, ts) VALUES (?, ?, ?)",
+                            [(nid, kind, now) for nid, kind in events])
+        self.db.execute("DELETE FROM notice_events WHERE ts < ?", (now - EVENT_RETENTION,))
+
+    def events_since(self, seq: int, limit: int = 500) -> List[dict]:
+        """Change-log entries after `seq`, oldest first, with the notice as it is now (no full text)."""
+        out = []
+        for r in self.db.execute(
+                "SELECT e.seq, e.kind, n.data, n.extra, n.dates FROM notice_events e JOIN notices n ON n.id = e.id "
+                "WHERE e.seq > ? AND n.duplicate_of IS NULL ORDER BY e.seq LIMIT ?", (seq, limit)):
+            notice = self._row(r)
+            notice.pop("text", None)
+            out.append({"seq": r["seq"], "kind": r["kind"], "notice": notice})
+        return out
+
+    def event_bounds(self) -> tuple:
+        """(oldest, newest) change-log seq, (0, 0) when empty."""
+        lo, hi = self.db.execute("SELECT MIN(seq), MAX(seq) FROM notice_events").fetchone()
+        return lo or 0, hi or 0
+
+    def _derive(self, nid: str) -> None:
+        """Refresh everything computed from a notice: search postings, dates, deadlines, sort key."""
+        row = self.db.execute("SELECT data, extra, first_seen FROM notices WHERE id = ?", (nid,)).fetchone()
+        notice = self._row(row)
+        NoticeIndex.index(self.db, nid, notice)
+
+        published = parse_published(notice.get("date", "")) or row["first_seen"]
+        text = "\n".join(notice.get(k) or "" for k in ("title", "summary"))
+        text += "\n" + (notice.get("text") or notice.get("content") or "")
+        dates = extract_dates(text, ref=datetime.fromtimestamp(published, IST).date())
+        issue = notice.get("issue_date") or dates["issue_date"]
+        date_ts = to_ts(issue) if issue else published
+        self.db.execute("UPDATE notices SET dates = ?, date_ts = ? WHERE id = ?",
+                        (json.dumps(dates, ensure_ascii=False), date_ts, nid))
+        self.db.execute("DELETE FROM notice_deadlines WHERE id = ?", (nid,))
+        self.db.executemany("INSERT OR IGNORE INTO notice_deadlines (id, date, due_ts) VALUES (?, ?, ?)",
+                            [(nid, d["date"], to_ts(d["date"])) for d in dates["deadlines"]])
+        self._dedupe(nid, notice)
+
+    def _dedupe(self, nid: str, notice: dict) -> None:
+        """
+        Merge a notice into an earlier one with the same order number or near-identical
+        text (MinHash LSH buckets kept in SQLite, so a check is a few index lookups).
+        """
+        text = notice.get("text") or (notice.get("title", "") + " " + notice.get("summary", ""))
+        sig = minhash(text[:5000]) if len(text.strip()) >= MIN_DUP_TEXT else None
+        okey = order_key(notice["order_number"]) if notice.get("order_number") else None
+        blob = sig.astype("<u8").tobytes() if sig is not None else None
+        keys = band_keys(sig) if sig is not None else []
+        old = self.db.execute("SELECT sig FROM notice_fingerprints WHERE id = ?", (nid,)).fetchone()
+        self.db.execute("INSERT OR REPLACE INTO notice_fingerprints (id, sig, order_key) VALUES (?, ?, ?)",
+                        (nid, blob, okey))
+        if old is None or old["sig"] != blob:
+            # Bands change only with the text; old ones are removed by primary key
+            if old is not None and old["sig"] is not None:
+                old_keys = band_keys(np.frombuffer(old["sig"], dtype="<u8"))
+                self.db.executemany("DELETE FROM notice_bands WHERE band_key = ? AND id = ?",
+                                    [(k, nid) for k in old_keys])
+            self.db.executemany("INSERT OR IGNORE INTO notice_bands (band_key, id) VALUES (?, ?)",
+                                [(k, nid) for k in keys])
+
+        # A notice that others already point at stays canonical
+        if self.db.execute("SELECT 1 FROM notices WHERE duplicate_of = ? LIMIT 1", (nid,)).fetchone():
+            return
+        match = None
+        if okey:
+            match = self.db.execute(
+                "SELECT f.id FROM notice_fingerprints f JOIN notices n ON n.id = f.id WHERE f.order_key = ? "
+                "AND f.id != ? AND n.duplicate_of IS NULL ORDER BY n.first_seen LIMIT 1", (okey, nid)).fetchone()
+        if match is None and keys:
+            for r in self.db.execute(
+                    f"SELECT DISTINCT f.id, f.sig FROM notice_bands b JOIN notice_fingerprints f ON f.id = b.id "
+                    f"JOIN notices n ON n.id = b.id WHERE b.band_key IN ({','.join('?' * len(keys))}) "
+                    f"AND b.id != ? AND n.duplicate_of IS NULL ORDER BY n.first_seen", (*keys, nid)):
+                other = np.frombuffer(r["sig"], dtype="<u8")
+                if similarity(sig, other) >= NOTICE_DUP_THRESHOLD:
+                    match = r
+                    break
+        canonical = match["id"] if match else None
+        previous = self.db.execute("SELECT duplicate_of FROM notices WHERE id = ?", (nid,)).fetchone()[0]
+        if canonical != previous:
+            self.db.execute("UPDATE notices SET duplicate_of = ? WHERE id = ?", (canonical, nid))
+            if canonical:
+                logger.info(f"Notice store: {nid} merged into {canonical}")
+                self._log_events([(canonical, "updated")])
+
+    def _backfill_index(self) -> None:
+        """Derive search postings and dates for notices stored before those existed."""
+        missing = [r[0] for r in self.db.execute(
+            "SELECT id FROM notices WHERE dates IS NULL OR id NOT IN (SELECT id FROM doc_lengths) "
+            "OR id NOT IN (SELECT id FROM notice_fingerprints)")]
+        if missing:
+            with self._transaction():
+                for nid in missing:
+                    self._derive(nid)
+            logger.info(f"Notice store: derived search/date index for {len(missing)} existing notices")
+
+    def search(self, query: str, category: Optional[str] = None, since: Optional[float] = None,
+               until: Optional[float] = None, limit: int = 20) -> List[dict]:
+        """Ranked notices for a free-text query (full text left out, like the feed views)."""
+        hits = NoticeIndex.search(self.db, query, category, since, until, limit)
+        results = []
+        for hit in hits:
+            notice = self.get(hit["id"])
+            if notice:
+                notice.pop("text", None)
+                results.append({**notice, "score": hit["score"]})
+        return results
+
+    @staticmethod
+    def _row(r: sqlite3.Row) -> dict:
+        n = json.loads(r["data"])
+        if "dates" in r.keys() and r["dates"]:
+            dates = json.loads(r["dates"])
+            n["deadlines"] = dates["deadlines"]
+            n["issue_date"] = dates["issue_date"]
+        n.update(json.loads(r["extra"] or "{}"))
+        if n.get("issue_date") and n.get("date") in (None, "", "Recently"):
+            n["date"] = n["issue_date"]
+        return n
+
+    def known(self, ids: List[str]) -> set:
+        """The subset of `ids` already stored."""
+        if not ids:
+            return set()
+        return {
+            r[0] for r in self.db.execute(
+                f"SELECT id FROM notices WHERE id IN ({','.join('?' * len(ids))})", ids)
+        }
+
+    def page_state(self, url: str) -> Optional[dict]:
+        """Validators and body hash from the last poll of a portal listing page."""
+        row = self.db.execute("SELECT * FROM portal_pages WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def save_page_state(self, url: str, ok: bool, etag: Optional[str] = None,
+                        last_modified: Optional[str] = None, body_hash: Optional[str] = None) -> None:
+        now = time.time()
+        with self._transaction():
+            old = self.page_state(url) or {}
+            self.db.execute(
+                "INSERT OR REPLACE INTO portal_pages (url, etag, last_modified, body_hash, checked, ok) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag if ok else old.get("etag"), last_modified if ok else old.get("last_modified"),
+                 body_hash if ok else old.get("body_hash"), now, now if ok else old.get("ok")))
+
+    def last_portal_ok(self) -> Optional[float]:
+        """When any portal listing page was last polled successfully."""
+        return self.db.execute("SELECT MAX(ok) FROM portal_pages").fetchone()[0]
+
+    def _sources(self, ids: Optional[List[str]] = None) -> Dict[str, List[dict]]:
+        """canonical id → the other sources merged into it."""
+        sql = "SELECT duplicate_of, data FROM notices WHERE duplicate_of IS NOT NULL"
+        args: list = []
+        if ids is not None:
+            sql += f" AND duplicate_of IN ({','.join('?' * len(ids))})"
+            args = ids
+        out: Dict[str, List[dict]] = {}
+        for r in self.db.execute(sql, args):
+            d = json.loads(r["data"])
+            out.setdefault(r["duplicate_of"], []).append(
+                {"id": d["id"], "source": d.get("source", ""), "url": d.get("url", ""), "title": d.get("title", "")})
+        return out
+
+    def get(self, nid: str) -> Optional[dict]:
+        """A notice by id; ids of merged duplicates resolve to their canonical notice."""
+        row = self.db.execute("SELECT data, extra, dates, duplicate_of FROM notices WHERE id = ?", (nid,)).fetchone()
+        if row is not None and row["duplicate_of"]:
+            return self.get(row["duplicate_of"])
+        if row is None:
+            return None
+        notice = self._row(row)
+        notice["other_sources"] = self._sources([nid]).get(nid, [])
+        return notice
+
+    def _rebuild_views(self) -> None:
+        """Newest VIEW_LIMIT notices overall and per category, each one indexed query (no full text)."""
+        self._version = self.db.execute("PRAGMA data_version").fetchone()[0]
+        categories = [r[0] for r in self.db.execute("SELECT DISTINCT category FROM notices")]
+        parsed: Dict[str, dict] = {}
+        rows: Dict[str, List[str]] = {}
+        for category in [ALL, *categories]:
+            where, args = "duplicate_of IS NULL", []
+            if category != ALL:
+                where += " AND category = ?"
+                args.append(category)
+            ids = rows[category] = []
+            # Full text is only served by /notice/{id}, so it is never parsed here
+            for r in self.db.execute(
+                    f"SELECT id, data, json_remove(extra, '$.text') AS extra, dates FROM notices WHERE {where} "
+                    f"ORDER BY date_ts DESC, id LIMIT ?", (*args, VIEW_LIMIT)):
+                if r["id"] not in parsed:
+                    parsed[r["id"]] = self._row(r)
+                ids.append(r["id"])
+        sources = self._sources(list(parsed)) if parsed else {}
+        for nid, n in parsed.items():
+            n.pop("text", None)
+            n["other_sources"] = sources.get(nid, [])
+        self._views = {category: [parsed[nid] for nid in ids] for category, ids in rows.items() if ids or category == ALL}
+
+    def view(self, category: Optional[str] = None) -> List[dict]:
+        """Newest-first notices for a category (or all), from the precomputed views."""
+        # data_version changes when another connection (worker or writer thread) commits
+        if self._version != self.db.execute("PRAGMA data_version").fetchone()[0]:
+            self._rebuild_views()
+        return self._views.get(category or ALL, [])
+
+    def deadlines(self, within: float, limit: int = 50) -> List[dict]:
+        """Notices with a deadline in the next `within` seconds, soonest first (one entry per deadline)."""
+        now = time.time()
+        out = []
+        for r in self.db.execute(
+                "SELECT d.date, d.due_ts, n.data, n.extra, n.dates FROM notice_deadlines d "
+                "JOIN notices n ON n.id = d.id WHERE d.due_ts >= ? AND d.due_ts < ? AND n.duplicate_of IS NULL "
+                "ORDER BY d.due_ts LIMIT ?",
+                (now, now + within, limit)):
+            notice = self._row(r)
+            notice.pop("text", None)
+            deadline = next((d for d in notice.get("deadlines", []) if d["date"] == r["date"]), {"date": r["date"]})
+            out.append({"deadline": deadline, "days_left": int((r["due_ts"] - now) // 86400), "notice": notice})
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "notices": self.db.execute("SELECT COUNT(*) FROM notices").fetchone()[0],
+            "views": {k: len(v) for k, v in self._views.items()},
+        }
+
+
+notice_store = NoticeStore()
@@ -0,0 +1,121 @@
+"""
+शिक्षक सहायक — Question Paper Assembler
+Selects items from a question pool to satisfy per-section marks, a difficulty
+mix and topic coverage, producing non-overlapping sets (A/B/C).
+
+The solver is greedy: each section's count is apportioned across difficulties
+(largest remainder), and each slot takes the unused item of the wanted
+difficulty whose topic is least covered so far in the set. That is O(items)
+per paper, i.e. milliseconds for a few thousand cached items.
+"""
+import random
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from app.services.question_store import DIFFICULTIES
+
+SET_NAMES = "ABCDEF"
+
+
+def normalize_mix(mix: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """Fractions per difficulty summing to 1; unspecified share goes to medium."""
+    mix = {d: max(0.0, float(v)) for d, v in (mix or {}).items() if d in DIFFICULTIES}
+    total = sum(mix.values())
+    if total > 1:
+        return {d: mix.get(d, 0.0) / total for d in DIFFICULTIES}
+    mix["medium"] = mix.get("medium", 0.0) + (1 - total)
+    return {d: mix.get(d, 0.0) for d in DIFFICULTIES}
+
+
+def apportion(count: int, mix: Dict[str, float]) -> Dict[str, int]:
+    """Split `count` slots across difficulties by largest remainder."""
+    raw = {d: count * mix[d] for d in DIFFICULTIES}
+    out = {d: int(raw[d]) for d in DIFFICULTIES}
+    left = count - sum(out.values())
+    for d in sorted(DIFFICULTIES, key=lambda d: raw[d] - out[d], reverse=True)[:left]:
+        out[d] += 1
+    return out
+
+
+def _pick(bucket: Dict[str, List[dict]], coverage: Counter, wanted_topics: set) -> Optional[dict]:
+    """Pop one item from the least-covered topic (requested topics first)."""
+    best = None
+    for topic, items in bucket.items():
+        if not items:
+            continue
+        rank = (coverage[topic], topic not in wanted_topics)
+        if best is None or rank < best[0]:
+            best = (rank, topic)
+    if best is None:
+        return None
+    topic = best[1]
+    coverage[topic] += 1
+    return bucket[topic].pop()
+
+
+def assemble(
+    pool: List[dict],
+    sections: List[dict],
+    difficulty_mix: Optional[Dict[str, float]] = None,
+    topics: Optional[List[str]] = None,
+    sets: int = 1,
+    strict: bool = False,
+    seed: Optional[int] = None,
+) -> Tuple[List[dict], Dict[Tuple[str, str], int]]:
+    """
+    Build `sets` papers from `pool`. `sections` is a list of
+    {"type", "count", "marks"}. Returns (papers, gaps) where gaps maps
+    (type, difficulty) to the number of missing items. With `strict`, slots of
+    a difficulty that has run out stay empty (so the caller can fill the gap);
+    otherwise they fall back to the nearest available difficulty.
+    """
+    rng = random.Random(seed)
+    mix = normalize_mix(difficulty_mix)
+    wanted = set(topics or [])
+
+    # type -> difficulty -> topic -> [items]; shuffled so sets differ per seed
+    buckets: Dict[str, Dict[str, Dict[str, List[dict]]]] = defaultdict(
+        lambda: defaultdict(lambda: defaultdict(list)))
+    shuffled = list(pool)
+    rng.shuffle(shuffled)
+    for item in shuffled:
+        if wanted and item.get("topic") not in wanted and not any(t in item.get("topic", "") for t in wanted):
+            continue
+        buckets[item["type"]][item.get("difficulty", "medium")][item.get("topic", "")].append(item)
+
+    gaps: Dict[Tuple[str, str], int] = Counter()
+    papers = []
+    for s in range(max(1, sets)):
+        coverage: Counter = Counter()
+        paper_sections = []
+        for sec in sections:
+            by_diff = buckets[sec["type"]]
+            chosen = []
+            for diff, need in apportion(sec["count"], mix).items():
+                for _ in range(need):
+                    item = _pick(by_diff[diff], coverage, wanted)
+                    if item is None and not strict:
+                        order = sorted(DIFFICULTIES, key=lambda d: abs(DIFFICULTIES.index(d) - DIFFICULTIES.index(diff)))
+                        for alt in order[1:]:
+                            item = _pick(by_diff[alt], coverage, wanted)
+                            if item:
+                                break
+                    if item is None:
+                        gaps[(sec["type"], diff)] += 1
+                        continue
+                    chosen.append({**item, "marks": sec["marks"]})
+            paper_sections.append({
+                "type": sec["type"],
+                "marks_each": sec["marks"],
+                "required": sec["count"],
+                "items": chosen,
+            })
+        all_items = [i for sec in paper_sections for i in sec["items"]]
+        papers.append({
+            "set": SET_NAMES[s] if s < len(SET_NAMES) else str(s + 1),
+            "sections": paper_sections,
+            "total_marks": sum(i["marks"] for i in all_items),
+            "difficulty": dict(Counter(i.get("difficulty", "medium") for i in all_items)),
+            "topics": dict(Counter(i.get("topic", "") for i in all_items)),
+        })
+    return papers, dict(gaps)
@@ -0,0 +1,116 @@
+"""
+शिक्षक सहायक — Password hashing
+Salted scrypt (memory-hard, in the standard library) run in a bounded process
+pool, so a burst of logins costs worker CPU without blocking the event loop.
+At most PASSWORD_HASH_CONCURRENCY hashes per app worker are queued or running;
+requests beyond that wait up to PASSWORD_HASH_WAIT seconds, then get HashingBusy.
+
+Stored format: scrypt$<log2 N>$<r>$<p>$<salt b64>$<hash b64>. Older accounts
+hold an unsalted SHA-256 hex digest; verify() accepts it and reports that the
+hash should be replaced, as it does for scrypt hashes made with other costs.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import time
+from typing import Any, Dict, Tuple
+
+from app.services.workers import run_in_process
+
+SCRYPT_LOG_N = int(os.getenv("PASSWORD_SCRYPT_LOG_N", "14"))     # N = 2**14: 16 MB and ~50 ms per hash
+SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(4 * HASH_WORKERS)))
+HASH_WAIT = float(os.getenv("PASSWORD_HASH_WAIT", "10"))
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+class HashingBusy(Exception):
+    """Too many logins/signups are already waiting for the hashing pool."""
+
+
+def _scrypt(password: str, salt: bytes, log_n: int, r: int, p: int) -> bytes:
+    n = 1 << log_n
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p + (1 << 20), dklen=KEY_BYTES)
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def is_legacy(stored: str) -> bool:
+    return len(stored) == 64 and all(c in "0123456789abcdef" for c in stored)
+
+
+class PasswordHasher:
+    def __init__(self):
+        self._slots = asyncio.Semaphore(HASH_CONCURRENCY)
+        # metrics
+        self.hashes = 0
+        self.verifications = 0
+        self.rehashes = 0
+        self.busy = 0
+        self.wait_total = 0.0
+        self.hash_total = 0.0
+
+    async def _run(self, password: str, salt: bytes, log_n: int, r: int, p: int) -> bytes:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), HASH_WAIT)
+        except asyncio.TimeoutError:
+            self.busy += 1
+            raise HashingBusy("hashing queue full")
+        begun = time.perf_counter()
+        self.wait_total += begun - start
+        try:
+            return await run_in_process("passwords", HASH_WORKERS, _scrypt, password, salt, log_n, r, p)
+        finally:
+            self._slots.release()
+            self.hashes += 1
+            self.hash_total += time.perf_counter() - begun
+
+    async def hash(self, password: str) -> str:
+        salt = os.urandom(SALT_BYTES)
+        key = await self._run(password, salt, SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_LOG_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(key)}"
+
+    async def verify(self, password: str, stored: str) -> Tuple[bool, bool]:
+        """(password matches, stored hash should be replaced with hash(password))."""
+        self.verifications += 1
+        if is_legacy(stored):
+            digest = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(digest, stored), True
+        try:
+            scheme, log_n, r, p, salt, key = stored.split("$")
+            log_n, r, p = int(log_n), int(r), int(p)
+        except ValueError:
+            return False, False
+        if scheme != "scrypt":
+            return False, False
+        ok = hmac.compare_digest(await self._run(password, _unb64(salt), log_n, r, p), _unb64(key))
+        return ok, ok and (log_n, r, p) != (SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "scheme": f"scrypt N=2^{SCRYPT_LOG_N} r={SCRYPT_R} p={SCRYPT_P}",
+            "workers": HASH_WORKERS,
+            "concurrency": HASH_CONCURRENCY,
+            "hashes": self.hashes,
+            "verifications": self.verifications,
+            "rehashed_on_login": self.rehashes,
+            "busy_rejects": self.busy,
+            "avg_wait_ms": round(1000 * self.wait_total / self.hashes, 1) if self.hashes else None,
+            "avg_hash_ms": round(1000 * self.hash_total / self.hashes, 1) if self.hashes else None,
+        }
+
+
+hasher = PasswordHasher()
@@ -0,0 +1,251 @@
+"""
+शिक्षक सहायक — Bihar Education Portal Scrapers
+Polls the notice/circular listing pages of each portal directly:
+  - listing pages are the ones linked from the portal's home page as
+    notices/circulars/notifications (looked up once a day), or fixed per
+    portal with PORTAL_PAGES='{"bpsc": ["https://…/notices"]}'
+  - conditional GET (ETag / Last-Modified) plus a body hash, so an unchanged
+    listing costs one small request and no parsing
+  - only links not already in the notice store are returned
+  - one request at a time per host, at least PORTAL_HOST_DELAY seconds apart
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import lxml.html
+
+from app.logger import logger
+from app.services.http import fetch_capped
+from app.services.notice_store import notice_id, notice_store
+
+PORTAL_INTERVAL = int(os.getenv("PORTAL_INTERVAL", "900"))         # seconds between polls
+PORTAL_HOST_DELAY = float(os.getenv("PORTAL_HOST_DELAY", "2.0"))   # min gap between requests to one host
+LISTING_MAX_BYTES = 1024 * 1024
+DISCOVERY_TTL = 24 * 3600           # seconds a home page's list of listing pages is kept
+MAX_LISTING_PAGES = 4               # listing pages polled per portal
+
+# Links that point at a notice rather than site navigation
+NOTICE_LINK = re.compile(r"\.pdf(\?|$)|notice|circular|letter|order|advt|advertisement|press|news|suchna|adesh", re.I)
+DATE_RE = re.compile(r"\b(\d{1,2})[./-](\d{1,2})[./-](\d{4})\b")
+GENERIC_TITLES = {"download", "view", "click here", "read more", "more", "pdf", "देखें", "डाउनलोड", "यहाँ क्लिक करें"}
+# Site chrome: links inside these are menus, not notices
+NAV_BLOCK = re.compile(r"menu|nav|breadcrumb|header|footer", re.I)
+# Home page links to the notice board / circular / notification listings
+LISTING_LINK = re.compile(
+    r"notice|circular|notification|advertisement|advt|announcement|what'?s new|latest|"
+    r"सूचना|परिपत्र|अधिसूचना|विज्ञापन|आदेश|संकल्प", re.I)
+
+
+class Portal:
+    def __init__(self, name: str, source: str, home: str, pages: Optional[List[str]] = None,
+                 link_pattern: re.Pattern = NOTICE_LINK):
+        self.name = name
+        self.source = source
+        self.home = home
+        self.pages = pages or []        # fixed listing pages; empty = found from the home page
+        self.link_pattern = link_pattern
+
+
+def _configured_pages() -> Dict[str, List[str]]:
+    try:
+        return json.loads(os.getenv("PORTAL_PAGES", "") or "{}")
+    except ValueError:
+        logger.warning("PORTAL_PAGES is not valid JSON; listing pages will be found from the home pages")
+        return {}
+
+
+_PAGES = _configured_pages()
+PORTALS = [
+    Portal(name, source, home, _PAGES.get(name))
+    for name, source, home in [
+        ("eshikshakosh", "ई-शिक्षाकोष पोर्टल", "https://eshikshakosh.bihar.gov.in/"),
+        ("educationbihar", "शिक्षा विभाग, बिहार", "https://state.bihar.gov.in/educationbihar/CitizenHome.html"),
+        ("madarsa", "मदरसा बोर्ड", "https://edu-madarsa-board.bihar.gov.in/"),
+        ("bpsc", "BPSC", "https://bpsc.bih.nic.in/"),
+    ]
+]
+
+
+def _clean(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def _in_navigation(el) -> bool:
+    for anc in el.iterancestors():
+        if anc.tag in ("nav", "header", "footer") or NAV_BLOCK.search(f"{anc.get('class', '')} {anc.get('id', '')}"):
+            return True
+    return False
+
+
+def _row_of(el):
+    """The table row / list item holding a link, for its title and date."""
+    for anc in el.iterancestors():
+        if anc.tag in ("tr", "li", "p"):
+            return anc
+    return el.getparent() if el.getparent() is not None else el
+
+
+def parse_listing(html: bytes, page_url: str, portal: Portal) -> List[dict]:
+    """Notice links on a listing page as {title, url, date} (date ISO when the row has one)."""
+    doc = lxml.html.fromstring(html)
+    doc.make_links_absolute(page_url, resolve_base_href=True)
+    items, seen = [], set()
+    for a in doc.iter("a"):
+        href = (a.get("href") or "").strip()
+        if not href.startswith(("http://", "https://")) or href in seen:
+            continue
+        if not portal.link_pattern.search(href + " " + (a.get("title") or "")) or _in_navigation(a):
+            continue
+        row = _row_of(a)
+        row_text = " ".join(_clean(t) for t in row.itertext())
+        title = _clean(a.text_content())
+        if len(title) < 8 or title.lower() in GENERIC_TITLES:
+            # "Download" links: the longest text cell in the row is the title
+            cells = [_clean(t) for t in row.itertext()]
+            cells = [c for c in cells if c.lower() not in GENERIC_TITLES and not DATE_RE.fullmatch(c)]
+            title = max(cells, key=len, default="")
+        if len(title) < 8:
+            continue
+        seen.add(href)
+        m = DATE_RE.search(row_text)
+        date = ""
+        if m:
+            d, mth, y = (int(x) for x in m.groups())
+            if 1 <= d <= 31 and 1 <= mth <= 12:
+                date = f"{y:04d}-{mth:02d}-{d:02d}"
+        items.append({"title": title[:300], "url": href, "date": date})
+    return items
+
+
+def find_listing_pages(html: bytes, home_url: str, limit: int = MAX_LISTING_PAGES) -> List[str]:
+    """Same-site pages a home page links to as notice/circular listings (documents themselves excluded)."""
+    doc = lxml.html.fromstring(html)
+    doc.make_links_absolute(home_url, resolve_base_href=True)
+    site = (urlsplit(home_url).hostname or "").lower()
+    pages: List[str] = []
+    for a in doc.iter("a"):
+        href = (a.get("href") or "").split("#")[0].strip()
+        if not href.startswith(("http://", "https://")) or href in pages or href.rstrip("/") == home_url.rstrip("/"):
+            continue
+        host = (urlsplit(href).hostname or "").lower()
+        if host != site and not host.endswith("." + site):
+            continue
+        if re.search(r"\.(pdf|docx?|xlsx?|jpe?g|png|zip)(\?|$)", href, re.I):
+            continue
+        if LISTING_LINK.search(_clean(a.text_content()) + " " + (a.get("title") or "") + " " + href):
+            pages.append(href)
+            if len(pages) >= limit:
+                break
+    return pages
+
+
+class PortalScraper:
+    def __init__(self, portals: List[Portal] = PORTALS):
+        self.portals = portals
+        self._host_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._host_last: Dict[str, float] = {}
+        self._listings: Dict[str, Tuple[float, List[str]]] = {}    # portal → (expires, listing pages)
+        # metrics
+        self.not_modified = 0
+        self.unchanged = 0
+        self.parsed = 0
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def _polite_fetch(self, url: str, headers: dict):
+        host = url.split("/")[2]
+        async with self._host_locks[host]:
+            wait = self._host_last.get(host, 0) + PORTAL_HOST_DELAY - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await fetch_capped(url, LISTING_MAX_BYTES, headers=headers)
+            finally:
+                self._host_last[host] = time.monotonic()
+
+    async def listing_pages(self, portal: Portal) -> List[str]:
+        """The portal's listing pages: configured, else discovered from its home page (cached a day)."""
+        if portal.pages:
+            return portal.pages
+        expires, pages = self._listings.get(portal.name, (0.0, []))
+        if time.time() < expires:
+            return pages
+        try:
+            resp, body = await self._polite_fetch(portal.home, {})
+            resp.raise_for_status()
+            found = await asyncio.to_thread(find_listing_pages, body, str(resp.url))
+        except Exception as e:
+            self.errors[portal.name] += 1
+            logger.warning(f"Portal '{portal.name}' home page failed, keeping {len(pages)} known listing pages: {e}")
+            return pages
+        if not found:
+            logger.warning(f"Portal '{portal.name}': no notice listing links on {portal.home}")
+        self._listings[portal.name] = (time.time() + DISCOVERY_TTL, found or pages)
+        return found or pages
+
+    async def poll_page(self, portal: Portal, url: str) -> Optional[List[dict]]:
+        """New items on one listing page; [] when unchanged, None when the fetch failed."""
+        state = await asyncio.to_thread(notice_store.page_state, url) or {}
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+        try:
+            resp, body = await self._polite_fetch(url, headers)
+            if resp.status_code == 304:
+                self.not_modified += 1
+                await asyncio.to_thread(notice_store.save_page_state, url, True, state.get("etag"),
+                                        state.get("last_modified"), state.get("body_hash"))
+                return []
+            resp.raise_for_status()
+        except Exception as e:
+            self.errors[portal.name] += 1
+            await asyncio.to_thread(notice_store.save_page_state, url, False)
+            logger.warning(f"Portal '{portal.name}' poll failed for {url}: {e}")
+            return None
+
+        body_hash = hashlib.sha1(body).hexdigest()
+        validators = (resp.headers.get("etag"), resp.headers.get("last-modified"), body_hash)
+        if body_hash == state.get("body_hash"):
+            self.unchanged += 1
+            await asyncio.to_thread(notice_store.save_page_state, url, True, *validators)
+            return []
+        self.parsed += 1
+        items = await asyncio.to_thread(parse_listing, body, str(resp.url), portal)
+        # Only remember the page once it has been parsed, so a failed parse is retried
+        await asyncio.to_thread(notice_store.save_page_state, url, True, *validators)
+        known = await asyncio.to_thread(notice_store.known, [notice_id(i["url"]) for i in items])
+        fresh = [{**i, "source": portal.source} for i in items if notice_id(i["url"]) not in known]
+        logger.info(f"Portal '{portal.name}': {len(fresh)} new of {len(items)} links on {url}")
+        return fresh
+
+    async def poll(self) -> Optional[List[dict]]:
+        """Poll every listing page (hosts in parallel); None when every page failed."""
+        listings = await asyncio.gather(*(self.listing_pages(p) for p in self.portals))
+        results = await asyncio.gather(*(self.poll_page(p, url) for p, pages in zip(self.portals, listings)
+                                         for url in pages))
+        if not results:
+            return None
+        if all(r is None for r in results):
+            return None
+        return [item for r in results if r for item in r]
+
+    def healthy(self) -> bool:
+        """True when a portal was polled successfully within the last two intervals (any worker)."""
+        ok = notice_store.last_portal_ok()
+        return ok is not None and time.time() - ok < 2 * PORTAL_INTERVAL
+
+    def stats(self) -> dict:
+        return {"not_modified": self.not_modified, "unchanged": self.unchanged, "parsed": self.parsed,
+                "errors": dict(self.errors), "healthy": self.healthy(),
+                "listing_pages": {p.name: p.pages or self._listings.get(p.name, (0, []))[1] for p in self.portals}}
+
+
+portal_scraper = PortalScraper()
@@ -0,0 +1,111 @@
+"""
+शिक्षक सहायक — Notice push hub
+In-process pub/sub for /notice/stream. The notice store's change log is the
+source of events: each worker tails it (one indexed query, only while someone
+is subscribed), so a notice stored by any worker reaches every subscriber,
+and event IDs are the log's sequence numbers — a client can resume from its
+Last-Event-ID on any worker.
+
+Subscribers are bucketed by category, so publishing touches only matching
+connections; each has a small bounded queue and a slow client is told to
+resync instead of buffering without limit.
+"""
+import asyncio
+import os
+from collections import defaultdict
+from typing import Dict, Optional, Set
+
+from app.logger import logger
+from app.services.notice_store import notice_store
+
+POLL_INTERVAL = float(os.getenv("NOTICE_STREAM_POLL", "2.0"))
+QUEUE_SIZE = 64
+
+RESYNC = {"kind": "resync"}     # queued when a subscriber fell too far behind
+
+
+class Subscriber:
+    __slots__ = ("queue", "category", "priority")
+
+    def __init__(self, category: Optional[str], priority: Optional[str]):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.category = category
+        self.priority = priority
+
+
+class NoticeHub:
+    def __init__(self):
+        self._subs: Dict[Optional[str], Set[Subscriber]] = defaultdict(set)   # category (None = all) → subs
+        self.last_seq = 0
+        self._task: Optional[asyncio.Task] = None
+        # metrics
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def subscribe(self, category: Optional[str] = None, priority: Optional[str] = None) -> Subscriber:
+        if not self._subs:
+            # The log was not tailed while nobody listened: start from now, not from the idle backlog
+            self.last_seq = notice_store.event_bounds()[1]
+        sub = Subscriber(category, priority)
+        self._subs[category].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        subs = self._subs.get(sub.category)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.category]
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(s) for s in self._subs.values())
+
+    def publish(self, event: dict) -> None:
+        notice = event["notice"]
+        self.published += 1
+        for sub in (*self._subs.get(None, ()), *self._subs.get(notice.get("category"), ())):
+            if sub.priority and notice.get("priority") != sub.priority:
+                continue
+            try:
+                sub.queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                # Drop the backlog and tell the client to refetch /notice/feed
+                self.overflows += 1
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.queue.put_nowait(RESYNC)
+
+    async def _pump(self):
+        while True:
+            await asyncio.sleep(POLL_INTERVAL)
+            if not self._subs:
+                continue
+            try:
+                events = notice_store.events_since(self.last_seq)
+            except Exception as e:
+                logger.warning(f"Notice hub poll failed: {e}")
+                continue
+            for event in events:
+                self.last_seq = event["seq"]
+                self.publish(event)
+
+    def start(self) -> None:
+        if self._task is None:
+            self.last_seq = notice_store.event_bounds()[1]
+            self._task = asyncio.create_task(self._pump(), name="notice-hub")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"subscribers": self.subscribers, "last_seq": self.last_seq, "published": self.published,
+                "delivered": self.delivered, "overflows": self.overflows}
+
+
+notice_hub = NoticeHub()
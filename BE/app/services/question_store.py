@@ -0,0 +1,145 @@
+"""
+शिक्षक सहायक — Question Store
+Every generated question is kept here, tagged with type, marks, difficulty and
+topic, so papers can be assembled from existing items instead of new AI calls.
+Items and pool indexes are mirrored to the shared cache tier so every worker
+assembles papers from (and scores against) the same bank.
+"""
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.services.cache import SharedCache
+
+# Item type -> default marks (Bihar Board pattern)
+ITEM_MARKS = {"objective": 1, "short": 2, "long": 5}
+
+# /teach/generate mode -> item type
+MODE_TO_TYPE = {"mcq": "objective", "descriptive": "short", "actual": "short", "long": "long"}
+TYPE_TO_MODE = {"objective": "mcq", "short": "descriptive", "long": "long"}
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+BANK_TTL = 30 * 24 * 3600
+
+
+def item_id(subject: str, class_num: int, question: str) -> str:
+    norm = " ".join(question.lower().split())
+    return hashlib.sha1(f"{subject}|{class_num}|{norm}".encode("utf-8")).hexdigest()[:16]
+
+
+class QuestionStore:
+    """Per (subject, class) pools of tagged items, bounded by `max_per_pool`."""
+
+    def __init__(self, max_per_pool: int = 2000):
+        self.max_per_pool = max_per_pool
+        self._pools: Dict[Tuple[str, int], "OrderedDict[str, dict]"] = {}
+        self._by_id: Dict[str, dict] = {}
+        self._shared = SharedCache("teach.bank", maxsize=256, ttl=BANK_TTL)
+        self._tasks: set = set()
+
+    @staticmethod
+    def _pool_key(subject: str, class_num: int) -> str:
+        return f"pool:{subject}:{class_num}"
+
+    def _persist(self, subject: str, class_num: int, items: List[dict]) -> None:
+        """Mirror new/changed items and the pool index to the shared tier in the background."""
+        if self._shared.backend is None:
+            return
+        pool_ids = list(self._pools.get((subject, class_num), {}).keys())
+
+        async def write():
+            for item in items:
+                await self._shared.set(f"item:{item['id']}", item, local=False)
+            key = self._pool_key(subject, class_num)
+            existing = await self._shared.peek(key, force=True) or []
+            seen = set(existing)
+            merged = existing + [i for i in pool_ids if i not in seen]
+            await self._shared.set(key, merged[-self.max_per_pool:])
+
+        try:
+            task = asyncio.get_running_loop().create_task(write())
+        except RuntimeError:
+            return
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _insert(self, item: dict) -> None:
+        pool = self._pools.setdefault((item["subject"], item["class_num"]), OrderedDict())
+        pool[item["id"]] = item
+        self._by_id[item["id"]] = item
+        while len(pool) > self.max_per_pool:
+            _, old = pool.popitem(last=False)
+            self._by_id.pop(old["id"], None)
+
+    def add(self, subject: str, class_num: int, topic: str, item_type: str,
+            difficulty: str, questions: list) -> List[str]:
+        """Tag and store `questions` in place (each gets an `id`); returns their ids."""
+        pool = self._pools.setdefault((subject, class_num), OrderedDict())
+        ids, added = [], []
+        for q in questions:
+            if not isinstance(q, dict) or not q.get("question"):
+                continue
+            qid = item_id(subject, class_num, q["question"])
+            q["id"] = qid
+            ids.append(qid)
+            if qid in pool:
+                continue
+            item = {
+                **q,
+                "subject": subject,
+                "class_num": class_num,
+                "topic": q.get("topic") or topic,
+                "type": item_type,
+                "marks": ITEM_MARKS.get(item_type, 1),
+                "difficulty": difficulty if difficulty in DIFFICULTIES else "medium",
+            }
+            self._insert(item)
+            added.append(item)
+        if added:
+            self._persist(subject, class_num, added)
+        return ids
+
+    async def sync_pool(self, subject: str, class_num: int) -> None:
+        """Pull items other workers added to this pool into the local copy."""
+        if self._shared.backend is None:
+            return
+        ids = await self._shared.peek(self._pool_key(subject, class_num)) or []
+        for qid in ids:
+            if qid not in self._by_id:
+                await self.fetch(qid)
+
+    async def fetch(self, qid: str) -> Optional[dict]:
+        """get() that falls back to the shared tier for items added by another worker."""
+        item = self._by_id.get(qid)
+        if item is not None or self._shared.backend is None:
+            return item
+        item = await self._shared.get(f"item:{qid}")
+        if item is None:
+            return None
+        self._insert(item)
+        return item
+
+    def items(self, subject: str, class_num: int) -> List[dict]:
+        return list(self._pools.get((subject, class_num), {}).values())
+
+    def get(self, qid: str) -> Optional[dict]:
+        return self._by_id.get(qid)
+
+    async def set_difficulty(self, qid: str, difficulty: str, stats: Optional[dict] = None) -> bool:
+        """Retag a stored item from observed results; `stats` is kept on the item."""
+        item = await self.fetch(qid)
+        if item is None or difficulty not in DIFFICULTIES:
+            return False
+        item["difficulty"] = difficulty
+        if stats:
+            item["item_stats"] = stats
+        self._persist(item["subject"], item["class_num"], [item])
+        return True
+
+    def stats(self) -> dict:
+        return {"pools": len(self._pools), "items": len(self._by_id)}
+
+
+question_store = QuestionStore()
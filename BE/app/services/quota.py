@@ -0,0 +1,167 @@
+"""
+शिक्षक सहायक — Tavily Quota Governor
+Tracks Tavily credits spent per feed and stretches each feed's refresh
+interval according to:
+  - traffic: feeds nobody has read in the last hour refresh less often
+  - change rate: consecutive refreshes with an identical result set back off
+  - budget pace: spending ahead of the daily budget lengthens TTLs, and an
+    exhausted budget stops refreshes (stale data is served) until midnight IST
+Spent credits are atomic per-day, per-feed counters in the shared cache tier,
+recorded before each Tavily call, so all workers draw on one budget.
+"""
+import hashlib
+import json
+import time
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Set
+
+from app.logger import logger
+from app.services.cache import get_backend
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+CREDITS = {"basic": 1, "advanced": 2}                          # per Tavily search
+DAILY_BUDGET = int(os.getenv("TAVILY_DAILY_CREDITS", "150"))
+MAX_FACTOR = 8.0                                               # longest TTL = base × MAX_FACTOR
+HISTORY_DAYS = 30
+
+
+def _today() -> str:
+    return datetime.now(IST).strftime("%Y-%m-%d")
+
+
+def _day_fraction() -> float:
+    now = datetime.now(IST)
+    return (now.hour * 3600 + now.minute * 60 + now.second) / 86400
+
+
+def result_hash(data: Any) -> str:
+    """Hash of the set of URLs/titles in a feed snapshot, ignoring order and scores."""
+    keys = set()
+
+    def walk(x):
+        if isinstance(x, dict):
+            if "url" in x or "title" in x:
+                keys.add(x.get("url") or x.get("title"))
+            for v in x.values():
+                if isinstance(v, (list, dict)):
+                    walk(v)
+        elif isinstance(x, list):
+            for v in x:
+                walk(v)
+
+    walk(data)
+    return hashlib.sha1(json.dumps(sorted(k for k in keys if k), ensure_ascii=False).encode()).hexdigest()
+
+
+class QuotaGovernor:
+    def __init__(self, daily_budget: int = DAILY_BUDGET):
+        self.daily_budget = daily_budget
+        self.spent: Dict[str, Dict[str, int]] = defaultdict(dict)     # day -> feed -> credits
+        self.feeds: Set[str] = set()                                  # feeds whose shared counters are read
+        self.last_hash: Dict[str, str] = {}
+        self.unchanged: Dict[str, int] = defaultdict(int)
+        self.hits: Dict[str, list] = defaultdict(lambda: [0, 0, 0.0])  # [prev hour, this hour, hour start]
+        self.skipped: Dict[str, int] = defaultdict(int)
+
+    # ── accounting ──
+
+    async def spend(self, feed: str, depth: str = "advanced", calls: int = 1) -> None:
+        """Record credits for Tavily calls about to be made (called before the request, so
+        failed and timed-out calls, which Tavily may still bill, are counted too)."""
+        day = _today()
+        credits = CREDITS.get(depth, 1) * calls
+        self.feeds.add(feed)
+        backend = get_backend()
+        if backend is not None:
+            try:
+                self.spent[day][feed] = await backend.incr(
+                    f"quota:spent:{day}:{feed}", (HISTORY_DAYS + 1) * 86400, credits)
+                return
+            except Exception as e:
+                logger.warning(f"Shared Tavily quota unavailable, counting per worker: {e}")
+        self.spent[day][feed] = self.spent[day].get(feed, 0) + credits
+
+    async def sync(self) -> int:
+        """Pull today's spend of every known feed from the shared tier; returns the total."""
+        day = _today()
+        backend = get_backend()
+        if backend is not None:
+            try:
+                for feed in self.feeds:
+                    self.spent[day][feed] = max(self.spent[day].get(feed, 0),
+                                                await backend.count(f"quota:spent:{day}:{feed}"))
+            except Exception as e:
+                logger.warning(f"Shared Tavily quota unavailable, using this worker's count: {e}")
+        return self.spent_today()
+
+    def spent_today(self) -> int:
+        """Today's spend as of the last spend()/sync() (what factor() and stats() use)."""
+        return sum(self.spent.get(_today(), {}).values())
+
+    def hit(self, feed: str) -> None:
+        """Count a read of `feed` (two-bucket hourly window)."""
+        h = self.hits[feed]
+        now = time.time()
+        if now - h[2] >= 3600:
+            h[0] = h[1] if now - h[2] < 7200 else 0
+            h[1], h[2] = 0, now
+        h[1] += 1
+
+    def observe(self, feed: str, data: Any) -> bool:
+        """Record a refresh result; returns True if the content changed."""
+        digest = result_hash(data)
+        changed = self.last_hash.get(feed) != digest
+        self.last_hash[feed] = digest
+        self.unchanged[feed] = 0 if changed else self.unchanged[feed] + 1
+        return changed
+
+    # ── policy ──
+
+    async def allow(self, feed: str) -> bool:
+        self.feeds.add(feed)
+        if await self.sync() >= self.daily_budget:
+            self.skipped[feed] += 1
+            logger.warning(f"Tavily daily budget {self.daily_budget} exhausted; '{feed}' refresh skipped")
+            return False
+        return True
+
+    def factor(self, feed: str) -> float:
+        """Multiplier applied to the feed's base TTL."""
+        change = min(4.0, 1.5 ** self.unchanged[feed])
+
+        h = self.hits[feed]
+        recent = h[1] + (h[0] if time.time() - h[2] < 3600 else 0)
+        traffic = 3.0 if recent == 0 else 1.5 if recent < 5 else 1.0
+
+        pace = self.spent_today() / max(1, self.daily_budget)
+        ahead = pace - _day_fraction()
+        budget = 1.0 + max(0.0, ahead) * 10
+
+        return min(MAX_FACTOR, change * traffic * budget)
+
+    # ── reporting ──
+
+    def stats(self) -> Dict[str, Any]:
+        today = _today()
+        for day in sorted(self.spent)[:-HISTORY_DAYS]:
+            del self.spent[day]
+        days = sorted(self.spent)
+        full_days = [sum(self.spent[d].values()) for d in days if d != today]
+        today_spent = self.spent_today()
+        today_rate = today_spent / max(_day_fraction(), 1 / 24)   # projected full-day spend
+        daily = (sum(full_days) + today_rate) / (len(full_days) + 1)
+        return {
+            "daily_budget": self.daily_budget,
+            "spent_today": today_spent,
+            "spent_today_by_feed": self.spent.get(today, {}),
+            "projected_monthly_credits": int(daily * 30),
+            "interval_factor": {f: round(self.factor(f), 2) for f in set(self.hits) | set(self.last_hash)},
+            "unchanged_refreshes": dict(self.unchanged),
+            "skipped_refreshes": dict(self.skipped),
+        }
+
+
+governor = QuotaGovernor()
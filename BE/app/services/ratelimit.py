@@ -0,0 +1,150 @@
+"""
+शिक्षक सहायक — Rate limiting for login and signup
+Sliding-window counters keyed by client IP and by normalized email, checked
+before any password hashing or Postgres query, so credential stuffing or a
+client retry loop is turned away in microseconds.
+
+Each key keeps two numbers (this fixed window's count and the previous one's);
+the estimate weights the previous count by how much of it still overlaps the
+sliding window. Keys live in a bounded LRU, so memory is O(1) per key and
+capped overall. With RATE_LIMIT_SHARED the counts live in the shared cache
+tier (SQLite or Redis, see app.services.cache), so every worker enforces one
+limit.
+
+Limits are "<attempts>/<seconds>", e.g. RATE_LIMIT_LOGIN_EMAIL=10/900.
+"""
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.requests import Request
+
+from app.logger import logger
+from app.services.cache import get_backend
+
+RATE_LIMIT_SHARED = os.getenv("RATE_LIMIT_SHARED", "false").lower() in ("1", "true", "yes")
+# Reverse proxies in front of the app (Render: 1); the client IP is taken that many hops from the
+# right of X-Forwarded-For. 0 trusts no header and uses the socket peer.
+PROXY_HOPS = int(os.getenv("RATE_LIMIT_PROXY_HOPS", "0"))
+MAX_KEYS = 100_000
+
+
+def parse_limit(spec: str) -> Tuple[int, float]:
+    count, _, seconds = spec.partition("/")
+    return int(count), float(seconds)
+
+
+def normalize_email(email: str) -> str:
+    """One key per mailbox: case, "+tag" suffixes and Gmail dots don't make a new address."""
+    local, _, domain = email.strip().lower().partition("@")
+    local = local.split("+", 1)[0]
+    if domain in ("gmail.com", "googlemail.com"):
+        local, domain = local.replace(".", ""), "gmail.com"
+    return f"{local}@{domain}" if domain else local
+
+
+def client_ip(request: Request) -> str:
+    if PROXY_HOPS:
+        hops = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+        if hops:
+            return hops[-min(PROXY_HOPS, len(hops))]
+    return request.client.host if request.client else "unknown"
+
+
+class SlidingWindow:
+    def __init__(self, name: str, limit: int, window: float, maxkeys: int = MAX_KEYS):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.maxkeys = maxkeys
+        self._keys: "OrderedDict[str, list]" = OrderedDict()     # key → [window index, previous, current]
+        # metrics
+        self.allowed = 0
+        self.limited = 0
+        self.evicted = 0
+
+    def _retry_after(self, previous: int, current: int, elapsed: float) -> float:
+        """Seconds until the estimate is back within the limit, assuming no further attempts."""
+        if current > self.limit:
+            # Only once this window has become the previous one and slid far enough out
+            return self.window - elapsed + self.window * (1 - self.limit / current)
+        # previous * (1 - t / window) + current <= limit
+        return max(0.0, self.window * (1 - (self.limit - current) / previous) - elapsed)
+
+    def _decide(self, previous: int, current: int, elapsed: float) -> Tuple[bool, float]:
+        estimate = previous * (1 - elapsed / self.window) + current
+        if estimate > self.limit:
+            self.limited += 1
+            return False, self._retry_after(previous, current, elapsed)
+        self.allowed += 1
+        return True, 0.0
+
+    def _local(self, key: str, now: float) -> Tuple[int, int, float]:
+        index, elapsed = divmod(now, self.window)
+        entry = self._keys.get(key)
+        if entry is None:
+            entry = self._keys[key] = [index, 0, 0]
+            if len(self._keys) > self.maxkeys:
+                self._keys.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._keys.move_to_end(key)
+            if entry[0] != index:
+                # Roll forward; two or more windows later nothing overlaps any more
+                entry[1] = entry[2] if entry[0] == index - 1 else 0
+                entry[0], entry[2] = index, 0
+        entry[2] += 1
+        return entry[1], entry[2], elapsed
+
+    async def _shared(self, backend, key: str, now: float) -> Tuple[int, int, float]:
+        index, elapsed = divmod(now, self.window)
+        prefix = f"ratelimit:{self.name}:{key}:"
+        current = await backend.incr(f"{prefix}{int(index)}", 2 * self.window)
+        previous = await backend.count(f"{prefix}{int(index) - 1}")
+        return previous, current, elapsed
+
+    async def hit(self, key: str) -> Tuple[bool, float]:
+        """Count an attempt for `key`: (allowed, seconds to wait when not)."""
+        now = time.time()
+        backend = get_backend() if RATE_LIMIT_SHARED else None
+        if backend is not None:
+            try:
+                return self._decide(*await self._shared(backend, key, now))
+            except Exception as e:
+                logger.warning(f"Shared rate limit unavailable ({self.name}), limiting per worker: {e}")
+        return self._decide(*self._local(key, now))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"limit": f"{self.limit}/{int(self.window)}s", "allowed": self.allowed, "limited": self.limited,
+                "keys": len(self._keys), "evicted": self.evicted}
+
+
+class AuthLimiter:
+    """Per-IP and per-email limits for one auth action; both must allow the attempt."""
+
+    def __init__(self, action: str, ip_limit: str, email_limit: str):
+        self.by_ip = SlidingWindow(f"{action}.ip", *parse_limit(ip_limit))
+        self.by_email = SlidingWindow(f"{action}.email", *parse_limit(email_limit))
+
+    async def check(self, request: Request, email: str) -> Optional[int]:
+        """None if the attempt may proceed, else whole seconds until it may be retried."""
+        ok_ip, wait_ip = await self.by_ip.hit(client_ip(request))
+        ok_email, wait_email = await self.by_email.hit(normalize_email(email)) if email else (True, 0.0)
+        if ok_ip and ok_email:
+            return None
+        return max(1, math.ceil(max(wait_ip, wait_email)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ip": self.by_ip.stats(), "email": self.by_email.stats()}
+
+
+login_limiter = AuthLimiter("login", os.getenv("RATE_LIMIT_LOGIN_IP", "100/300"),
+                            os.getenv("RATE_LIMIT_LOGIN_EMAIL", "10/900"))
+signup_limiter = AuthLimiter("signup", os.getenv("RATE_LIMIT_SIGNUP_IP", "20/3600"),
+                             os.getenv("RATE_LIMIT_SIGNUP_EMAIL", "5/3600"))
+
+
+def rate_limit_stats() -> Dict[str, Any]:
+    return {"shared": RATE_LIMIT_SHARED, "login": login_limiter.stats(), "signup": signup_limiter.stats()}
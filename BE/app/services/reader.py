@@ -0,0 +1,76 @@
+"""
+शिक्षक सहायक — Reader-mode extraction
+Pulls the title, main text and lead image out of a news page with lxml,
+dropping navigation, ads and scripts, so a multi-MB page becomes a few KB.
+"""
+import re
+from typing import Optional
+from urllib.parse import urljoin
+
+import lxml.html
+
+MAX_ARTICLE_CHARS = 12_000
+
+_DROP_TAGS = ("script", "style", "noscript", "nav", "header", "footer", "aside", "form",
+              "iframe", "svg", "button", "figure", "template")
+_NOISE = re.compile(r"(comment|share|social|related|advert|promo|sidebar|footer|header|menu|breadcrumb|"
+                    r"newsletter|subscribe|taboola|outbrain|trending|recommend)", re.I)
+
+
+def _meta(doc, *names) -> Optional[str]:
+    for name in names:
+        found = doc.xpath(f'//meta[@property="{name}" or @name="{name}"]/@content')
+        if found and found[0].strip():
+            return found[0].strip()
+    return None
+
+
+def _paragraphs(node) -> list:
+    out = []
+    for p in node.iter("p", "h2", "h3", "li"):
+        text = " ".join(p.text_content().split())
+        if len(text) >= 30 or (p.tag in ("h2", "h3") and text):
+            out.append(("## " + text) if p.tag in ("h2", "h3") else text)
+    return out
+
+
+def extract(html: str, url: str = "") -> dict:
+    """Return {"title", "text", "image", "chars"} for an article page."""
+    doc = lxml.html.fromstring(html)
+    if url:
+        doc.make_links_absolute(url, resolve_base_href=True)
+    title = _meta(doc, "og:title", "twitter:title") or (doc.findtext(".//title") or "").strip()
+    image = _meta(doc, "og:image", "twitter:image")
+
+    for el in doc.xpath("//*[self::" + " or self::".join(_DROP_TAGS) + "]"):
+        el.drop_tree()
+    for el in doc.xpath("//*[@class or @id]"):
+        attrs = f"{el.get('class', '')} {el.get('id', '')}"
+        if _NOISE.search(attrs) and el.tag not in ("body", "html", "article", "main"):
+            el.drop_tree()
+
+    # Prefer <article>/<main>; otherwise the container with the most paragraph text
+    candidates = doc.xpath("//article | //main | //*[@itemprop='articleBody']")
+    if not candidates:
+        scores = {}
+        for p in doc.iter("p"):
+            parent = p.getparent()
+            if parent is not None:
+                scores[parent] = scores.get(parent, 0) + len(p.text_content().strip())
+        candidates = [max(scores, key=scores.get)] if scores else [doc]
+    best = max(candidates, key=lambda n: sum(len(t) for t in _paragraphs(n)))
+    paras = _paragraphs(best)
+
+    if not image:
+        imgs = best.xpath(".//img/@src")
+        image = imgs[0] if imgs else None
+
+    text, total = [], 0
+    for p in paras:
+        if total + len(p) > MAX_ARTICLE_CHARS:
+            break
+        text.append(p)
+        total += len(p) + 2
+    if image and url:
+        image = urljoin(url, image)
+    return {"title": title, "text": "\n\n".join(text), "image": image, "chars": total}
@@ -0,0 +1,257 @@
+"""
+शिक्षक सहायक — Background Feed Refresher (stale-while-revalidate)
+Each Feed holds the current snapshot of an upstream-backed list (news,
+notices). Requests are always answered from the snapshot; a lifespan-managed
+scheduler refreshes it ahead of expiry with jitter, and every caller that
+needs a refresh at the same moment shares the one in-flight task.
+
+With a shared cache tier the snapshot is also published there: workers
+adopt a newer snapshot written by any other worker, and a shared lock lets
+only one worker per cluster call the upstream for each refresh.
+
+Every successful refresh is also written atomically to a gzip JSON snapshot
+under SNAPSHOT_DIR; at startup the snapshots are loaded before the app
+serves traffic, so a restart serves the last known good data (marked stale)
+until the first live refresh replaces it.
+"""
+import asyncio
+import gzip
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.logger import logger
+from app.services.cache import SharedCache, LOCK_WAIT
+
+# Cross-worker copy of each feed: {"ts": ..., "data": ...}
+_shared_feeds = SharedCache("feed", maxsize=16, ttl=7 * 24 * 3600)
+
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", Path(__file__).resolve().parent.parent.parent / "var" / "snapshots"))
+
+
+class Feed:
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float,
+        refresh_ahead: float = 0.8,      # refresh at this fraction of the TTL
+        jitter: float = 0.1,             # ± fraction applied to each delay
+        ttl_for: Optional[Callable[[Any], float]] = None,
+        snapshot: bool = True,
+        governor: Any = None,            # QuotaGovernor: scales TTL, may veto refreshes
+    ):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.jitter = jitter
+        self.ttl_for = ttl_for
+        self.governor = governor
+        self.snapshot_path = SNAPSHOT_DIR / f"{name}.json.gz" if snapshot else None
+        self.data: Any = None
+        self.ts = 0.0
+        self.expires = 0.0
+        self.origin = "empty"            # empty | disk | live
+        self._inflight: Optional[asyncio.Task] = None
+        # metrics
+        self.refreshes = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.served = 0
+
+    # ── snapshot access ──
+
+    def age(self) -> Optional[float]:
+        return time.time() - self.ts if self.ts else None
+
+    def is_stale(self) -> bool:
+        return self.origin == "disk" or time.time() >= self.expires
+
+    async def get(self) -> Any:
+        """Current snapshot; waits for the (shared) first load only when there is none."""
+        self.served += 1
+        if self.governor:
+            self.governor.hit(self.name)
+        await self._adopt_shared()
+        if self.data is None:
+            await self.refresh()
+        elif self.is_stale():
+            self.refresh_soon()
+        return self.data
+
+    def set(self, data: Any, ts: Optional[float] = None, ttl: Optional[float] = None) -> None:
+        self.data = data
+        self.ts = ts or time.time()
+        ttl = ttl if ttl is not None else (self.ttl_for(data) if self.ttl_for else self.ttl)
+        if self.governor:
+            ttl *= self.governor.factor(self.name)
+        self.expires = self.ts + ttl
+
+    # ── refreshing ──
+
+    def refresh_soon(self) -> asyncio.Task:
+        """Start a refresh unless one is already running; returns the shared task."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._run())
+        return self._inflight
+
+    async def refresh(self) -> Any:
+        return await asyncio.shield(self.refresh_soon())
+
+    async def _adopt_shared(self, force: bool = False) -> bool:
+        """Take another worker's snapshot if it is newer than ours."""
+        snap = await _shared_feeds.peek(self.name, force=force)
+        if snap and snap.get("data") and snap.get("ts", 0) > self.ts:
+            self.set(snap["data"], ts=snap["ts"])
+            self.origin = "live"
+            return True
+        return False
+
+    async def _run(self) -> Any:
+        start = owner = None
+        try:
+            # Another worker may already have refreshed this feed
+            if await self._adopt_shared(force=True) and time.time() < self.ts + (self.expires - self.ts) * self.refresh_ahead:
+                return self.data
+            owner = await _shared_feeds.lock(self.name)
+            if owner is None:
+                deadline = time.time() + LOCK_WAIT
+                while time.time() < deadline:
+                    await asyncio.sleep(0.5)
+                    if await self._adopt_shared(force=True):
+                        return self.data
+            if self.governor and not await self.governor.allow(self.name):
+                # Over budget: keep serving what we have and look again later
+                self.expires = time.time() + min(self.ttl, 3600)
+                return self.data
+            start = time.perf_counter()
+            data = await self.loader()
+            if data:
+                if self.governor:
+                    self.governor.observe(self.name, data)
+                self.set(data)
+                self.origin = "live"
+                self.refreshes += 1
+                self.consecutive_errors = 0
+                self.save_snapshot()
+                await _shared_feeds.set(self.name, {"ts": self.ts, "data": data})
+            else:
+                raise RuntimeError("upstream returned no data")
+        except Exception as e:
+            self.errors += 1
+            self.consecutive_errors += 1
+            self.last_error = str(e)
+            logger.warning(f"Feed '{self.name}' refresh failed ({self.consecutive_errors} in a row): {e}")
+        finally:
+            await _shared_feeds.unlock(self.name, owner)
+            if start is not None:
+                self.last_duration = time.perf_counter() - start
+        return self.data
+
+    # ── disk snapshots ──
+
+    def save_snapshot(self) -> None:
+        """Atomically replace the on-disk snapshot with the current data."""
+        if self.snapshot_path is None:
+            return
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            payload = json.dumps({"name": self.name, "ts": self.ts, "data": self.data},
+                                 ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            tmp = self.snapshot_path.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(payload, compresslevel=6))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+        except Exception as e:
+            logger.warning(f"Feed '{self.name}' snapshot write failed: {e}")
+
+    def load_snapshot(self) -> bool:
+        """Load the last known good data from disk; it stays marked stale until a live refresh."""
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return False
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snap = json.loads(gzip.decompress(f.read()).decode("utf-8"))
+        except Exception as e:
+            logger.warning(f"Feed '{self.name}' snapshot unreadable, ignoring: {e}")
+            return False
+        if not snap.get("data"):
+            return False
+        self.set(snap["data"], ts=snap.get("ts") or time.time())
+        self.origin = "disk"
+        logger.info(f"Feed '{self.name}' warm-started from snapshot ({int(self.age())}s old)")
+        return True
+
+    def next_delay(self) -> float:
+        """Seconds until the scheduler should refresh again."""
+        if self.consecutive_errors:
+            return min(self.ttl, 30 * 2 ** (self.consecutive_errors - 1))
+        if self.data is None:
+            return 0
+        base = max(0.0, self.ts + (self.expires - self.ts) * self.refresh_ahead - time.time())
+        return base * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def stats(self) -> Dict[str, Any]:
+        age = self.age()
+        return {
+            "age_seconds": round(age, 1) if age is not None else None,
+            "stale": self.is_stale(),
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "consecutive_errors": self.consecutive_errors,
+            "last_refresh_seconds": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "last_error": self.last_error,
+            "served": self.served,
+            "origin": self.origin,
+            "refreshing": self._inflight is not None and not self._inflight.done(),
+        }
+
+
+class Refresher:
+    """Runs one refresh loop per registered Feed between app startup and shutdown."""
+
+    def __init__(self):
+        self.feeds: Dict[str, Feed] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, feed: Feed) -> Feed:
+        self.feeds[feed.name] = feed
+        return feed
+
+    async def _loop(self, feed: Feed):
+        while True:
+            await asyncio.sleep(feed.next_delay())
+            await feed.refresh()
+
+    def load_snapshots(self) -> None:
+        for feed in self.feeds.values():
+            feed.load_snapshot()
+
+    def start(self, names: Optional[List[str]] = None):
+        for name, feed in self.feeds.items():
+            if names is None or name in names:
+                self._tasks.append(asyncio.create_task(self._loop(feed), name=f"refresh:{name}"))
+        logger.info(f"Background refresher started for: {', '.join(t.get_name() for t in self._tasks)}")
+
+    async def stop(self):
+        for feed in self.feeds.values():
+            if feed._inflight is not None:
+                self._tasks.append(feed._inflight)
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: feed.stats() for name, feed in self.feeds.items()}
+
+
+refresher = Refresher()
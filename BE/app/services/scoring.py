@@ -0,0 +1,128 @@
+"""
+शिक्षक सहायक — MCQ Scoring & Item Analysis (NumPy)
+Scores a students × items response matrix in one vectorized pass:
+per-student totals, item difficulty (p), upper/lower-27% discrimination,
+corrected point-biserial, distractor counts and KR-20 reliability.
+"""
+import csv
+import io
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BLANK = -1
+MAX_OPTIONS = 10      # option counts are one bincount of width n_options + 1 per item
+
+# Answer cell -> option index. Digits are 0-based like the generated `correct` field.
+_CELL_MAP = {
+    "a": 0, "b": 1, "c": 2, "d": 3, "e": 4,
+    "अ": 0, "ब": 1, "स": 2, "द": 3,
+    "0": 0, "1": 1, "2": 2, "3": 3, "4": 4,
+}
+_KEY_LABELS = {"key", "answer", "answers", "उत्तर", "उत्तर कुंजी"}
+
+# Proportion-correct thresholds used to tag stored questions
+EASY_P, HARD_P = 0.8, 0.3
+MIN_TAG_RESPONSES = 20
+
+
+def parse_cell(cell) -> int:
+    if cell is None:
+        return BLANK
+    if isinstance(cell, (int, np.integer)):
+        return int(cell)
+    cell = str(cell).strip().lower().rstrip(")")
+    return _CELL_MAP.get(cell, BLANK)
+
+
+def parse_csv(text: str) -> Tuple[List[str], List[str], Optional[List[int]], List[List[int]]]:
+    """
+    Parse `student,<item>,<item>,...` CSV. An optional row whose first cell is
+    `key` (or `उत्तर`) gives the correct options. Returns
+    (item_labels, student_ids, key_or_None, responses).
+    """
+    rows = [r for r in csv.reader(io.StringIO(text.lstrip("﻿"))) if any(c.strip() for c in r)]
+    if not rows:
+        raise ValueError("खाली CSV")
+    header, body = rows[0], rows[1:]
+    items = [h.strip() for h in header[1:]]
+    key, students, responses = None, [], []
+    for r in body:
+        cells = [parse_cell(c) for c in r[1:len(items) + 1]]
+        cells += [BLANK] * (len(items) - len(cells))
+        if r[0].strip().lower() in _KEY_LABELS:
+            key = cells
+            continue
+        students.append(r[0].strip())
+        responses.append(cells)
+    return items, students, key, responses
+
+
+def tag_difficulty(p: float) -> str:
+    if p >= EASY_P:
+        return "easy"
+    if p <= HARD_P:
+        return "hard"
+    return "medium"
+
+
+def analyze(responses: Sequence[Sequence[int]], key: Sequence[int], n_options: int = 4) -> Dict:
+    """Score `responses` (students × items, BLANK for unanswered) against `key`."""
+    if not 2 <= n_options <= MAX_OPTIONS:
+        raise ValueError(f"n_options must be between 2 and {MAX_OPTIONS}")
+    R = np.asarray(responses, dtype=np.int64)
+    K = np.asarray(key, dtype=np.int64)
+    if R.ndim != 2 or R.shape[1] != K.shape[0]:
+        raise ValueError(f"response matrix {R.shape} does not match key of {K.shape[0]} items")
+    if K.size and (K.min() < 0 or K.max() >= n_options):
+        raise ValueError(f"key options must be between 0 and {n_options - 1}")
+    n, m = R.shape
+    # Out-of-range responses count as blank; the rest fit comfortably in int16
+    R = np.where((R < 0) | (R >= n_options), BLANK, R).astype(np.int16)
+    K = K.astype(np.int16)
+
+    X = (R == K).astype(np.float64)            # n × m correct matrix
+    totals = X.sum(axis=1)
+    p = X.mean(axis=0) if n else np.zeros(m)
+
+    # Upper/lower 27% groups by total score
+    g = max(1, int(round(n * 0.27))) if n else 0
+    order = np.argsort(totals, kind="stable")
+    if n >= 2:
+        disc = X[order[-g:]].mean(axis=0) - X[order[:g]].mean(axis=0)
+    else:
+        disc = np.zeros(m)
+
+    # Corrected point-biserial: item vs total excluding that item
+    rest = totals[:, None] - X
+    xc = X - p
+    rc = rest - rest.mean(axis=0) if n else rest
+    denom = np.sqrt((xc ** 2).sum(axis=0) * (rc ** 2).sum(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pbis = np.where(denom > 0, (xc * rc).sum(axis=0) / denom, 0.0)
+
+    # Option counts per item in one bincount: column j, option o -> j*(k+1) + o + 1
+    width = n_options + 1
+    flat = (R + 1) + width * np.arange(m, dtype=np.int32)[None, :]
+    counts = np.bincount(flat.ravel(), minlength=width * m).reshape(m, width)
+
+    var_t = totals.var() if n else 0.0
+    kr20 = float(m / (m - 1) * (1 - (p * (1 - p)).sum() / var_t)) if m > 1 and var_t > 0 else None
+
+    return {
+        "n_students": n,
+        "n_items": m,
+        "totals": totals.astype(int),
+        "p": p,
+        "discrimination": disc,
+        "point_biserial": pbis,
+        "option_counts": counts[:, 1:],
+        "blank_counts": counts[:, 0],
+        "summary": {
+            "mean": float(totals.mean()) if n else 0.0,
+            "std": float(totals.std()) if n else 0.0,
+            "min": int(totals.min()) if n else 0,
+            "max": int(totals.max()) if n else 0,
+            "kr20": kr20,
+        },
+    }
@@ -0,0 +1,185 @@
+"""
+शिक्षक सहायक — Session tokens
+Login returns a short-lived access token and a longer-lived refresh token.
+Both are HMAC-SHA256 signed JWTs (HS256), so any worker verifies them in
+memory with no Postgres query:
+  - AUTH_SIGNING_KEYS="kid:secret,kid:secret": the first key signs, all of
+    them verify; add a new key in front to rotate, and drop the old one once
+    its refresh tokens have expired
+  - access tokens carry the user's id, name and email (the claims routes need)
+  - verified claims are cached per token for a minute, so repeat calls skip
+    even the HMAC
+  - refresh tokens are single use: their jti is recorded at issue and spent
+    by /auth/refresh (app.routes.auth), so a replayed one is refused
+
+There is no fallback key: a per-process key would sign tokens no other
+worker, or the next deploy, accepts. Keys are read on first use, so without
+AUTH_SIGNING_KEYS only login, signup and refresh are refused; the rest of the
+API runs and bearer tokens on AI routes are ignored.
+
+AI routes take the caller from the Authorization header through
+`attribute(route)`: requests are counted per user, and anonymous ones are
+refused only when AUTH_REQUIRED is set.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Header, HTTPException
+
+from app.services.cache import TTLCache
+
+ACCESS_TTL = int(os.getenv("AUTH_ACCESS_TTL", str(15 * 60)))
+REFRESH_TTL = int(os.getenv("AUTH_REFRESH_TTL", str(30 * 24 * 3600)))
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "false").lower() in ("1", "true", "yes")
+CLAIMS_CACHE_TTL = 60
+CLAIMS_CACHE_SIZE = 10_000
+TOP_USERS = 10
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _load_keys() -> Dict[str, bytes]:
+    keys = {}
+    for entry in os.getenv("AUTH_SIGNING_KEYS", "").split(","):
+        kid, _, secret = entry.strip().partition(":")
+        if kid and secret:
+            keys[kid] = secret.encode("utf-8")
+    if not keys:
+        raise RuntimeError(
+            "AUTH_SIGNING_KEYS is not set. Add a signing key to the environment, e.g. "
+            "AUTH_SIGNING_KEYS=2026-01:$(python -c 'import secrets; print(secrets.token_urlsafe(48))')")
+    return keys
+
+
+class TokenSigner:
+    def __init__(self, keys: Optional[Dict[str, bytes]] = None):
+        self._keys = keys
+        self._claims = TTLCache("session.claims", maxsize=CLAIMS_CACHE_SIZE, ttl=CLAIMS_CACHE_TTL)
+        # metrics
+        self.issued = 0
+        self.verified = 0
+        self.rejected = 0
+
+    @property
+    def keys(self) -> Dict[str, bytes]:
+        """Keys by kid, read from AUTH_SIGNING_KEYS on first use (RuntimeError if unset)."""
+        if self._keys is None:
+            self._keys = _load_keys()
+        return self._keys
+
+    @property
+    def kid(self) -> str:
+        return next(iter(self.keys))
+
+    @property
+    def configured(self) -> bool:
+        try:
+            return bool(self.keys)
+        except RuntimeError:
+            return False
+
+    def sign(self, claims: dict) -> str:
+        header = _b64(json.dumps({"alg": "HS256", "typ": "JWT", "kid": self.kid}, separators=(",", ":")).encode())
+        payload = _b64(json.dumps(claims, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        signing_input = f"{header}.{payload}".encode("ascii")
+        signature = hmac.new(self.keys[self.kid], signing_input, hashlib.sha256).digest()
+        return f"{header}.{payload}.{_b64(signature)}"
+
+    def issue(self, user: dict, jti: Optional[str] = None) -> dict:
+        """Access + refresh token pair for a user row ({id, name, email, ...}); `jti` names the refresh token."""
+        now = int(time.time())
+        sub = str(user["id"])
+        access = self.sign({"sub": sub, "name": user.get("name"), "email": user.get("email"),
+                            "typ": "access", "iat": now, "exp": now + ACCESS_TTL})
+        refresh = self.sign({"sub": sub, "typ": "refresh", "jti": jti or uuid.uuid4().hex,
+                             "iat": now, "exp": now + REFRESH_TTL})
+        self.issued += 1
+        return {"access_token": access, "refresh_token": refresh, "token_type": "bearer", "expires_in": ACCESS_TTL}
+
+    def verify(self, token: str, kind: str = "access") -> Optional[dict]:
+        """Claims of a valid, unexpired token of the given kind, else None."""
+        now = time.time()
+        claims = self._claims.get(token)
+        if claims is None:
+            try:
+                header, payload, signature = token.split(".")
+                kid = json.loads(_unb64(header)).get("kid")
+                key = self.keys.get(kid)
+                if key is None:
+                    self.rejected += 1
+                    return None
+                expected = hmac.new(key, f"{header}.{payload}".encode("ascii"), hashlib.sha256).digest()
+                if not hmac.compare_digest(expected, _unb64(signature)):
+                    self.rejected += 1
+                    return None
+                claims = json.loads(_unb64(payload))
+            except (ValueError, TypeError, AttributeError):
+                self.rejected += 1
+                return None
+            if claims.get("exp", 0) > now:
+                self._claims.set(token, claims, ttl=min(CLAIMS_CACHE_TTL, claims["exp"] - now))
+        if claims.get("typ") != kind or claims.get("exp", 0) <= now:
+            self.rejected += 1
+            return None
+        self.verified += 1
+        return claims
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.configured:
+            return {"configured": False, "issued": self.issued, "verified": self.verified, "rejected": self.rejected}
+        return {"configured": True, "signing_kid": self.kid, "verification_kids": list(self.keys), "issued": self.issued,
+                "verified": self.verified, "rejected": self.rejected, "claims_cache": self._claims.stats()}
+
+
+class UsageMeter:
+    """Requests per route, split by signed-in user and anonymous callers."""
+
+    def __init__(self):
+        self.by_user: Counter = Counter()
+        self.by_route: Counter = Counter()
+        self.anonymous = 0
+        self.refused = 0
+
+    def record(self, route: str, user: Optional[dict]) -> None:
+        self.by_route[route] += 1
+        if user is None:
+            self.anonymous += 1
+        else:
+            self.by_user[user["sub"]] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"auth_required": AUTH_REQUIRED, "anonymous": self.anonymous, "refused": self.refused,
+                "authenticated": sum(self.by_user.values()), "users": len(self.by_user),
+                "top_users": dict(self.by_user.most_common(TOP_USERS)), "routes": dict(self.by_route)}
+
+
+signer = TokenSigner()
+usage = UsageMeter()
+
+
+def attribute(route: str) -> Callable:
+    """Dependency: the caller's access-token claims (None if anonymous), counted against `route`."""
+    async def dependency(authorization: Optional[str] = Header(None)) -> Optional[dict]:
+        user = None
+        if authorization and authorization[:7].lower() == "bearer " and signer.configured:
+            user = signer.verify(authorization[7:].strip())
+        if user is None and AUTH_REQUIRED:
+            usage.refused += 1
+            raise HTTPException(status_code=401, detail="कृपया लॉग इन करें (login required)",
+                                headers={"WWW-Authenticate": "Bearer"})
+        usage.record(route, user)
+        return user
+    return dependency
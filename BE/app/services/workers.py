@@ -0,0 +1,36 @@
+"""
+शिक्षक सहायक — Process pools for CPU-bound work
+Named, bounded ProcessPoolExecutors (created on first use, shut down in the
+app lifespan) so parsing or hashing never blocks the event loop or holds
+the GIL of the serving process. Workers are spawned, not forked, so they never
+inherit the server's sockets, SQLite connections or event loop state.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, Dict
+
+from app.logger import logger
+
+_pools: Dict[str, ProcessPoolExecutor] = {}
+
+
+def get_process_pool(name: str, max_workers: int) -> ProcessPoolExecutor:
+    pool = _pools.get(name)
+    if pool is None:
+        workers = max(1, min(max_workers, os.cpu_count() or 1))
+        pool = _pools[name] = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        logger.info(f"Process pool '{name}' started with {workers} workers")
+    return pool
+
+
+async def run_in_process(name: str, max_workers: int, fn: Callable, *args) -> Any:
+    """Run a picklable `fn(*args)` in the named pool and await the result."""
+    return await asyncio.get_running_loop().run_in_executor(get_process_pool(name, max_workers), fn, *args)
+
+
+def shutdown_process_pools() -> None:
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _pools.clear()
@@ -0,0 +1,102 @@
+"""
+Login throughput against a real Postgres: one connection per request vs the pool.
+
+    cd BE && python benchmarks/bench_db_pool.py DATABASE_URL [logins] [concurrency]
+
+Signs up one throwaway user, then calls the login handler `logins` times with
+at most `concurrency` in flight, first opening an asyncpg connection per
+request (what auth did before the pool) and then borrowing from the pool.
+The handler is driven directly, without the app lifespan, so portal scraping
+and the feed refreshers do not run during the measurement. Rate limits are
+lifted and scrypt runs at N = 2**10, so the figure is the request + connection
++ query path, not password hashing (see bench_hash.py for that).
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class ConnectPerRequest:
+    """Stand-in for app.services.db.database that opens and closes a connection per acquire()."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    @asynccontextmanager
+    async def acquire(self):
+        import asyncpg
+        conn = await asyncpg.connect(self.url)
+        try:
+            yield conn
+        finally:
+            await conn.close()
+
+
+async def run(database, email: str, count: int, concurrency: int) -> float:
+    from starlette.requests import Request
+    from app.routes import auth
+
+    auth.database = database
+    request = Request({"type": "http", "method": "POST", "path": "/auth/login", "headers": [],
+                       "client": ("127.0.0.1", 40000)})
+    slots = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with slots:
+            response = await auth.login(auth.LoginRequest(email=email, password="secret123"), request)
+            failures += not response.success
+
+    await one()      # warm-up: process pool start, first connection
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(count)))
+    elapsed = time.perf_counter() - start
+    if failures:
+        print(f"  {failures} logins failed")
+    return count / elapsed
+
+
+async def main(url: str, count: int, concurrency: int) -> None:
+    from starlette.requests import Request
+    from app.routes import auth
+    from app.services.db import database
+    from app.services.workers import shutdown_process_pools
+
+    await database.open()
+    await auth.init_db()
+    email = f"bench-{uuid.uuid4().hex[:10]}@example.in"
+    request = Request({"type": "http", "method": "POST", "path": "/auth/signup", "headers": [],
+                       "client": ("127.0.0.1", 40000)})
+    created = await auth.signup(auth.SignupRequest(name="bench", email=email, phone="9000000000",
+                                                   password="secret123"), request)
+    assert created.success, created.message
+
+    before = await run(ConnectPerRequest(url), email, count, concurrency)
+    after = await run(database, email, count, concurrency)
+    print(f"{count} logins at {concurrency} concurrent:")
+    print(f"  connection per request: {before:.0f} logins/s")
+    print(f"  pool of {database.stats()['max_size']}:            {after:.0f} logins/s")
+    print(json.dumps(database.stats(), indent=2))
+    await database.close()
+    shutdown_process_pools()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    os.environ["DATABASE_URL"] = sys.argv[1]
+    os.environ.setdefault("PASSWORD_SCRYPT_LOG_N", "10")
+    os.environ.setdefault("AUTH_SIGNING_KEYS", "bench:not-a-real-secret-only-for-benchmarks")
+    for limit in ("RATE_LIMIT_LOGIN_IP", "RATE_LIMIT_LOGIN_EMAIL", "RATE_LIMIT_SIGNUP_IP", "RATE_LIMIT_SIGNUP_EMAIL"):
+        os.environ.setdefault(limit, "1000000/1")
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    asyncio.run(main(sys.argv[1], count, concurrency))
@@ -0,0 +1,46 @@
+"""
+Password hashing throughput and latency through the process pool.
+
+    cd BE && python benchmarks/bench_hash.py [log2 N] [hashes]
+
+Runs `hashes` concurrent hashes at scrypt cost N = 2**log2N (default 14, the
+production setting) and prints hashes/s, p50/p95 latency including queueing,
+and the average time a hash spends in the pool.
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+async def main(log_n: int, count: int) -> None:
+    from app.services.passwords import hasher
+    from app.services.workers import shutdown_process_pools
+
+    await hasher.hash("warm-up")
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        await hasher.hash("secret123")
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(count)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"N=2^{log_n}: {count / elapsed:.1f} hashes/s, "
+          f"p50 {1000 * latencies[len(latencies) // 2]:.0f} ms, "
+          f"p95 {1000 * latencies[int(0.95 * (len(latencies) - 1))]:.0f} ms, "
+          f"{1000 * hasher.hash_total / hasher.hashes:.0f} ms per hash in the pool")
+    shutdown_process_pools()
+
+
+if __name__ == "__main__":
+    log_n = int(sys.argv[1]) if len(sys.argv) > 1 else 14
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    os.environ["PASSWORD_SCRYPT_LOG_N"] = str(log_n)
+    asyncio.run(main(log_n, count))
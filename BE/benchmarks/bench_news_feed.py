@@ -0,0 +1,67 @@
+"""
+Cold news-feed refresh time against a fake Tavily.
+
+    cd BE && python benchmarks/bench_news_feed.py [median latency ms] [rounds]
+
+Each fake Tavily search takes a random time around the given median (long
+tail up to 4x, like the real API). The feed's concurrent fan-out is timed
+against running the same QUERIES one after another, the way the feed used
+to, and the NEWS_FEED_DEADLINE cut-off is reported when it fires.
+"""
+import asyncio
+import functools
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def fake_tavily(median: float):
+    import httpx
+
+    async def handler(request):
+        await asyncio.sleep(median * random.choice([0.6, 0.8, 1, 1, 1.2, 1.5, 4]))
+        query = httpx.Response(200, content=request.content).json()["query"]
+        return httpx.Response(200, json={"results": [
+            {"title": f"शिक्षा समाचार {n}", "url": f"https://www.jagran.com/{abs(hash(query))}-{n}.html",
+             "content": "बिहार शिक्षा विभाग ने आज नया आदेश जारी किया।", "score": 0.5} for n in range(10)]})
+    return httpx.MockTransport(handler)
+
+
+async def main(median: float, rounds: int) -> None:
+    import httpx
+    from app.routes import news
+
+    httpx_client = httpx.AsyncClient
+    news.httpx.AsyncClient = functools.partial(httpx_client, transport=fake_tavily(median))
+
+    async def sequential():
+        async with news.httpx.AsyncClient() as client:
+            for q in news.QUERIES:
+                await news._search(client, "bench", q["query"], q["max"])
+
+    timings = {"sequential": [], "concurrent": []}
+    stale = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await sequential()
+        timings["sequential"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        sections = await news._fetch_sections("bench")
+        timings["concurrent"].append(time.perf_counter() - start)
+        stale += sum(s["stale"] for s in sections)
+
+    for name, values in timings.items():
+        values.sort()
+        print(f"{name:>10}: mean {1000 * statistics.mean(values):.0f} ms, "
+              f"p95 {1000 * values[int(0.95 * (len(values) - 1))]:.0f} ms, max {1000 * values[-1]:.0f} ms")
+    print(f"deadline {news.FEED_DEADLINE:.0f} s: {stale} of {rounds * len(news.QUERIES)} sections served stale")
+
+
+if __name__ == "__main__":
+    median = (int(sys.argv[1]) if len(sys.argv) > 1 else 2500) / 1000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    asyncio.run(main(median, rounds))
@@ -0,0 +1,44 @@
+"""
+Access-token verification cost per request.
+
+    cd BE && python benchmarks/bench_tokens.py [tokens] [rounds]
+
+Verifies `tokens` distinct access tokens `rounds` times each and prints the
+µs per verify for the first pass (HMAC + JSON decode) and for later passes
+(served from the claims cache).
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("AUTH_SIGNING_KEYS", "bench:not-a-real-secret-only-for-benchmarks")
+
+
+def main(count: int, rounds: int) -> None:
+    from app.services.sessions import TokenSigner
+
+    signer = TokenSigner()
+    tokens = [signer.issue({"id": i, "name": "शिक्षक", "email": f"t{i}@example.in"})["access_token"]
+              for i in range(count)]
+
+    start = time.perf_counter()
+    for token in tokens:
+        assert signer.verify(token)
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            signer.verify(token)
+    cached = time.perf_counter() - start
+
+    print(f"{count} tokens: {1e6 * full / count:.1f} µs per full verify, "
+          f"{1e6 * cached / (count * rounds):.1f} µs per cached verify")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    main(count, rounds)
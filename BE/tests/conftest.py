@@ -0,0 +1,31 @@
+"""
+Test setup: the app package is imported from BE/, with every store, cache and
+signing key pointed at a throwaway directory so tests never touch var/.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BE = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BE))
+
+_tmp = tempfile.mkdtemp(prefix="shikshak-tests-")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("CACHE_SQLITE_PATH", os.path.join(_tmp, "cache.sqlite3"))
+os.environ.setdefault("NOTICE_STORE_PATH", os.path.join(_tmp, "notices.sqlite3"))
+os.environ.setdefault("NEWS_ARCHIVE_PATH", os.path.join(_tmp, "news_archive.sqlite3"))
+os.environ.setdefault("SNAPSHOT_DIR", os.path.join(_tmp, "snapshots"))
+os.environ.setdefault("AUTH_SIGNING_KEYS", "test:not-a-real-secret-only-for-tests")
+os.environ.pop("REDIS_URL", None)
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _process_pools():
+    yield
+    from app.services.workers import shutdown_process_pools
+    shutdown_process_pools()
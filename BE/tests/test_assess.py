@@ -0,0 +1,126 @@
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routes import assess
+from app.services.cache import SharedCache
+
+app = FastAPI()
+app.include_router(assess.router)
+
+
+def score(content=None, json=None):
+    async def post():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            if content is not None:
+                return await client.post("/assess/score", content=content.encode("utf-8"),
+                                         headers={"Content-Type": "text/csv"})
+            return await client.post("/assess/score", json=json)
+    return asyncio.run(post())
+
+
+def test_csv_is_scored():
+    response = score("student,q1,q2\nkey,A,C\nअमन,A,C\nरीता,B,C\n")
+    assert response.status_code == 200
+    body = response.json()
+    assert [s["score"] for s in body["students"]] == [2, 1]
+    assert [i["p"] for i in body["items"]] == [0.5, 1.0]
+
+
+@pytest.mark.parametrize("csv", [
+    "student,q1,q2\nkey,A,\nअमन,A,C\n",          # blank key cell
+    "student,q1,q2\nkey,A,X\nअमन,A,C\n",         # unknown option
+    "student,q1,q2\nkey,A,E\nअमन,A,C\n",         # option 5 of 4
+    "student,q1,q2\nअमन,A,C\n",                  # no key row and no stored items
+    "student,q1,q2\nkey,A,C\n",                  # no students
+])
+def test_malformed_csv_is_422(csv):
+    response = score(csv)
+    assert response.status_code == 422
+    assert response.json()["error"]
+
+
+@pytest.mark.parametrize("body", [
+    {"responses": [[0, 1]], "key": [0, 5]},
+    {"responses": [[0, 9]], "key": [0, 1]},
+    {"responses": [], "key": [0, 1]},
+    {"responses": [[0, 1]]},
+    {"key": [0]},
+])
+def test_malformed_json_is_422(body):
+    assert score(json=body).status_code == 422
+
+
+# ── Rubric grading ──
+
+ANSWER_LINE = re.compile(r"^\[a(\d+)\] (.*)$", re.M)
+
+
+@pytest.fixture
+def grader(monkeypatch):
+    """Fake grading model: 9.3 marks for answers mentioning क्लोरोफिल, else 2.26; chunks with "FAIL" error."""
+    calls = []
+
+    async def complete(client, **kwargs):
+        listing = ANSWER_LINE.findall(kwargs["messages"][-1]["content"])
+        calls.append([text for _, text in listing])
+        if any("FAIL" in text for _, text in listing):
+            raise RuntimeError("upstream 500")
+        grades = [{"id": f"a{i}", "marks": 9.3 if "क्लोरोफिल" in text else 2.26, "feedback": "ठीक"}
+                  for i, text in listing]
+        grades.append({"id": "a99", "marks": 1, "feedback": "no such answer"})
+        content = json.dumps({"grades": grades}, ensure_ascii=False)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    monkeypatch.setattr(assess, "get_ai_client", lambda deployment: (object(), "gpt-test", None))
+    monkeypatch.setattr(assess, "complete", complete)
+    monkeypatch.setattr(assess, "_grade_cache", SharedCache("test.grade", shared=False))
+    return calls
+
+
+def grade(answers, **body):
+    async def post():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return await client.post("/assess/grade", json={
+                "question": "प्रकाश संश्लेषण क्या है?", "max_marks": 5,
+                "answers": [{"student_id": f"s{i}", "answer": a} for i, a in enumerate(answers)], **body})
+    return asyncio.run(post()).json()
+
+
+def test_each_distinct_answer_is_graded_once(grader):
+    body = grade(["पौधे क्लोरोफिल से भोजन बनाते हैं।", "पौधे  क्लोरोफिल से भोजन बनाते हैं", "धूप", "  "])
+    assert grader == [["पौधे क्लोरोफिल से भोजन बनाते हैं।", "धूप"]]
+    results = body["results"]
+    # Marks are clamped to max_marks and rounded to halves
+    assert [(r["marks"], r["source"]) for r in results] == [(5, "ai"), (5, "duplicate"), (2.5, "ai"), (0, "empty")]
+    assert body["summary"] == {"answers": 4, "graded": 4, "failed": 0, "llm_calls": 1, "average": 3.12}
+
+
+def test_grades_are_reused_from_the_cache(grader):
+    grade(["धूप"])
+    body = grade(["धूप।", "पानी"])
+    assert [r["source"] for r in body["results"]] == ["cache", "ai"] and grader[-1] == ["पानी"]
+
+
+def test_answers_are_packed_into_chunks_and_a_failed_chunk_fails_only_its_answers(grader, monkeypatch):
+    monkeypatch.setattr(assess, "GRADE_CHUNK_MAX", 2)
+    body = grade(["उत्तर एक", "उत्तर दो", "FAIL", "उत्तर चार", "उत्तर पांच"])
+    assert body["summary"]["llm_calls"] == 3 and sorted(map(len, grader)) == [1, 2, 2]
+    failed = {r["student_id"] for r in body["results"] if r["status"] == "error"}
+    assert len(failed) == 2 and "s2" in failed and body["summary"]["failed"] == 2
+
+
+def test_chunks_respect_the_token_budget(monkeypatch):
+    monkeypatch.setattr(assess, "GRADE_CHUNK_TOKENS", 100)
+    chunks = assess._chunk([(str(i), "अ" * 60) for i in range(5)])      # 38 tokens each
+    assert [len(c) for c in chunks] == [2, 2, 1]
+
+
+def test_grading_limits(grader):
+    assert "error" in grade([])
+    assert "error" in grade(["उत्तर"] * (assess.MAX_ANSWERS + 1)) and not grader
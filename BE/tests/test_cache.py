@@ -0,0 +1,159 @@
+import asyncio
+import os
+import time
+import uuid
+
+import pytest
+
+from app.services import cache
+from app.services.cache import RedisBackend, SharedCache, SQLiteBackend, TTLCache, make_key
+
+# Redis is an optional dependency; point TEST_REDIS_URL at a throwaway server to run its cases
+TEST_REDIS_URL = os.getenv("TEST_REDIS_URL")
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    if not TEST_REDIS_URL:
+        pytest.skip("TEST_REDIS_URL not set")
+    pytest.importorskip("redis")
+    return RedisBackend(TEST_REDIS_URL)
+
+
+@pytest.fixture
+def key():
+    return f"test:{uuid.uuid4().hex}"
+
+
+def test_make_key_ignores_case_and_spacing():
+    assert make_key("  Photosynthesis  kya hai ", 8) == make_key("photosynthesis kya HAI", 8) != make_key("x", 8)
+
+
+def test_local_tier_is_lru_with_ttl_and_byte_budget():
+    local = TTLCache("t", maxsize=2, max_bytes=100)
+    local.set("a", 1)
+    local.set("b", 2)
+    local.get("a")
+    local.set("c", 3)                    # evicts "b", the least recently used
+    assert (local.get("a"), local.get("b"), local.get("c")) == (1, None, 3)
+    local.set("a", 1, ttl=-1)
+    assert local.get("a") is None
+    local.set("big", "x", size=80)
+    local.set("bigger", "y", size=60)    # over 100 bytes: the older entry goes
+    assert local.get("big") is None and local.bytes == 60
+
+
+def test_backend_values_expire(backend, key):
+    async def scenario():
+        await backend.set(key, b'{"a":1}', 60)
+        value, expires = await backend.get(key)
+        assert value == b'{"a":1}' and 0 < expires - time.time() <= 60
+        await backend.set(key, b"1", 0.001)
+        await asyncio.sleep(0.01)
+        assert await backend.get(key) is None
+        await backend.set(key, b"1", 60)
+        await backend.delete(key)
+        assert await backend.get(key) is None
+
+    asyncio.run(scenario())
+
+
+def test_backend_counters_add_up_and_start_over_after_expiry(backend, key):
+    async def scenario():
+        assert [await backend.incr(key, 60, n) for n in (1, 2, 3)] == [1, 3, 6]
+        assert await backend.count(key) == 6 and await backend.count(key + ":none") == 0
+        await backend.incr(f"{key}:short", 0.001)
+        await asyncio.sleep(0.01)
+        assert await backend.count(f"{key}:short") == 0
+        assert await backend.incr(f"{key}:short", 60) == 1
+
+    asyncio.run(scenario())
+
+
+def test_backend_lock_is_released_only_by_its_owner(backend, key):
+    async def scenario():
+        assert await backend.acquire(key, "one", 60)
+        assert not await backend.acquire(key, "two", 60)
+        await backend.release(key, "two")            # not the holder: no effect
+        assert not await backend.acquire(key, "two", 60)
+        await backend.release(key, "one")
+        assert await backend.acquire(key, "two", 0.001)
+        await asyncio.sleep(0.01)
+        # "two" expired and "three" took over; a late release by "two" must not free it
+        assert await backend.acquire(key, "three", 60)
+        await backend.release(key, "two")
+        assert not await backend.acquire(key, "four", 60)
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_loads_share_one_loader_call(monkeypatch):
+    monkeypatch.setattr(cache, "get_backend", lambda: None)
+    shared = SharedCache("test.single", ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"answer": 42}
+
+    async def scenario():
+        results = await asyncio.gather(*(shared.get_or_load("k", loader) for _ in range(10)))
+        assert [v for v, _ in results] == [{"answer": 42}] * 10 and not any(hit for _, hit in results)
+        assert await shared.get_or_load("k", loader) == ({"answer": 42}, True)
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+
+
+def test_workers_see_each_others_values_through_the_shared_tier(backend, monkeypatch):
+    monkeypatch.setattr(cache, "get_backend", lambda: backend)
+    name = f"test.{uuid.uuid4().hex[:8]}"
+    one, two = SharedCache(name, ttl=60), SharedCache(name, ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return ["पाठ"]
+
+    async def scenario():
+        assert await one.get_or_load("k", loader) == (["पाठ"], False)
+        assert await two.get_or_load("k", loader) == (["पाठ"], True)
+        assert two.shared_hits == 1 and two.local.get("k") == ["पाठ"]
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+
+
+def test_worker_waits_for_the_lock_holders_result(backend, monkeypatch):
+    monkeypatch.setattr(cache, "get_backend", lambda: backend)
+    name = f"test.{uuid.uuid4().hex[:8]}"
+    one, two = SharedCache(name, ttl=60), SharedCache(name, ttl=60)
+
+    async def scenario():
+        owner = await one.lock("k")                  # "one" is loading elsewhere
+        waiting = asyncio.create_task(two.get_or_load("k", lambda: pytest.fail("second load")))
+        await asyncio.sleep(0.05)
+        await one.set("k", {"v": 1})
+        await one.unlock("k", owner)
+        assert await waiting == ({"v": 1}, False)
+
+    asyncio.run(scenario())
+
+
+def test_unreachable_shared_tier_still_loads(monkeypatch):
+    class Down:
+        async def fail(self, *args):
+            raise ConnectionError("down")
+        get = set = acquire = release = fail
+
+    monkeypatch.setattr(cache, "get_backend", lambda: Down())
+    shared = SharedCache("test.down", ttl=60)
+
+    async def loader():
+        return "value"
+
+    assert asyncio.run(shared.get_or_load("k", loader)) == ("value", False)
+    assert shared.local.get("k") == "value"
@@ -0,0 +1,52 @@
+import json
+from collections import Counter
+
+import pytest
+
+from conftest import FIXTURES
+from app.services.categorizer import MAX_REPEATS, classify, get_categorizer
+
+# Portal and news notice titles, labelled by hand with primary category and priority
+LABELED = json.loads((FIXTURES / "notices" / "labeled.json").read_text(encoding="utf-8"))
+
+
+def test_accuracy_on_the_labelled_notices():
+    misses = [(row["text"], row["category"], classify(row["text"])["category"])
+              for row in LABELED if classify(row["text"])["category"] != row["category"]]
+    assert len(misses) <= len(LABELED) // 20, misses        # at least 95% correct
+    # Every category, including the default, is represented and reachable
+    assert set(Counter(row["category"] for row in LABELED)) == set(get_categorizer().icons) | {"शासनादेश"}
+
+
+def test_priority_on_the_labelled_notices():
+    wrong = [row["text"] for row in LABELED if classify(row["text"])["priority"] != row["priority"]]
+    assert wrong == []
+
+
+@pytest.mark.parametrize("text, category", [
+    ("Example of a good lesson plan", "शासनादेश"),         # "exam" is not a word in "Example"
+    ("Transferred teachers must join", "स्थानांतरण"),        # English keywords take inflections
+    ("Transfers and postings", "स्थानांतरण"),
+    ("Salaries to be paid", "वेतन"),
+    ("शिक्षकों के तबादलों पर रोक", "स्थानांतरण"),              # Hindi stems match inflected forms
+    ("स्थानांतरित शिक्षकों को विरमित करें", "स्थानांतरण"),
+])
+def test_word_boundaries(text, category):
+    assert classify(text)["category"] == category
+
+
+def test_multi_label_and_repeat_cap():
+    result = classify("प्रधानाध्यापक के पद पर पदोन्नति एवं वेतन निर्धारण")
+    assert [c["name"] for c in result["categories"]] == ["वेतन", "पदोन्नति"]
+    assert 0 < result["categories"][1]["confidence"] < result["categories"][0]["confidence"] < 1
+    once, many = classify("परीक्षा"), classify(" ".join(["परीक्षा"] * (MAX_REPEATS + 5)))
+    assert many["categories"][0]["score"] == once["categories"][0]["score"] * MAX_REPEATS
+
+
+def test_full_notice_text_ranks_every_category_it_mentions():
+    # One long text touching every category (throughput: benchmarks/bench_categorizer.py)
+    result = classify(" ".join(row["text"] for row in LABELED))
+    ranked = result["categories"]
+    assert {c["name"] for c in ranked} == set(get_categorizer().icons)
+    assert [c["score"] for c in ranked] == sorted((c["score"] for c in ranked), reverse=True)
+    assert result["category"] == ranked[0]["name"] and result["priority"] == "high"
@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+from app.services.dates import extract_dates
+
+REF = date(2026, 4, 1)
+
+
+def deadlines(text: str) -> list:
+    return [d["date"] for d in extract_dates(text, ref=REF)["deadlines"]]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("आवेदन की अंतिम तिथि 30.04.2026 है।", ["2026-04-30"]),
+    ("आवेदन जमा करने की अंतिम तिथि दिनांक 30 अप्रैल 2026 निर्धारित है।", ["2026-04-30"]),
+    ("Last date for submission is 15 May 2026.", ["2026-05-15"]),
+    ("Forms must reach the office on or before 12/05/2026.", ["2026-05-12"]),
+    ("Applications are accepted till 20th May, 2026.", ["2026-05-20"]),
+    ("सभी प्रधानाध्यापक 31.05.2026 तक उपयोगिता प्रमाण पत्र भेजें।", ["2026-05-31"]),
+    ("प्रशिक्षण 10 मई 2026 से पूर्व पूर्ण कर लें।", ["2026-05-10"]),
+    ("ऑनलाइन आवेदन 01.04.2026 से 30.04.2026 तक किए जा सकते हैं।", ["2026-04-30"]),
+    ("Training will run 1-15 June 2026 at the DIET.", ["2026-06-15"]),
+])
+def test_deadline_cues(text, expected):
+    assert deadlines(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Meeting on 5 May 2026 before the review of teacher postings.",
+    "दिनांक 05.05.2026 को बैठक होगी, समीक्षा से पूर्व सभी उपस्थित रहें।",
+    "The review held on 2 April 2026 was attended by all district officers before lunch.",
+    "पूर्व में दिनांक 12.03.2026 को जारी पत्र को निरस्त किया जाता है।",
+])
+def test_dates_near_an_unrelated_before_are_not_deadlines(text):
+    assert deadlines(text) == []
+
+
+def test_issue_date_and_deadline_in_one_notice():
+    text = "पत्रांक 11/वि-2026\nपटना, दिनांक 02.04.2026\nविषय: स्थानांतरण हेतु आवेदन।\nआवेदन की अंतिम तिथि दिनांक 25.04.2026 है।"
+    result = extract_dates(text, ref=REF)
+    assert result["issue_date"] == "2026-04-02"
+    assert [d["date"] for d in result["deadlines"]] == ["2026-04-25"]
+
+
+def test_deadline_after_dinank_is_not_taken_as_issue_date():
+    result = extract_dates("अंतिम तिथि दिनांक 25.04.2026", ref=REF)
+    assert result["issue_date"] is None
+    assert [d["date"] for d in result["deadlines"]] == ["2026-04-25"]
@@ -0,0 +1,108 @@
+import asyncio
+import os
+
+import pytest
+
+from app.services import db
+from app.services.db import Database, DatabaseUnavailable, statement_cache_size
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+needs_postgres = pytest.mark.skipif(not TEST_DATABASE_URL or db.asyncpg is None,
+                                    reason="TEST_DATABASE_URL not set")
+
+
+def test_statement_cache_is_off_behind_the_transaction_pooler(monkeypatch):
+    monkeypatch.delenv("DB_STATEMENT_CACHE", raising=False)
+    assert statement_cache_size("postgresql://u:p@aws-0.pooler.supabase.com:6543/postgres") == 0
+    assert statement_cache_size("postgresql://u:p@db.example.supabase.co:5432/postgres") == 100
+    assert statement_cache_size("postgresql://u:p@localhost/postgres") == 100
+    monkeypatch.setenv("DB_STATEMENT_CACHE", "25")
+    assert statement_cache_size("postgresql://u:p@aws-0.pooler.supabase.com:6543/postgres") == 25
+
+
+def test_unconfigured_database_is_unavailable(monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+
+    async def scenario():
+        async with Database().acquire():
+            pass
+
+    with pytest.raises(DatabaseUnavailable, match="DATABASE_URL"):
+        asyncio.run(scenario())
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", TEST_DATABASE_URL or "")
+    monkeypatch.setattr(db, "DB_POOL_MIN", 1)
+    monkeypatch.setattr(db, "DB_POOL_MAX", 2)
+    monkeypatch.setattr(db, "DB_POOL_TIMEOUT", 0.2)
+
+
+@needs_postgres
+def test_exhausted_pool_times_out_instead_of_queueing_forever(small_pool):
+    async def scenario():
+        database = Database()
+        try:
+            async with database.acquire(), database.acquire():
+                with pytest.raises(DatabaseUnavailable, match="exhausted"):
+                    async with database.acquire():
+                        pass
+            # Both connections are back, so the next request gets one straight away
+            async with database.acquire() as conn:
+                assert await conn.fetchval("SELECT 1") == 1
+            return database.stats()
+        finally:
+            await database.close()
+
+    stats = asyncio.run(scenario())
+    assert stats["timeouts"] == 1 and stats["acquired"] == 3
+
+
+@needs_postgres
+def test_connection_closed_by_the_server_is_not_handed_out(small_pool):
+    async def scenario():
+        database = Database()
+        try:
+            async with database.acquire() as conn:
+                pid = await conn.fetchval("SELECT pg_backend_pid()")
+            killer = await db.asyncpg.connect(TEST_DATABASE_URL)
+            try:
+                await killer.fetchval("SELECT pg_terminate_backend($1)", pid)
+            finally:
+                await killer.close()
+            await asyncio.sleep(0.1)
+            async with database.acquire() as conn:
+                return pid, await conn.fetchval("SELECT pg_backend_pid()")
+        finally:
+            await database.close()
+
+    old, new = asyncio.run(scenario())
+    assert new != old
+
+
+@needs_postgres
+def test_silently_dropped_connection_fails_its_ping_and_is_replaced(small_pool, monkeypatch):
+    monkeypatch.setattr(db, "DB_IDLE_PING", 0)    # ping on every checkout
+
+    async def scenario():
+        database = Database()
+        try:
+            async with database.acquire() as conn:
+                pid = await conn.fetchval("SELECT pg_backend_pid()")
+                dropped = conn._con
+            execute = db.PooledConnection.execute
+
+            async def half_open(self, query, *args, **kwargs):
+                # Nothing told asyncpg the pooler dropped it; only the ping finds out
+                if self is dropped and query == "SELECT 1":
+                    raise ConnectionResetError("pooler dropped the connection")
+                return await execute(self, query, *args, **kwargs)
+            monkeypatch.setattr(db.PooledConnection, "execute", half_open)
+            async with database.acquire() as conn:
+                assert await conn.fetchval("SELECT pg_backend_pid()") != pid
+            return database.stats()
+        finally:
+            await database.close()
+
+    assert asyncio.run(scenario())["replaced_connections"] == 1
@@ -0,0 +1,78 @@
+import json
+import random
+import time
+from itertools import combinations
+
+import pytest
+
+from conftest import FIXTURES
+from app.services.dedup import canonical_url, cluster, dedupe_sections
+
+# One refresh's worth of results; "story" labels which items report the same event
+CORPUS = json.loads((FIXTURES / "news" / "feed_labeled.json").read_text(encoding="utf-8"))
+ITEMS = [item for section in CORPUS for item in section["results"]]
+
+
+def corpus():
+    return json.loads(json.dumps(CORPUS))
+
+
+def same_story_pairs(stories):
+    return {(a, b) for a, b in combinations(range(len(stories)), 2) if stories[a] == stories[b]}
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("https://www.livehindustan.com/bihar/story-x-201.amp.html?utm_source=whatsapp", "https://livehindustan.com/bihar/story-x-201.html"),
+    ("https://m.aajtak.in/education/story/x-2291.html?fbclid=IwAR0x#top", "https://aajtak.in/education/story/x-2291.html"),
+    ("http://amp.jagran.com/bihar/x/amp/?page=2&ref=home", "https://jagran.com/bihar/x?page=2"),
+])
+def test_canonical_url(url, canonical):
+    assert canonical_url(url) == canonical
+
+
+def test_clusters_match_the_labelled_stories():
+    groups = cluster([f"{i['title']} {i['snippet'][:200]}" for i in ITEMS])
+    predicted = {}
+    for n, group in enumerate(groups):
+        for i in group:
+            predicted[i] = n
+    found = same_story_pairs([predicted[i] for i in range(len(ITEMS))])
+    expected = same_story_pairs([i["story"] for i in ITEMS])
+    # Every copy found, and no two different stories on the same topic merged
+    assert found == expected
+
+
+def test_clusters_do_not_depend_on_order():
+    order = list(range(len(ITEMS)))
+    random.Random(7).shuffle(order)
+    groups = cluster([f"{ITEMS[i]['title']} {ITEMS[i]['snippet'][:200]}" for i in order])
+    stories = sorted(sorted(ITEMS[order[i]]["story"] for i in g) for g in groups)
+    assert stories == sorted(sorted(i["story"] for i in ITEMS if i["story"] == s)
+                             for s in {i["story"] for i in ITEMS})
+
+
+def test_feed_keeps_the_best_copy_of_each_story():
+    out = dedupe_sections(corpus())
+    kept = [item for section in out for item in section["results"]]
+    assert sorted(i["story"] for i in kept) == sorted({i["story"] for i in ITEMS})
+    for item in kept:
+        copies = [i for i in ITEMS if i["story"] == item["story"]]
+        assert item["score"] == max(i["score"] for i in copies)
+        # Other outlets are credited; the same article under another URL is not
+        assert sorted(a["url"] for a in item["also_reported_by"]) == sorted(
+            i["url"] for i in copies
+            if canonical_url(i["url"]) != canonical_url(item["url"]))
+    # Section order survives, and a story is only kept in its best copy's section
+    assert [s["key"] for s in out] == ["bihar", "india", "schemes"]
+    tre4 = next(i for i in kept if i["story"] == "tre4")
+    assert tre4["source"] == "www.aajtak.in"
+    assert all(i["story"] != "tre4" for i in out[1]["results"])
+
+
+def test_dedupe_is_fast_enough_for_every_refresh():
+    sections = corpus()
+    dedupe_sections(sections)
+    start = time.perf_counter()
+    for _ in range(20):
+        dedupe_sections(corpus())
+    assert (time.perf_counter() - start) / 20 < 0.05
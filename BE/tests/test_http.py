@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routes import news
+from app.services import http
+from app.services.http import MAX_REDIRECTS, RedirectBlocked, fetch_capped
+
+
+@pytest.fixture
+def served(monkeypatch):
+    """Routes path → handler on a mock client; records every URL requested."""
+    requested, routes = [], {}
+
+    def handler(request):
+        requested.append(str(request.url))
+        return routes[request.url.host + request.url.path](request)
+
+    monkeypatch.setattr(http, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return routes, requested
+
+
+def redirect(location: str):
+    return lambda request: httpx.Response(302, headers={"location": location})
+
+
+def allow_news(url: str) -> bool:
+    return httpx.URL(url).host.endswith("livehindustan.com")
+
+
+def test_redirects_are_followed_while_allowed(served):
+    routes, requested = served
+    routes["www.livehindustan.com/a"] = redirect("/b")
+    routes["www.livehindustan.com/b"] = redirect("https://m.livehindustan.com/c")
+    routes["m.livehindustan.com/c"] = lambda r: httpx.Response(200, text="खबर")
+    resp, body = asyncio.run(fetch_capped("https://www.livehindustan.com/a", 1000, allow=allow_news))
+    assert body.decode() == "खबर" and str(resp.url) == "https://m.livehindustan.com/c"
+    assert len(requested) == 3
+
+
+def test_redirect_off_the_allowlist_is_blocked_before_it_is_fetched(served):
+    routes, requested = served
+    routes["www.livehindustan.com/a"] = redirect("http://169.254.169.254/latest/meta-data/")
+    with pytest.raises(RedirectBlocked):
+        asyncio.run(fetch_capped("https://www.livehindustan.com/a", 1000, allow=allow_news))
+    assert requested == ["https://www.livehindustan.com/a"]
+
+
+def test_redirect_loops_are_cut(served):
+    routes, requested = served
+    routes["www.livehindustan.com/a"] = redirect("/a")
+    with pytest.raises(RedirectBlocked, match="redirects"):
+        asyncio.run(fetch_capped("https://www.livehindustan.com/a", 1000, allow=allow_news))
+    assert len(requested) == MAX_REDIRECTS + 1
+
+
+def test_body_is_cut_at_max_bytes_without_reading_the_rest(served):
+    routes, _ = served
+    sent = []
+
+    async def chunks():
+        for _ in range(100):
+            sent.append(1)
+            yield b"x" * 1024
+
+    routes["portal.in/big.pdf"] = lambda r: httpx.Response(200, content=chunks())
+    _, body = asyncio.run(fetch_capped("https://portal.in/big.pdf", 4000))
+    assert len(body) == 4000 and len(sent) < 10
+
+
+def test_article_route_refuses_a_redirect_to_another_host(served, monkeypatch):
+    routes, requested = served
+    routes["www.livehindustan.com/bihar/story.html"] = redirect("http://localhost:8000/admin")
+    app = FastAPI()
+    app.include_router(news.router)
+
+    async def get():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return await client.get("/news/article", params={"url": "https://www.livehindustan.com/bihar/story.html"})
+
+    assert "error" in asyncio.run(get()).json()
+    assert not any("localhost" in url for url in requested)
+    assert not news._allowed_article_url("http://user:pw@livehindustan.com/") and not news._allowed_article_url("file:///etc/passwd")
@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routes import news
+from app.services.news_archive import NewsArchive, decode_cursor, encode_cursor
+
+
+def article(n: int, published: str) -> dict:
+    return {"url": f"https://www.livehindustan.com/bihar/story-{n:03d}.html", "title": f"खबर {n}",
+            "snippet": "", "source": "livehindustan.com", "published_date": published}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = NewsArchive(str(tmp_path / "news.sqlite3"))
+    # Five articles share one timestamp, so a page boundary falls inside the tie
+    same = "Mon, 13 Apr 2026 06:00:00 GMT"
+    archive.upsert([
+        {"key": "bihar", "results": [article(n, same) for n in range(5)]},
+        {"key": "india", "results": [article(n, f"Mon, {n:02d} Apr 2026 06:00:00 GMT") for n in range(5, 12)]},
+    ])
+    return archive
+
+
+def all_pages(archive, limit, section=None):
+    pages, cursor = [], None
+    while True:
+        items, cursor = archive.page(cursor, limit, section)
+        pages.append([i["url"] for i in items])
+        if not cursor:
+            return pages
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(1776060000.25, "https://x.in/a|b")) == (1776060000.25, "https://x.in/a|b")
+
+
+def test_pages_cover_every_article_once_across_equal_timestamps(archive):
+    full, _ = archive.page(limit=100)
+    pages = all_pages(archive, 2)
+    assert [len(p) for p in pages] == [2, 2, 2, 2, 2, 2]
+    assert sum(pages, []) == [i["url"] for i in full]
+    assert len(set(sum(pages, []))) == 12
+    # The tie is broken by url: the first five are the same-timestamp articles, newest url first
+    assert sum(pages, [])[:5] == [article(n, "")["url"] for n in range(4, -1, -1)]
+
+
+def test_section_pages(archive):
+    assert len(sum(all_pages(archive, 3, "india"), [])) == 7
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "bm90LWEtY3Vyc29y", "नहीं"])
+def test_invalid_cursor_is_an_error_not_page_one(archive, cursor):
+    with pytest.raises(ValueError):
+        archive.page(cursor)
+
+
+def test_feed_route_rejects_an_invalid_cursor(archive, monkeypatch):
+    monkeypatch.setattr(news, "news_archive", archive)
+    app = FastAPI()
+    app.include_router(news.router)
+
+    async def get(params):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return await client.get("/news/feed", params=params)
+
+    first = asyncio.run(get({"limit": 4})).json()
+    second = asyncio.run(get({"limit": 4, "before": first["next"]})).json()
+    assert first["source"] == "archive" and not {i["url"] for i in first["items"]} & {i["url"] for i in second["items"]}
+    bad = asyncio.run(get({"before": "garbage"}))
+    assert bad.status_code == 422 and "error" in bad.json()
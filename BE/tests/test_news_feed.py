@@ -0,0 +1,80 @@
+import asyncio
+import functools
+
+import httpx
+import pytest
+
+from app.routes import news
+
+ORIGINAL_CLIENT = httpx.AsyncClient
+
+
+def tavily_result(query: str, n: int) -> dict:
+    return {"title": f"{query[:12]} खबर {n}", "url": f"https://www.jagran.com/bihar/{abs(hash(query))}-{n}.html",
+            "content": "बिहार शिक्षा विभाग ने आज नया आदेश जारी किया।", "score": 0.9 - n / 100}
+
+
+@pytest.fixture
+def tavily(monkeypatch):
+    """Fake Tavily: per-query latency (seconds) or status, keyed by section key.
+    Also reports the peak number of searches in flight and which ones completed."""
+    behaviour, calls = {}, {"in_flight": 0, "peak": 0, "finished": []}
+    by_query = {q["query"]: q["key"] for q in news.QUERIES}
+
+    async def handler(request):
+        body = httpx.Response(200, content=request.content).json()
+        key = by_query[body["query"]]
+        latency, status = behaviour.get(key, (0.0, 200))
+        calls["in_flight"] += 1
+        calls["peak"] = max(calls["peak"], calls["in_flight"])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            calls["in_flight"] -= 1
+        calls["finished"].append(key)
+        if status != 200:
+            return httpx.Response(status, json={"detail": "upstream error"})
+        # One English-only result the Hindi filter drops
+        results = [{"title": "English only", "url": "https://x.in/1", "content": "No Hindi here"}]
+        results += [tavily_result(body["query"], n) for n in range(10)]
+        return httpx.Response(200, json={"results": results})
+
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(news.httpx, "AsyncClient", functools.partial(ORIGINAL_CLIENT, transport=transport))
+    monkeypatch.setattr(news, "_section_cache", {})
+    return behaviour, calls
+
+
+def test_sections_are_fetched_concurrently(tavily):
+    behaviour, calls = tavily
+    behaviour.update({q["key"]: (0.05, 200) for q in news.QUERIES})
+    sections = asyncio.run(news._fetch_sections("test-key"))
+    # All searches were in flight together (timing: benchmarks/bench_news_feed.py)
+    assert calls["peak"] == len(news.QUERIES)
+    assert [len(s["results"]) for s in sections] == [q["max"] for q in news.QUERIES]
+    assert all(s["source"] == "tavily" and not s["stale"] for s in sections)
+    assert all("English" not in r["title"] for s in sections for r in s["results"])
+
+
+def test_slow_section_is_cut_at_the_deadline(tavily, monkeypatch):
+    behaviour, calls = tavily
+    monkeypatch.setattr(news, "FEED_DEADLINE", 0.2)
+    behaviour["india"] = (5.0, 200)
+    sections = {s["key"]: s for s in asyncio.run(news._fetch_sections("test-key"))}
+    # The slow search was cancelled rather than waited for
+    assert sorted(calls["finished"]) == ["bihar", "schemes"] and calls["in_flight"] == 0
+    assert sections["india"] == {"key": "india", "label": sections["india"]["label"], "results": [],
+                                 "source": "unavailable", "stale": True}
+    assert not sections["bihar"]["stale"] and not sections["schemes"]["stale"]
+    assert news._feed_ttl(list(sections.values())) == news.PARTIAL_RETRY
+
+
+def test_failed_section_serves_its_last_good_results(tavily):
+    behaviour, _ = tavily
+    first = {s["key"]: s for s in asyncio.run(news._fetch_sections("test-key"))}
+    behaviour["schemes"] = (0.0, 502)
+    second = {s["key"]: s for s in asyncio.run(news._fetch_sections("test-key"))}
+    assert second["schemes"]["source"] == "cache" and second["schemes"]["stale"]
+    assert second["schemes"]["results"] == first["schemes"]["results"]
+    assert second["bihar"]["source"] == "tavily"
+    assert news._feed_ttl(list(first.values())) == news.CACHE_TTL
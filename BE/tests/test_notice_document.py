@@ -0,0 +1,93 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from conftest import FIXTURES
+from app.routes import notice as notice_routes
+from app.services import http
+from app.services.cache import SharedCache
+from app.services.notice_document import extract_document, parse_metadata
+from app.services.notice_store import NoticeStore, notice_id
+
+CIRCULAR = (FIXTURES / "notices" / "circular.html").read_bytes()
+
+
+@pytest.mark.parametrize("text, meta", [
+    ("पत्रांक- ११/वि१३-१४/२०२४-१२३४ पटना, दिनांक- १५.०४.२०२६",
+     {"order_number": "11/वि13-14/2024-1234", "issue_date": "2026-04-15"}),
+    ("Memo No. 2/Estt-05/2026 — Dated: 5/4/26", {"order_number": "2/Estt-05/2026", "issue_date": "2026-04-05"}),
+    ("संकल्प संख्या 778 दिनांक 31.02.2026 एवं दिनांक 28.02.2026", {"order_number": "778", "issue_date": "2026-02-28"}),
+    ("कोई संख्या नहीं", {"order_number": None, "issue_date": None}),
+])
+def test_parse_metadata(text, meta):
+    assert parse_metadata(text) == meta
+
+
+def test_extracts_the_circular_from_a_portal_page():
+    doc = extract_document(CIRCULAR, "text/html; charset=utf-8", "https://state.bihar.gov.in/educationbihar/c/1.html")
+    assert doc["document_type"] == "html" and doc["order_number"] == "11/वि13-14/2024-1234"
+    assert "महंगाई भत्ता" in doc["text"] and "साइट मैप" not in doc["text"] and "मुख्य पृष्ठ" not in doc["text"]
+
+
+URL = "https://state.bihar.gov.in/educationbihar/Circular/1234.html"
+
+
+@pytest.fixture
+def portal(tmp_path, monkeypatch):
+    """Notice store with one stored notice, and a mock portal serving its circular."""
+    store = NoticeStore(str(tmp_path / "notices.sqlite3"))
+    store.upsert([{"url": URL, "title": "प्रारंभिक शिक्षकों हेतु निदेश", "summary": "", "category": "शासनादेश",
+                   "date": "2026-04-15", "source": "educationbihar"}])
+    requested, status = [], {"code": 200}
+
+    def handler(request):
+        requested.append(str(request.url))
+        if status["code"] != 200:
+            return httpx.Response(status["code"])
+        return httpx.Response(200, content=CIRCULAR, headers={"content-type": "text/html; charset=utf-8"})
+
+    monkeypatch.setattr(http, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(notice_routes, "notice_store", store)
+    monkeypatch.setattr(notice_routes, "_doc_cache", SharedCache("test.document", shared=False))
+    return store, requested, status
+
+
+def get_notice(nid: str) -> dict:
+    app = FastAPI()
+    app.include_router(notice_routes.router)
+
+    async def get():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return await client.get(f"/notice/{nid}")
+    return asyncio.run(get()).json()["notice"]
+
+
+def test_circular_is_fetched_once_and_stored(portal):
+    store, requested, _ = portal
+    nid = notice_id(URL)
+    notice = get_notice(nid)
+    assert requested == [URL]
+    assert notice["order_number"] == "11/वि13-14/2024-1234" and notice["issue_date"] == "2026-04-15"
+    assert notice["category"] == "वेतन"                  # re-categorized on the full text
+    assert "**आदेश संख्या:** 11/वि13-14/2024-1234" in notice["content"]
+    assert store.get(nid)["text"] == notice["text"]
+    assert get_notice(nid)["text"] == notice["text"] and requested == [URL]
+
+
+def test_failed_fetch_is_not_retried_right_away(portal):
+    store, requested, status = portal
+    status["code"] = 503
+    notice = get_notice(notice_id(URL))
+    assert "text" not in notice and notice["fetched_at"]
+    get_notice(notice_id(URL))
+    assert requested == [URL]
+
+
+def test_documents_off_the_government_hosts_are_never_downloaded(portal):
+    store, requested, _ = portal
+    store.upsert([{"url": "https://www.jagran.com/bihar/news-1.html", "title": "शिक्षकों का वेतन",
+                   "summary": "", "category": "वेतन", "date": "2026-04-16", "source": "jagran.com"}])
+    notice = get_notice(notice_id("https://www.jagran.com/bihar/news-1.html"))
+    assert requested == [] and "fetched_at" not in notice
@@ -0,0 +1,107 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routes import notice as notice_routes
+
+from app.routes.notice import _day_ts
+from app.services.notice_search import order_key, tokenize
+from app.services.notice_store import NoticeStore, notice_id
+
+
+@pytest.mark.parametrize("text, tokens", [
+    ("स्थानांतरणों की सूची", ["स्थानांतरण", "सूच"]),             # plural stripped, stopword dropped
+    ("शिक्षकों के लिए", ["शिक्षक"]),
+    ("सड़क पर ज़िला", ["सडक", "जिल"]),                            # nukta dropped
+    ("पाँच", ["पांच"]),                                          # chandrabindu → anusvara
+    ("दिनांक १५.०४.२०२६", ["दिनांक", "15", "04", "2026"]),         # Devanagari digits
+    ("Transfers of the Teachers", ["transfer", "teacher"]),
+])
+def test_tokenize(text, tokens):
+    assert tokenize(text) == tokens
+
+
+def test_order_key_ignores_spacing_and_dash_variants():
+    assert order_key("11 / वि13–14/2024-1234") == order_key("11/वि13-14/2024-1234") == "#11/वि13-14/2024-1234"
+    assert order_key("११/वि१३-१४/२०२४-१२३४") == order_key("11/वि13-14/2024-1234")
+
+
+def notice(n: int, title: str, category: str = "स्थानांतरण", day: int = 1, summary: str = "") -> dict:
+    return {"url": f"https://state.bihar.gov.in/educationbihar/Circular/{n}.pdf", "title": title,
+            "summary": summary, "category": category, "date": f"2026-04-{day:02d}", "source": "educationbihar"}
+
+
+def nid(n: int) -> str:
+    return notice_id(f"https://state.bihar.gov.in/educationbihar/Circular/{n}.pdf")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = NoticeStore(str(tmp_path / "notices.sqlite3"))
+    store.upsert([
+        notice(1, "शिक्षकों का अंतर-जिला स्थानांतरण", day=2),
+        notice(2, "विद्यालयों में ग्रीष्मावकाश", category="अवकाश", day=5,
+               summary="स्थानांतरण आवेदन अवकाश में भी जमा होंगे"),
+        notice(3, "महंगाई भत्ता में वृद्धि", category="वेतन", day=20),
+        notice(4, "स्थानांतरण आदेश निर्गत, शिक्षक योगदान दें", day=25),
+    ])
+    store.update(nid(3), {"order_number": "11/वि13-14/2024-1234"})
+    return store
+
+
+def test_title_match_outranks_summary_match(store):
+    ids = [n["id"] for n in store.search("स्थानांतरण")]
+    assert set(ids) == {nid(1), nid(2), nid(4)}
+    assert ids[-1] == nid(2)          # only in the summary, and a field weight of 1 instead of 3
+
+
+def test_notices_matching_more_terms_rank_first(store):
+    ids = [n["id"] for n in store.search("स्थानांतरण आदेश शिक्षक")]
+    assert ids[0] == nid(4)
+
+
+def test_inflected_query_finds_the_base_form(store):
+    assert {n["id"] for n in store.search("स्थानांतरणों")} == {nid(1), nid(2), nid(4)}
+
+
+def test_order_number_search(store):
+    assert [n["id"] for n in store.search("11 / वि13–14/2024-1234")] == [nid(3)]
+
+
+def test_category_and_date_filters(store):
+    assert [n["id"] for n in store.search("स्थानांतरण", category="अवकाश")] == [nid(2)]
+    ids = [n["id"] for n in store.search("स्थानांतरण", since=_day_ts("2026-04-03"), until=_day_ts("2026-04-25"))]
+    assert ids == [nid(2)]
+    assert store.search("स्थानांतरण", since=_day_ts("2026-05-01")) == []
+
+
+def test_results_leave_out_full_text(store):
+    store.update(nid(1), {"text": "पूरा पत्र " * 100})
+    hit = store.search("अंतर-जिला")[0]
+    assert hit["id"] == nid(1) and "text" not in hit and hit["score"] > 0
+
+
+def test_empty_or_stopword_query(store):
+    assert store.search("") == [] and store.search("के लिए") == []
+
+
+def test_merged_duplicates_are_left_out(store):
+    store.upsert([notice(5, "DA order (English copy)", category="वेतन", day=21)])
+    store.update(nid(5), {"order_number": "11 / वि13–14/2024-1234"})
+    assert [n["id"] for n in store.search("11/वि13-14/2024-1234")] == [nid(3)]
+
+
+def test_search_route(store, monkeypatch):
+    monkeypatch.setattr(notice_routes, "notice_store", store)
+    app = FastAPI()
+    app.include_router(notice_routes.router)
+
+    async def get(params):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return await client.get("/notice/search", params=params)
+
+    body = asyncio.run(get({"q": "स्थानांतरण", "category": "सभी", "since": "2026-04-03"})).json()
+    assert [n["id"] for n in body["notices"]] == [nid(4), nid(2)] and body["count"] == 2
+    assert asyncio.run(get({"q": ""})).status_code == 422
@@ -0,0 +1,121 @@
+import threading
+
+import pytest
+
+from app.services import notice_store
+from app.services.notice_store import NoticeStore, notice_id
+
+CIRCULAR = ("प्रारंभिक विद्यालयों के शिक्षकों का अंतर-जिला स्थानांतरण। सभी जिला शिक्षा पदाधिकारियों को निदेश दिया "
+            "जाता है कि ई-शिक्षाकोष पोर्टल पर प्राप्त आवेदनों का सत्यापन 30.04.2026 तक पूर्ण कर लें। सत्यापन के "
+            "उपरांत स्थानांतरण आदेश पोर्टल से निर्गत किए जाएंगे तथा शिक्षक 15 मई तक नए विद्यालय में योगदान देंगे।")
+OTHER = ("मध्याह्न भोजन योजना के अंतर्गत खाद्यान्न के नमूनों की जांच प्रत्येक माह प्रखंड स्तर पर की जाएगी। "
+         "विद्यालय शिक्षा समिति रसोई की स्वच्छता सुनिश्चित करेगी और पंजी का संधारण करेगी। जांच प्रतिवेदन "
+         "जिला कार्यक्रम पदाधिकारी को प्रत्येक माह की पांच तारीख तक भेजा जाएगा।")
+
+
+def notice(n: int, title: str = "", category: str = "स्थानांतरण", source: str = "educationbihar") -> dict:
+    return {"url": f"https://state.bihar.gov.in/educationbihar/Circular/{n}.pdf", "title": title or f"पत्र {n}",
+            "summary": "", "category": category, "date": f"2026-04-{n:02d}", "source": source}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return NoticeStore(str(tmp_path / "notices.sqlite3"))
+
+
+def test_ids_are_stable_across_url_variants():
+    assert notice_id("https://www.bpsc.bih.nic.in/a.pdf?utm_source=x") == notice_id("https://bpsc.bih.nic.in/a.pdf")
+
+
+def test_upsert_keeps_fields_from_update(store):
+    assert store.upsert([notice(1)]) == 1
+    nid = notice_id(notice(1)["url"])
+    store.update(nid, {"text": CIRCULAR, "category": "परीक्षा"})
+    assert store.upsert([{**notice(1), "title": "पत्र 1 (संशोधित)"}]) == 0
+    stored = store.get(nid)
+    assert stored["title"] == "पत्र 1 (संशोधित)" and stored["text"] == CIRCULAR
+    assert stored["category"] == "परीक्षा"
+
+
+def test_concurrent_updates_keep_both_sides(store):
+    store.upsert([notice(1)])
+    nid = notice_id(notice(1)["url"])
+
+    def writer(field):
+        for i in range(30):
+            store.update(nid, {f"{field}{i}": i}, notify=False)
+
+    threads = [threading.Thread(target=writer, args=(f,)) for f in ("a", "b", "c")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stored = store.get(nid)
+    assert all(f"{f}{i}" in stored for f in "abc" for i in range(30))
+
+
+def test_connections_opened_together_migrate_once(tmp_path):
+    path = str(tmp_path / "fresh.sqlite3")
+    errors = []
+
+    def open_store():
+        try:
+            NoticeStore(path).stats()
+        except Exception as e:     # e.g. "duplicate column name"
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_store) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def test_same_order_number_from_two_sources_is_merged(store):
+    store.upsert([notice(1, "स्थानांतरण हेतु निदेश"), notice(2, "Transfer instructions", source="bpsc")])
+    first, second = notice_id(notice(1)["url"]), notice_id(notice(2)["url"])
+    store.update(first, {"order_number": "11/वि13-14/2024-1234"})
+    store.update(second, {"order_number": "11 / वि13–14/2024-1234"})   # spacing and dash variants
+    assert store.get(second)["id"] == first
+    assert [s["id"] for s in store.get(first)["other_sources"]] == [second]
+    assert [n["id"] for n in store.view()] == [first]
+
+
+def test_near_identical_text_is_merged_and_different_text_is_not(store):
+    store.upsert([notice(1), notice(2), notice(3)])
+    a, b, c = (notice_id(notice(n)["url"]) for n in (1, 2, 3))
+    store.update(a, {"text": CIRCULAR})
+    store.update(b, {"text": CIRCULAR.replace("30.04.2026", "30.04.2026 ") + " प्रतिलिपि: सभी प्रधानाध्यापक।"})
+    store.update(c, {"text": OTHER})
+    assert store.get(b)["id"] == a
+    assert store.get(c)["id"] == c
+    assert sorted(n["id"] for n in store.view()) == sorted([a, c])
+
+
+def test_short_titles_are_not_merged_by_text(store):
+    store.upsert([notice(1, "परीक्षा कार्यक्रम"), notice(2, "परीक्षा कार्यक्रम")])
+    assert len(store.view()) == 2
+
+
+def test_views_are_newest_first_per_category_and_capped(store, monkeypatch):
+    monkeypatch.setattr(notice_store, "VIEW_LIMIT", 3)
+    store.upsert([notice(n, category="अवकाश" if n % 2 else "वेतन") for n in range(1, 9)])
+    ids = lambda notices: [n["id"] for n in notices]
+    assert ids(store.view()) == [notice_id(notice(n)["url"]) for n in (8, 7, 6)]
+    assert ids(store.view("अवकाश")) == [notice_id(notice(n)["url"]) for n in (7, 5, 3)]
+    assert ids(store.view("वेतन")) == [notice_id(notice(n)["url"]) for n in (8, 6, 4)]
+    assert store.view("परीक्षा") == [] and "text" not in store.view()[0]
+
+
+def test_views_rebuild_only_when_another_connection_commits(store, monkeypatch):
+    store.upsert([notice(1)])
+    rebuilds = []
+    rebuild = store._rebuild_views
+    monkeypatch.setattr(store, "_rebuild_views", lambda: rebuilds.append(1) or rebuild())
+    assert len(store.view()) == 1 and len(store.view("स्थानांतरण")) == 1
+    assert len(rebuilds) == 1                        # unchanged data_version: served from memory
+    # A second store on the same file stands in for a worker process or writer thread
+    NoticeStore(store.path).upsert([notice(2, category="वेतन")])
+    assert [n["id"] for n in store.view()] == [notice_id(notice(n)["url"]) for n in (2, 1)]
+    assert len(store.view("वेतन")) == 1 and len(rebuilds) == 2
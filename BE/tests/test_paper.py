@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routes import teach
+from app.services.paper import apportion, assemble, normalize_mix
+from app.services.question_store import question_store
+
+app = FastAPI()
+app.include_router(teach.router)
+
+
+def pool(n_per_cell: int = 12) -> list:
+    return [{"id": f"{t}-{d}-{i}", "question": f"{t} {d} {i}", "type": t, "difficulty": d, "topic": f"topic{i % 3}"}
+            for t in ("objective", "short", "long") for d in ("easy", "medium", "hard") for i in range(n_per_cell)]
+
+
+def post_paper(body: dict):
+    async def post():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return await client.post("/teach/paper", json={"subject": "hindi", "class_num": 1, **body})
+    return asyncio.run(post())
+
+
+def test_apportion_by_largest_remainder():
+    assert apportion(10, normalize_mix({"easy": 0.3, "medium": 0.4, "hard": 0.3})) == {"easy": 3, "medium": 4, "hard": 3}
+    assert sum(apportion(7, normalize_mix({"easy": 0.5})).values()) == 7
+
+
+def test_sets_do_not_share_items():
+    sections = [{"type": "objective", "count": 10, "marks": 1}, {"type": "long", "count": 3, "marks": 5}]
+    mix = {"easy": 0.3, "medium": 0.4, "hard": 0.3}
+    papers, gaps = assemble(pool(), sections, difficulty_mix=mix, sets=3, strict=True, seed=1)
+    assert not gaps and len(papers) == 3
+    ids = [q["id"] for p in papers for s in p["sections"] for q in s["items"]]
+    assert len(ids) == len(set(ids)) == 3 * 13
+
+
+def test_strict_assembly_reports_gaps():
+    sections = [{"type": "objective", "count": 20, "marks": 1}]
+    _, gaps = assemble(pool(3), sections, difficulty_mix={"hard": 1.0}, strict=True, seed=1)
+    assert gaps == {("objective", "hard"): 17}
+
+
+@pytest.mark.parametrize("body", [
+    {"sections": [{"type": "objective", "count": 5_000_000}]},
+    {"sections": [{"type": "objective", "count": 0}]},
+    {"sections": [{"type": "objective", "count": 5, "marks": 1000}]},
+    {"sections": []},
+    {"sets": 0},
+    {"sets": 4},
+    {"difficulty_mix": {"easy": 0.5, "tough": 0.5}},
+    {"difficulty_mix": {"easy": -0.1}},
+    {"difficulty_mix": {"easy": 0.7, "hard": 0.7}},
+])
+def test_oversized_or_invalid_blueprints_are_rejected(body):
+    assert post_paper(body).status_code == 422
+
+
+def test_paper_from_the_stored_pool(monkeypatch):
+    items = pool()
+    monkeypatch.setattr(question_store, "items", lambda subject, class_num: items)
+    response = post_paper({"sections": [{"type": "objective", "count": 10, "marks": 1}], "sets": 2,
+                           "fill_gaps": False, "seed": 3})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["blueprint_marks"] == 10 and len(body["papers"]) == 2 and body["unfilled"] == []
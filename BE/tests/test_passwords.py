@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routes import auth
+from app.services import passwords
+from app.services.passwords import HashingBusy, PasswordHasher
+
+
+@pytest.fixture(autouse=True)
+def cheap_scrypt(monkeypatch):
+    # Same code path at a fraction of the production cost
+    monkeypatch.setattr(passwords, "SCRYPT_LOG_N", 10)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_hash_is_salted_and_verifies():
+    hasher = PasswordHasher()
+    first, second = run(hasher.hash("गुप्त-पासवर्ड")), run(hasher.hash("गुप्त-पासवर्ड"))
+    assert first.startswith("scrypt$10$8$1$") and first != second
+    assert run(hasher.verify("गुप्त-पासवर्ड", first)) == (True, False)
+    assert run(hasher.verify("गलत", first)) == (False, False)
+
+
+def test_legacy_and_old_cost_hashes_ask_for_a_rehash(monkeypatch):
+    hasher = PasswordHasher()
+    legacy = hashlib.sha256(b"secret123").hexdigest()
+    assert run(hasher.verify("secret123", legacy)) == (True, True)
+    assert run(hasher.verify("wrong", legacy)) == (False, True)
+
+    old = run(hasher.hash("secret123"))
+    monkeypatch.setattr(passwords, "SCRYPT_LOG_N", 11)
+    assert run(hasher.verify("secret123", old)) == (True, True)
+    assert run(hasher.verify("wrong", old)) == (False, False)
+
+
+def test_malformed_hash_never_matches():
+    hasher = PasswordHasher()
+    for stored in ("", "scrypt$x$8$1$aa$bb", "bcrypt$12$8$1$aa$bb", "plain-text"):
+        assert run(hasher.verify("anything", stored)) == (False, False)
+
+
+def test_full_queue_is_busy_not_unbounded(monkeypatch):
+    monkeypatch.setattr(passwords, "HASH_CONCURRENCY", 1)
+    monkeypatch.setattr(passwords, "HASH_WAIT", 0.05)
+    monkeypatch.setattr(passwords, "SCRYPT_LOG_N", 15)   # long enough to hold the only slot
+
+    async def scenario():
+        hasher = PasswordHasher()
+        return await asyncio.gather(*(hasher.hash("x") for _ in range(3)), return_exceptions=True), hasher
+
+    results, hasher = run(scenario())
+    assert sum(isinstance(r, str) for r in results) == 1
+    assert sum(isinstance(r, HashingBusy) for r in results) == 2
+    assert hasher.busy == 2
+
+
+def test_event_loop_keeps_running_while_hashing(monkeypatch):
+    monkeypatch.setattr(passwords, "SCRYPT_LOG_N", 14)
+
+    async def scenario():
+        hasher = PasswordHasher()
+        await hasher.hash("warm-up")                    # pool start-up is not what is measured
+        ticks, stop = [], asyncio.Event()
+
+        async def ticker():
+            while not stop.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.005)
+                ticks.append(time.perf_counter() - start)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*(hasher.hash("secret") for _ in range(4)))
+        stop.set()
+        await task
+        return max(ticks)
+
+    # Hashing runs in the process pool, so the loop never stalls for a whole hash (~50 ms)
+    assert run(scenario()) < 0.04
+
+
+class FakeConnection:
+    def __init__(self, user: dict, fail_update: Exception):
+        self.user = user
+        self.fail_update = fail_update
+
+    async def fetchrow(self, query, *args):
+        return self.user
+
+    async def execute(self, query, *args):
+        if query == auth.REHASH_USER:
+            raise self.fail_update
+
+
+class FakeDatabase:
+    def __init__(self, conn: FakeConnection):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.mark.parametrize("error", [RuntimeError("connection reset by peer"), HashingBusy("queue full"),
+                                   ValueError("bad value")])
+def test_failed_rehash_still_logs_the_user_in(monkeypatch, error):
+    user = {"id": 7, "name": "सीमा", "email": "seema@example.in", "phone": "9000000000",
+            "password_hash": hashlib.sha256(b"secret123").hexdigest()}
+    monkeypatch.setattr(auth, "database", FakeDatabase(FakeConnection(user, error)))
+    app = FastAPI()
+    app.include_router(auth.router)
+
+    async def login():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return await client.post("/auth/login", json={"email": user["email"], "password": "secret123"})
+
+    body = run(login()).json()
+    assert body["success"] is True
+    assert body["tokens"]["access_token"]
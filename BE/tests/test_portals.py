@@ -0,0 +1,151 @@
+import asyncio
+
+import httpx
+import pytest
+
+from conftest import FIXTURES
+from app.services import http, portals
+from app.services.notice_store import NoticeStore
+from app.services.portals import Portal, PortalScraper, find_listing_pages, parse_listing
+
+PAGES = FIXTURES / "portals"
+BPSC_HOME = "https://bpsc.bih.nic.in/"
+EDU_CIRCULARS = "https://state.bihar.gov.in/educationbihar/Circulars.html"
+
+
+def fixture(name: str) -> bytes:
+    return (PAGES / name).read_bytes()
+
+
+def test_home_page_links_to_listing_pages_only():
+    pages = find_listing_pages(fixture("bpsc_home.html"), BPSC_HOME)
+    # Not the home page itself, other menu entries, the PDF in the marquee, or other sites
+    assert pages == ["https://bpsc.bih.nic.in/Advt.htm", "https://bpsc.bih.nic.in/Notices.htm"]
+
+
+def test_listing_links_on_the_same_page_are_deduplicated():
+    home = "https://edu-madarsa-board.bihar.gov.in/Default.aspx"
+    pages = find_listing_pages(fixture("madarsa_home.html"), home)
+    assert pages == ["https://edu-madarsa-board.bihar.gov.in/Notification.aspx"]
+
+
+def test_table_listing_titles_and_dates():
+    portal = Portal("bpsc", "BPSC", BPSC_HOME)
+    items = parse_listing(fixture("bpsc_notices.html"), "https://bpsc.bih.nic.in/Notices.htm", portal)
+    assert [(i["url"].rsplit("/", 1)[1], i["date"]) for i in items] == [
+        ("NT-2026-04-17-01.pdf", "2026-04-17"),
+        ("NT-2026-04-09-02.pdf", "2026-04-09"),
+        ("NT-2026-03-28-05.pdf", "2026-03-28"),
+    ]
+    # "Download"/"View" links take their title from the row
+    assert items[0]["title"].startswith("Head Teacher (Primary School)")
+    assert items[1]["title"].startswith("School Teacher Recruitment Exam")
+    assert items[2]["title"].startswith("Notice for candidates of Assistant Teacher")
+
+
+def test_hindi_list_listing():
+    portal = Portal("educationbihar", "शिक्षा विभाग, बिहार", "https://state.bihar.gov.in/educationbihar/CitizenHome.html")
+    items = parse_listing(fixture("educationbihar_circulars.html"), EDU_CIRCULARS, portal)
+    assert [(i["title"], i["date"]) for i in items] == [
+        ("प्रारंभिक विद्यालयों के शिक्षकों का अंतर-जिला स्थानांतरण — ऑनलाइन आवेदन हेतु निदेश", "2026-03-12"),
+        ("विद्यालयों में ग्रीष्मावकाश की अवधि के संबंध में", "2026-03-05"),
+    ]
+    assert items[0]["url"] == "https://state.bihar.gov.in/educationbihar/Circular/2026/letter-1187.pdf"
+
+
+@pytest.fixture
+def site(monkeypatch, tmp_path):
+    """Serve the recorded pages; listing pages honour If-None-Match."""
+    requests = []
+    routes = {
+        BPSC_HOME: fixture("bpsc_home.html"),
+        "https://bpsc.bih.nic.in/Notices.htm": fixture("bpsc_notices.html"),
+        "https://bpsc.bih.nic.in/Advt.htm": b"<html><body><p>No advertisements</p></body></html>",
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        requests.append(url)
+        if url not in routes:
+            return httpx.Response(404)
+        if url != BPSC_HOME and request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=routes[url], headers={"ETag": '"v1"', "Content-Type": "text/html"})
+
+    monkeypatch.setattr(http, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(portals, "notice_store", NoticeStore(str(tmp_path / "notices.sqlite3")))
+    monkeypatch.setattr(portals, "PORTAL_HOST_DELAY", 0)
+    return requests
+
+
+def test_poll_reads_listing_pages_not_the_home_page(site):
+    scraper = PortalScraper([Portal("bpsc", "BPSC", BPSC_HOME)])
+
+    first = asyncio.run(scraper.poll())
+    assert len(first) == 3 and all(i["source"] == "BPSC" for i in first)
+    assert site.count(BPSC_HOME) == 1
+    assert scraper.stats()["listing_pages"]["bpsc"] == ["https://bpsc.bih.nic.in/Advt.htm",
+                                                        "https://bpsc.bih.nic.in/Notices.htm"]
+
+    # Second round: discovery is cached and both listings answer 304
+    site.clear()
+    assert asyncio.run(scraper.poll()) == []
+    assert BPSC_HOME not in site
+    assert scraper.not_modified == 2
+
+
+def test_configured_pages_skip_discovery(site):
+    scraper = PortalScraper([Portal("bpsc", "BPSC", BPSC_HOME, ["https://bpsc.bih.nic.in/Notices.htm"])])
+    assert len(asyncio.run(scraper.poll())) == 3
+    assert site == ["https://bpsc.bih.nic.in/Notices.htm"]
+
+
+def test_unreachable_portal_reports_failure(site):
+    scraper = PortalScraper([Portal("gone", "Gone", "https://bpsc.bih.nic.in/missing.htm")])
+    assert asyncio.run(scraper.poll()) is None
+    assert scraper.errors["gone"] == 1
+
+
+NOTICES = "https://bpsc.bih.nic.in/Notices.htm"
+NEW_ROW = (b'<tr><td>4</td><td>TRE 4.0: final result of the supplementary examination</td><td>20-04-2026</td>'
+           b'<td><a href="Notices/NT-2026-04-20-01.pdf">Download</a></td></tr>\n</table>')
+
+
+@pytest.fixture
+def plain_site(monkeypatch, tmp_path):
+    """A listing page served without ETag or Last-Modified, whose body the test can change."""
+    page = {"body": fixture("bpsc_notices.html"), "status": 200}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(page["status"], content=page["body"], headers={"Content-Type": "text/html"})
+
+    store = NoticeStore(str(tmp_path / "notices.sqlite3"))
+    monkeypatch.setattr(http, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(portals, "notice_store", store)
+    monkeypatch.setattr(portals, "PORTAL_HOST_DELAY", 0)
+    return page, store
+
+
+def test_only_links_not_yet_stored_are_returned(plain_site):
+    page, store = plain_site
+    scraper = PortalScraper([Portal("bpsc", "BPSC", BPSC_HOME, [NOTICES])])
+    first = asyncio.run(scraper.poll())
+    store.upsert(first)
+
+    # Same body: recognised by its hash and not parsed again
+    assert asyncio.run(scraper.poll()) == [] and (scraper.parsed, scraper.unchanged) == (1, 1)
+
+    page["body"] = page["body"].replace(b"</table>", NEW_ROW)
+    fresh = asyncio.run(scraper.poll())
+    assert [i["url"] for i in fresh] == ["https://bpsc.bih.nic.in/Notices/NT-2026-04-20-01.pdf"]
+    assert fresh[0]["source"] == "BPSC" and scraper.parsed == 2
+
+
+def test_health_follows_the_last_successful_poll(plain_site):
+    page, _ = plain_site
+    scraper = PortalScraper([Portal("bpsc", "BPSC", BPSC_HOME, [NOTICES])])
+    page["status"] = 500
+    assert asyncio.run(scraper.poll()) is None and not scraper.healthy()
+    page["status"] = 200
+    asyncio.run(scraper.poll())
+    assert scraper.healthy() and scraper.stats()["errors"] == {"bpsc": 1}
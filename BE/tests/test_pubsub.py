@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+from app.routes import notice as notice_routes
+from app.services import pubsub
+from app.services.notice_store import NoticeStore
+from app.services.pubsub import QUEUE_SIZE, RESYNC, NoticeHub
+
+CATEGORIES = ["वेतन", "स्थानांतरण", "प्रशिक्षण", "परीक्षा"]
+
+
+def notice(i: int, category: str = "वेतन", priority: str = "normal") -> dict:
+    return {"url": f"https://state.bihar.gov.in/educationbihar/n/{i}.pdf", "title": f"सूचना संख्या {i}",
+            "category": category, "priority": priority, "source": "शिक्षा विभाग, बिहार"}
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    store = NoticeStore(str(tmp_path / "notices.sqlite3"))
+    monkeypatch.setattr(pubsub, "notice_store", store)
+    monkeypatch.setattr(pubsub, "POLL_INTERVAL", 0.01)
+    return store
+
+
+def test_first_subscriber_does_not_get_the_idle_backlog(store):
+    async def scenario():
+        hub = NoticeHub()
+        hub.start()
+        try:
+            # Stored while nobody is subscribed: the pump does not tail the log
+            store.upsert([notice(i) for i in range(5)])
+            await asyncio.sleep(0.05)
+            sub = hub.subscribe()
+            await asyncio.sleep(0.05)
+            assert sub.queue.empty()
+
+            store.upsert([notice(100)])
+            await asyncio.sleep(0.05)
+            event = sub.queue.get_nowait()
+            assert event["notice"]["title"] == "सूचना संख्या 100"
+            assert sub.queue.empty()
+        finally:
+            await hub.stop()
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_told_to_resync():
+    hub = NoticeHub()
+    sub = hub.subscribe("वेतन")
+    for seq in range(QUEUE_SIZE + 1):
+        hub.publish({"seq": seq, "kind": "new", "notice": {"category": "वेतन"}})
+    assert hub.overflows == 1
+    assert sub.queue.qsize() == 1 and sub.queue.get_nowait() is RESYNC
+
+
+def test_fan_out_to_10k_subscribers():
+    """One event reaches only the matching buckets of 10,000 subscribers (timing: benchmarks/bench_pubsub.py)."""
+    async def scenario():
+        hub = NoticeHub()
+        subs = [hub.subscribe(None if i % 5 == 0 else CATEGORIES[i % len(CATEGORIES)],
+                              "high" if i % 10 == 1 else None)
+                for i in range(10_000)]
+        expected = [s for s in subs if s.category in (None, "वेतन") and s.priority in (None, "high")]
+
+        for seq in range(10):
+            hub.publish({"seq": seq, "kind": "new", "notice": {"category": "वेतन", "priority": "high"}})
+
+        assert hub.delivered == 10 * len(expected)
+        assert all(s.queue.qsize() == 10 for s in expected)
+        assert sum(s.queue.qsize() for s in subs) == hub.delivered
+        for s in subs:
+            hub.unsubscribe(s)
+        assert hub.subscribers == 0
+
+    asyncio.run(scenario())
+
+
+# ── /notice/stream ──
+
+@pytest.fixture
+def stream(store, monkeypatch):
+    hub = NoticeHub()
+    monkeypatch.setattr(notice_routes, "notice_store", store)
+    monkeypatch.setattr(notice_routes, "notice_hub", hub)
+    monkeypatch.setattr(notice_routes, "HEARTBEAT", 0.05)
+
+    async def open_stream(category=None, priority=None, last_event_id=None):
+        response = await notice_routes.notice_stream(category, priority, last_event_id)
+        assert response.media_type == "text/event-stream"
+        return response.body_iterator
+
+    return hub, open_stream
+
+
+def sse_ids(chunks) -> list:
+    return [int(c.split("\n", 1)[0][4:]) for c in chunks if c.startswith("id: ")]
+
+
+def test_stream_resumes_from_last_event_id_then_goes_live(store, stream):
+    hub, open_stream = stream
+    store.upsert([notice(i, CATEGORIES[i % 2]) for i in range(4)])     # log seq 1-4
+
+    async def scenario():
+        body = await open_stream(category="वेतन", last_event_id="1")
+        chunks = [await body.__anext__() for _ in range(2)]
+        # A live event already sent from the backlog is not repeated
+        for event in store.events_since(2):
+            hub.publish(event)
+        store.upsert([notice(10)])
+        hub.publish(store.events_since(4)[0])
+        chunks.append(await body.__anext__())
+        assert hub.subscribers == 1
+        await body.aclose()
+        return chunks
+
+    chunks = asyncio.run(scenario())
+    assert chunks[0].startswith("retry: 5000")
+    assert sse_ids(chunks) == [3, 5]
+    assert chunks[1].startswith("id: 3\nevent: notice\ndata: ") and '"kind": "new"' in chunks[1]
+    assert hub.subscribers == 0
+
+
+def test_stream_tells_a_client_that_missed_too_much_to_resync(store, stream, monkeypatch):
+    hub, open_stream = stream
+    monkeypatch.setattr(store, "event_bounds", lambda: (50, 60))    # older entries trimmed from the log
+
+    async def scenario():
+        body = await open_stream(last_event_id="10")
+        chunks = [await body.__anext__() for _ in range(2)]
+        # A subscriber whose queue overflows is told to resync as well
+        for seq in range(61, 62 + QUEUE_SIZE):
+            hub.publish({"seq": seq, "kind": "new", "notice": {"category": "वेतन"}})
+        chunks.append(await body.__anext__())
+        await body.aclose()
+        return chunks
+
+    chunks = asyncio.run(scenario())
+    assert chunks[1:] == ["event: resync\ndata: {}\n\n"] * 2 and hub.overflows == 1
+
+
+def test_idle_stream_sends_heartbeats(stream):
+    _, open_stream = stream
+
+    async def scenario():
+        body = await open_stream()
+        chunks = [await body.__anext__() for _ in range(3)]
+        await body.aclose()
+        return chunks
+
+    assert asyncio.run(scenario())[1:] == [": ping\n\n", ": ping\n\n"]
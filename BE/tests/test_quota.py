@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.services import quota
+from app.services.cache import SQLiteBackend
+from app.services.quota import MAX_FACTOR, QuotaGovernor, result_hash
+
+
+@pytest.fixture(autouse=True)
+def midday(monkeypatch):
+    monkeypatch.setattr(quota, "_day_fraction", lambda: 0.5)
+    monkeypatch.setattr(quota, "get_backend", lambda: None)
+
+
+def read(governor: QuotaGovernor, feed: str, n: int) -> None:
+    for _ in range(n):
+        governor.hit(feed)
+
+
+def test_traffic_and_change_rate_stretch_the_ttl():
+    governor = QuotaGovernor(100)
+    assert governor.factor("news") == 3.0                 # nobody read it this hour
+    read(governor, "news", 2)
+    assert governor.factor("news") == 1.5
+    read(governor, "news", 3)
+    assert governor.factor("news") == 1.0
+    for _ in range(3):
+        governor.observe("news", {"results": [{"url": "a"}, {"url": "b"}]})
+    assert governor.unchanged["news"] == 2 and governor.factor("news") == pytest.approx(2.25)
+    assert governor.observe("news", {"results": [{"url": "c"}]}) and governor.factor("news") == 1.0
+
+
+def test_spending_ahead_of_the_day_lengthens_the_ttl():
+    governor = QuotaGovernor(100)
+    read(governor, "news", 5)
+    asyncio.run(governor.spend("news", "advanced", 25))   # 50 credits at midday: on pace
+    assert governor.factor("news") == 1.0
+    asyncio.run(governor.spend("news", "basic", 10))      # 60%: 10 points ahead
+    assert governor.factor("news") == pytest.approx(2.0)
+    asyncio.run(governor.spend("notice", "basic", 30))    # 90%: the budget is shared by every feed
+    assert governor.factor("news") == pytest.approx(5.0)
+    assert governor.factor("notice") == MAX_FACTOR        # 3 (unread) × 5, capped
+
+
+def test_refreshes_stop_when_the_budget_is_spent():
+    governor = QuotaGovernor(10)
+    asyncio.run(governor.spend("news", "advanced", 4))
+    assert asyncio.run(governor.allow("news"))            # 8 of 10
+    asyncio.run(governor.spend("news", "advanced"))
+    assert not asyncio.run(governor.allow("news")) and not asyncio.run(governor.allow("notice"))
+    assert governor.skipped == {"news": 1, "notice": 1}
+
+
+def test_workers_share_one_budget(tmp_path, monkeypatch):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(quota, "get_backend", lambda: backend)
+    one, two = QuotaGovernor(10), QuotaGovernor(10)
+    asyncio.run(one.spend("news", "advanced", 3))
+    asyncio.run(two.spend("news", "advanced", 2))
+    assert two.spent_today() == 10
+    assert not asyncio.run(one.allow("news"))             # sync() picks up the other worker's spend
+
+
+def test_result_hash_ignores_order_and_scores():
+    a = {"sections": [{"results": [{"url": "u1", "score": 0.9}, {"url": "u2", "score": 0.1}]}]}
+    b = {"sections": [{"results": [{"url": "u2", "score": 0.5}, {"url": "u1", "score": 0.2}]}]}
+    assert result_hash(a) == result_hash(b) != result_hash({"sections": [{"results": [{"url": "u3"}]}]})
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.services import ratelimit
+from app.services.cache import SQLiteBackend
+from app.services.ratelimit import AuthLimiter, SlidingWindow, normalize_email
+
+
+class Clock:
+    def __init__(self, now: float = 900_000.0):     # a multiple of the windows below
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    return clock
+
+
+def hits(window: SlidingWindow, n: int, key: str = "k") -> list:
+    return [asyncio.run(window.hit(key)) for _ in range(n)]
+
+
+def test_over_the_limit_in_one_window(clock):
+    window = SlidingWindow("t", 10, 100)
+    assert all(ok for ok, _ in hits(window, 10))
+    ok, wait = hits(window, 1)[0]
+    # 11 in this window: wait for it to become the previous one (100 s) and slide out until 11 * (1 - t/100) <= 10
+    assert not ok and wait == pytest.approx(100 + 100 / 11)
+    assert (window.allowed, window.limited) == (10, 1)
+
+
+def test_previous_window_is_weighted_by_its_overlap(clock):
+    window = SlidingWindow("t", 10, 100)
+    hits(window, 10)
+    clock.now += 110                    # 10 s into the next window: 10 * 0.9 + 1 = 10, still allowed
+    assert hits(window, 1)[0] == (True, 0.0)
+    ok, wait = hits(window, 1)[0]       # 10 * 0.9 + 2 = 11
+    # 10 * (1 - t/100) + 2 <= 10 from t = 20, i.e. 10 s from now
+    assert not ok and wait == pytest.approx(10)
+    clock.now += 40                     # 10 * 0.5 + 3 = 8
+    assert hits(window, 1)[0] == (True, 0.0)
+
+
+def test_counts_expire_two_windows_later(clock):
+    window = SlidingWindow("t", 3, 60)
+    hits(window, 5)
+    clock.now += 120
+    assert all(ok for ok, _ in hits(window, 3))
+
+
+def test_keys_are_independent_and_bounded(clock):
+    window = SlidingWindow("t", 1, 60, maxkeys=2)
+    assert hits(window, 1, "a")[0][0] and hits(window, 1, "b")[0][0]
+    assert not hits(window, 1, "a")[0][0]
+    hits(window, 1, "c")                # evicts "b", the least recently used
+    assert window.stats()["keys"] == 2 and window.evicted == 1
+    assert hits(window, 1, "b")[0][0]
+
+
+def test_shared_counts_are_seen_by_every_worker(clock, tmp_path, monkeypatch):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_SHARED", True)
+    monkeypatch.setattr(ratelimit, "get_backend", lambda: backend)
+    one, two = SlidingWindow("t", 4, 100), SlidingWindow("t", 4, 100)
+    assert all(ok for ok, _ in hits(one, 2) + hits(two, 2))
+    ok, wait = hits(one, 1)[0]
+    assert not ok and wait == pytest.approx(100 + 100 * (1 - 4 / 5))
+
+
+def test_unreachable_shared_backend_falls_back_to_local_counts(clock, monkeypatch):
+    class Down:
+        async def incr(self, key, ttl, amount=1):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_SHARED", True)
+    monkeypatch.setattr(ratelimit, "get_backend", lambda: Down())
+    window = SlidingWindow("t", 2, 100)
+    assert [ok for ok, _ in hits(window, 3)] == [True, True, False]
+
+
+def test_auth_limiter_keys_by_ip_and_normalized_email(clock):
+    limiter = AuthLimiter("login", "100/300", "2/300")
+    request = Request({"type": "http", "headers": [], "client": ("10.0.0.1", 1234)})
+    check = lambda email: asyncio.run(limiter.check(request, email))
+    assert check("Ramesh.Kumar+exam@gmail.com") is None and check("rameshkumar@googlemail.com") is None
+    assert check("RAMESHKUMAR@gmail.com") == 400      # 300 s for the window to pass + 100 s to slide out
+    assert check("sita@example.in") is None
+    assert normalize_email("A.B+x@Example.in") == "a.b@example.in"
@@ -0,0 +1,167 @@
+import asyncio
+import gzip
+import uuid
+
+import pytest
+
+from app.services import refresher as refresher_module
+from app.services.refresher import Feed
+
+
+class Upstream:
+    """Loader returning numbered snapshots; `fail` makes the next calls raise."""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"version": self.calls}
+
+
+@pytest.fixture(autouse=True)
+def snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(refresher_module, "SNAPSHOT_DIR", tmp_path)
+    return tmp_path
+
+
+def feed(loader, ttl: float = 60, **kwargs) -> Feed:
+    # Unique names: feeds with one name share their snapshot through the cache tier
+    return Feed(f"test-{uuid.uuid4().hex[:8]}", loader, ttl, **kwargs)
+
+
+def test_first_readers_share_one_load():
+    upstream = Upstream(delay=0.02)
+    f = feed(upstream)
+
+    async def scenario():
+        return await asyncio.gather(*(f.get() for _ in range(10)))
+
+    assert asyncio.run(scenario()) == [{"version": 1}] * 10
+    assert upstream.calls == 1 and f.origin == "live" and not f.is_stale()
+
+
+def test_stale_snapshot_is_served_while_it_refreshes():
+    upstream = Upstream(delay=0.02)
+    f = feed(upstream, ttl=0)
+
+    async def scenario():
+        await f.get()
+        assert f.is_stale()
+        served = await asyncio.gather(*(f.get() for _ in range(5)))   # none of them waits
+        assert served == [{"version": 1}] * 5
+        await f._inflight
+        return f.data
+
+    assert asyncio.run(scenario()) == {"version": 2}
+    assert upstream.calls == 2          # the first load and one background refresh shared by the five reads
+
+
+def test_failed_refresh_keeps_the_snapshot_and_backs_off():
+    upstream = Upstream()
+    f = feed(upstream, ttl=600)
+    asyncio.run(f.refresh())
+    upstream.fail = True
+    assert asyncio.run(f.refresh()) == {"version": 1}
+    assert asyncio.run(f.refresh()) == {"version": 1}
+    assert (f.errors, f.consecutive_errors, f.last_error) == (2, 2, "upstream down")
+    assert f.next_delay() == 60         # 30 s, doubling per consecutive failure, capped at the TTL
+    upstream.fail = False
+    asyncio.run(f.refresh())
+    assert f.consecutive_errors == 0 and 0.9 * 480 <= f.next_delay() <= 1.1 * 480
+
+
+def test_empty_upstream_result_is_a_failure():
+    f = feed(lambda: asyncio.sleep(0, result=[]))
+    assert asyncio.run(f.refresh()) is None and f.errors == 1
+
+
+def test_workers_adopt_a_newer_snapshot_instead_of_refreshing():
+    upstream_a, upstream_b = Upstream(), Upstream()
+    a = feed(upstream_a)
+    b = Feed(a.name, upstream_b, 60)
+    asyncio.run(a.get())
+    assert asyncio.run(b.get()) == {"version": 1} and upstream_b.calls == 0
+
+
+def test_governor_can_veto_a_refresh():
+    class Broke:
+        def hit(self, name): pass
+        def factor(self, name): return 2.0
+        def observe(self, name, data): return True
+        async def allow(self, name): return self.allowed
+
+    governor = Broke()
+    governor.allowed = True
+    upstream = Upstream()
+    f = feed(upstream, ttl=100, governor=governor)
+    asyncio.run(f.get())
+    assert f.expires - f.ts == 200      # TTL scaled by the governor's factor
+    governor.allowed = False
+    assert asyncio.run(f.refresh()) == {"version": 1} and upstream.calls == 1
+
+
+def test_scheduler_refreshes_and_stops():
+    upstream = Upstream()
+    f = feed(upstream, ttl=0.05, jitter=0)
+    scheduler = refresher_module.Refresher()
+    scheduler.register(f)
+
+    async def scenario():
+        scheduler.start()
+        await asyncio.sleep(0.2)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+    assert upstream.calls >= 3 and f.stats()["refreshes"] == upstream.calls
+
+
+# ── Disk snapshots ──
+
+def test_snapshot_round_trip_warm_starts_stale(snapshots):
+    f = feed(Upstream())
+    asyncio.run(f.refresh())
+    assert f.snapshot_path.parent == snapshots and gzip.decompress(f.snapshot_path.read_bytes())
+    assert [p.name for p in snapshots.iterdir()] == [f.snapshot_path.name]     # no temp files left
+
+    restarted = Feed(f.name, Upstream(), 60)
+    scheduler = refresher_module.Refresher()
+    scheduler.register(restarted)
+    scheduler.load_snapshots()
+    assert restarted.data == {"version": 1} and restarted.origin == "disk" and restarted.is_stale()
+    assert restarted.ts == pytest.approx(f.ts)
+
+
+def test_live_refresh_replaces_a_disk_snapshot():
+    f = feed(Upstream())
+    f.set({"version": 0})
+    f.save_snapshot()
+    restarted = Feed(f.name, Upstream(), 60)
+    assert restarted.load_snapshot()
+
+    async def scenario():
+        served = await restarted.get()                  # served at once, refresh runs behind it
+        await restarted._inflight
+        return served
+
+    assert asyncio.run(scenario()) == {"version": 0}
+    assert restarted.data == {"version": 1} and restarted.origin == "live" and not restarted.is_stale()
+
+
+@pytest.mark.parametrize("content", [b"not gzip", gzip.compress(b"{not json"), gzip.compress(b'{"data": []}')])
+def test_unreadable_or_empty_snapshots_are_ignored(content):
+    f = feed(Upstream())
+    f.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    f.snapshot_path.write_bytes(content)
+    assert not f.load_snapshot() and f.data is None and f.origin == "empty"
+
+
+def test_feeds_without_snapshots_do_not_write(snapshots):
+    f = feed(Upstream(), snapshot=False)
+    asyncio.run(f.refresh())
+    assert not f.load_snapshot() and list(snapshots.iterdir()) == []
@@ -0,0 +1,180 @@
+import asyncio
+import base64
+import json
+import os
+import time
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routes import assess, auth
+from app.services import sessions
+from app.services.db import Database
+from app.services.ratelimit import AuthLimiter
+from app.services.sessions import TokenSigner
+
+KEYS = {"2026-02": b"new-secret-used-for-signing", "2026-01": b"old-secret-still-verifies"}
+USER = {"id": 42, "name": "रमेश", "email": "ramesh@example.in"}
+
+
+def test_access_token_round_trip():
+    signer = TokenSigner(KEYS)
+    tokens = signer.issue(USER)
+    claims = signer.verify(tokens["access_token"])
+    assert (claims["sub"], claims["name"], claims["typ"]) == ("42", "रमेश", "access")
+    # Kinds are not interchangeable
+    assert signer.verify(tokens["access_token"], kind="refresh") is None
+    assert signer.verify(tokens["refresh_token"]) is None
+    assert signer.verify(tokens["refresh_token"], kind="refresh")["jti"]
+
+
+def test_tampered_and_unknown_key_tokens_are_rejected():
+    signer = TokenSigner(KEYS)
+    header, payload, signature = signer.issue(USER)["access_token"].split(".")
+    claims = json.loads(base64.urlsafe_b64decode(payload + "=="))
+    forged = base64.urlsafe_b64encode(json.dumps({**claims, "sub": "1"}).encode()).decode().rstrip("=")
+    assert signer.verify(f"{header}.{forged}.{signature}") is None
+    assert signer.verify("not.a.token") is None and signer.verify("garbage") is None
+    assert TokenSigner({"other": b"x"}).verify(signer.issue(USER)["access_token"]) is None
+    assert signer.rejected == 3
+
+
+def test_rotation_old_key_still_verifies():
+    old = TokenSigner({"2026-01": KEYS["2026-01"]}).issue(USER)["access_token"]
+    rotated = TokenSigner(KEYS)
+    assert rotated.verify(old)["sub"] == "42"
+    assert json.loads(base64.urlsafe_b64decode(rotated.issue(USER)["access_token"].split(".")[0] + "=="))["kid"] == "2026-02"
+
+
+def test_expired_token_is_rejected():
+    signer = TokenSigner(KEYS)
+    now = int(time.time())
+    token = signer.sign({"sub": "42", "typ": "access", "iat": now - 120, "exp": now - 60})
+    assert signer.verify(token) is None
+    assert signer.verify(token) is None     # expired claims are never cached as valid
+
+
+def test_missing_signing_key_only_disables_tokens(monkeypatch):
+    monkeypatch.setenv("AUTH_SIGNING_KEYS", "")
+    signer = TokenSigner()                       # importing the app must not fail
+    assert not signer.configured and signer.stats()["configured"] is False
+    with pytest.raises(RuntimeError, match="AUTH_SIGNING_KEYS"):
+        signer.issue(USER)
+    monkeypatch.setenv("AUTH_SIGNING_KEYS", "no-secret-given")
+    with pytest.raises(RuntimeError):
+        TokenSigner().verify(TokenSigner(KEYS).issue(USER)["access_token"])
+
+
+def test_routes_without_a_signing_key(monkeypatch):
+    monkeypatch.setattr(sessions, "signer", TokenSigner({}))
+    monkeypatch.setattr(auth, "signer", sessions.signer)
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.include_router(assess.router)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            login = await client.post("/auth/login", json={"email": "a@b.in", "password": "secret123"})
+            grade = await client.post("/assess/grade", json={"question": "", "answers": []},
+                                      headers={"Authorization": "Bearer a.b.c"})
+            return login.json(), grade
+
+    login, grade = asyncio.run(scenario())
+    assert not login["success"] and "AUTH_SIGNING_KEYS" in login["message"]
+    # AI routes still serve; the unverifiable token just counts as anonymous
+    assert grade.status_code == 200
+
+
+def test_grading_is_attributed_and_can_require_login(monkeypatch):
+    app = FastAPI()
+    app.include_router(assess.router)
+    monkeypatch.setattr(sessions, "AUTH_REQUIRED", True)
+    before = sessions.usage.refused
+
+    async def grade(headers):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return await client.post("/assess/grade", json={}, headers=headers)
+
+    assert asyncio.run(grade({})).status_code == 401
+    assert sessions.usage.refused == before + 1
+    token = sessions.signer.issue(USER)["access_token"]
+    response = asyncio.run(grade({"Authorization": f"Bearer {token}"}))
+    assert response.status_code != 401
+    assert sessions.usage.by_route["assess.grade"] >= 1
+
+
+# ── Refresh tokens against Postgres (TEST_DATABASE_URL, e.g. a throwaway local server) ──
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+needs_postgres = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+@pytest.fixture
+def auth_app(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", TEST_DATABASE_URL or "")
+    monkeypatch.setattr(auth, "login_limiter", AuthLimiter("login", "1000/1", "1000/1"))
+    monkeypatch.setattr(auth, "signup_limiter", AuthLimiter("signup", "1000/1", "1000/1"))
+    app = FastAPI()
+    app.include_router(auth.router)
+    return app
+
+
+def with_database(monkeypatch, app, scenario):
+    async def run():
+        database = Database()
+        monkeypatch.setattr(auth, "database", database)
+        await auth.init_db()
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+                return await scenario(client)
+        finally:
+            await database.close()
+    return asyncio.run(run())
+
+
+async def signup(client) -> dict:
+    email = f"t-{uuid.uuid4().hex[:10]}@example.in"
+    body = (await client.post("/auth/signup", json={"name": "टेस्ट", "email": email, "phone": "9000000000",
+                                                     "password": "secret123"})).json()
+    assert body["success"], body
+    return body
+
+
+@needs_postgres
+def test_refresh_token_works_once(monkeypatch, auth_app):
+    async def scenario(client):
+        first = (await signup(client))["tokens"]["refresh_token"]
+        rotated = (await client.post("/auth/refresh", json={"refresh_token": first})).json()
+        assert rotated["success"] and rotated["tokens"]["refresh_token"] != first
+        # Replaying the spent token fails...
+        replay = (await client.post("/auth/refresh", json={"refresh_token": first})).json()
+        assert not replay["success"]
+        # ...and ends the session family, including the token issued from it
+        stolen = (await client.post("/auth/refresh", json={"refresh_token": rotated["tokens"]["refresh_token"]})).json()
+        assert not stolen["success"]
+
+    with_database(monkeypatch, auth_app, scenario)
+
+
+@needs_postgres
+def test_concurrent_refreshes_with_one_token_get_one_pair(monkeypatch, auth_app):
+    async def scenario(client):
+        token = (await signup(client))["tokens"]["refresh_token"]
+        results = await asyncio.gather(*(client.post("/auth/refresh", json={"refresh_token": token}) for _ in range(5)))
+        assert sum(r.json()["success"] for r in results) == 1
+
+    with_database(monkeypatch, auth_app, scenario)
+
+
+@needs_postgres
+def test_other_sessions_survive_a_normal_refresh(monkeypatch, auth_app):
+    async def scenario(client):
+        account = await signup(client)
+        login = (await client.post("/auth/login", json={"email": account["user"]["email"],
+                                                         "password": "secret123"})).json()
+        assert (await client.post("/auth/refresh", json={"refresh_token": account["tokens"]["refresh_token"]})).json()["success"]
+        assert (await client.post("/auth/refresh", json={"refresh_token": login["tokens"]["refresh_token"]})).json()["success"]
+
+    with_database(monkeypatch, auth_app, scenario)
@@ -0,0 +1,183 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routes import teach
+from app.services.cache import SharedCache
+
+app = FastAPI()
+app.include_router(teach.router)
+
+
+def reply(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def ai(monkeypatch):
+    """Fake completions: a JSON question list per prompt; prompts for class 7 fail upstream."""
+    prompts = []
+
+    async def complete(client, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        if "कक्षा 7 " in prompt:
+            raise RuntimeError("upstream 500")
+        return reply('```json\n[{"question": "प्रश्न", "options": ["अ", "ब", "स", "द"], "correct": 1}]\n```')
+
+    monkeypatch.setattr(teach, "_get_ai_client", lambda: (object(), "gpt-test", None))
+    monkeypatch.setattr(teach, "complete", complete)
+    monkeypatch.setattr(teach, "_generate_cache", SharedCache("test.generate", shared=False))
+    return prompts
+
+
+def post(path: str, body: dict):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return await client.post(path, json=body)
+    return asyncio.run(run())
+
+
+def item(class_num: int = 8, subject: str = "science", topic: str = "") -> dict:
+    return {"subject": subject, "class_num": class_num, "topic": topic, "count": 1}
+
+
+def test_batch_reports_every_item(ai):
+    items = [item(8), item(6), item(subject="sanskrit-vedic"), item(7)]
+    body = post("/teach/generate/batch", {"items": items, "stream": False}).json()
+    by_index = {r["index"]: r for r in body["results"]}
+    assert [by_index[i]["status"] for i in range(4)] == ["ok", "ok", "error", "error"]
+    assert by_index[0]["result"]["questions"][0]["correct"] == 1 and by_index[0]["result"]["source"] == "ai"
+    assert "नहीं मिला" in by_index[2]["result"]["error"]      # unknown subject, no AI call
+    assert (body["ok"], body["failed"], body["skipped"]) == (2, 2, 0)
+    assert len(ai) == 3
+
+
+def test_items_over_the_cap_are_reported_as_skipped(ai, monkeypatch):
+    monkeypatch.setattr(teach, "BATCH_MAX_ITEMS", 2)
+    body = post("/teach/generate/batch", {"items": [item(5), item(6), item(8), item(4)], "stream": False}).json()
+    assert [(r["index"], r["status"]) for r in body["results"]] == [(0, "ok"), (1, "ok"), (2, "skipped"), (3, "skipped")]
+    assert "2" in body["results"][2]["result"]["error"] and body["skipped"] == 2
+    assert len(ai) == 2
+
+
+def test_streamed_batch_sends_ndjson_lines_and_a_summary(ai, monkeypatch):
+    monkeypatch.setattr(teach, "BATCH_MAX_ITEMS", 3)
+    response = post("/teach/generate/batch", {"items": [item(8), item(7), item(6), item(5)]})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"index": 3, "status": "skipped", "result": lines[0]["result"]}
+    assert sorted(line["index"] for line in lines[1:-1]) == [0, 1, 2]
+    assert lines[-1] == {"done": True, "ok": 2, "failed": 1, "skipped": 1}
+
+
+def test_repeated_items_share_one_generation(ai):
+    body = post("/teach/generate/batch", {"items": [item(8, topic="धातु-अधातु")] * 3, "stream": False}).json()
+    assert len(ai) == 1 and body["ok"] == 3
+    # Joined the in-flight load, so not a cache hit; a later request is one
+    assert {r["result"]["source"] for r in body["results"]} == {"ai"}
+    assert post("/teach/generate", item(8, topic="धातु-अधातु")).json()["source"] == "cache"
+
+
+def test_batch_size_of_a_generation_is_bounded(ai):
+    assert post("/teach/generate", {**item(8), "count": teach.MAX_QUESTIONS + 1}).status_code == 422
+
+
+# ── Lesson plans ──
+
+class FakeStreamingAI:
+    """Async chat client streaming a plan in chunks; a topic containing "त्रुटि" fails midway."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        self.calls.append(prompt)
+
+        async def chunks():
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="## पाठ योजना\n"))])
+            await self.release.wait()
+            if "त्रुटि" in prompt:
+                raise RuntimeError("stream reset")
+            yield SimpleNamespace(choices=[])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="### उद्देश्य\n"))])
+        return chunks()
+
+
+@pytest.fixture
+def lesson_ai(monkeypatch):
+    fake = FakeStreamingAI()
+    monkeypatch.setattr(teach, "get_ai_client", lambda deployment, use_async=False: (fake, "gpt-test", None))
+    monkeypatch.setattr(teach, "_lesson_cache", SharedCache("test.lesson_plan", shared=False))
+    monkeypatch.setattr(teach, "_lesson_demand", teach.Counter())
+    return fake
+
+
+PLAN = {"subject": "science", "class_num": 8, "topic": "धातु-अधातु"}
+
+
+def test_plan_stream_followers_see_every_chunk():
+    async def scenario():
+        stream = teach._PlanStream()
+        early = asyncio.create_task(collect(stream))
+        await stream.push("एक ")
+        await asyncio.sleep(0)
+        late = asyncio.create_task(collect(stream))       # joins after the first chunk
+        await stream.push("दो")
+        await stream.push(done=True)
+        return await early, await late
+
+    async def collect(stream):
+        return "".join([c async for c in stream.follow()])
+
+    assert asyncio.run(scenario()) == ("एक दो", "एक दो")
+
+
+def test_concurrent_requests_share_one_generation_then_hit_the_cache(lesson_ai):
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            first = asyncio.create_task(client.post("/teach/lesson-plan", json=PLAN))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(client.post("/teach/lesson-plan", json=PLAN))
+            await asyncio.sleep(0.05)
+            lesson_ai.release.set()
+            first, second = await first, await second
+            third = await client.post("/teach/lesson-plan", json={**PLAN, "topic": " धातु-अधातु "})
+            return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert [r.headers["x-cache"] for r in (first, second, third)] == ["miss", "shared", "hit"]
+    assert first.text == second.text == third.text == "## पाठ योजना\n### उद्देश्य\n"
+    assert len(lesson_ai.calls) == 1 and not teach._lesson_inflight
+
+
+def test_failed_generation_is_reported_and_not_cached(lesson_ai):
+    lesson_ai.release.set()
+    broken = {**PLAN, "topic": "त्रुटि वाला पाठ"}
+    first = post("/teach/lesson-plan", broken)
+    assert first.text.startswith("## पाठ योजना\n") and "⚠️ AI सेवा त्रुटि: stream reset" in first.text
+    assert post("/teach/lesson-plan", broken).headers["x-cache"] == "miss"
+    assert len(lesson_ai.calls) == 2
+
+
+def test_prewarm_generates_the_most_requested_uncached_syllabus_plans(lesson_ai):
+    lesson_ai.release.set()
+    topics = teach.get_topics("science", 8)
+    for topic, n in ((topics[0], 3), (topics[1], 2), ("मेरा अपना विषय", 5)):    # free text is not counted
+        for _ in range(n):
+            asyncio.run(teach._count_demand(teach.LessonPlanRequest(subject="science", class_num=8, topic=topic)))
+    popular = asyncio.run(teach._popular_topics(5))
+    assert popular == [("science", 8, topics[0]), ("science", 8, topics[1])]
+
+    post("/teach/lesson-plan", {"subject": "science", "class_num": 8, "topic": topics[1]})   # already cached
+    asyncio.run(teach._warm_lesson_plans(5))
+    assert len(lesson_ai.calls) == 2 and topics[0] in lesson_ai.calls[1]
+    assert post("/teach/lesson-plan", {"subject": "science", "class_num": 8, "topic": topics[0]}).headers["x-cache"] == "hit"